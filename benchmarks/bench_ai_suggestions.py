@@ -0,0 +1,73 @@
+# benchmarks/bench_ai_suggestions.py
+"""
+Score synthetic per-user totals with the suggestion rule engine versus the old
+apply/iterrows loop.
+
+    python -m benchmarks.bench_ai_suggestions --users 100000
+
+No database needed; rules come from core/suggestion_rules.json.
+"""
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from services.suggestion_engine import format_reason, load_suggestion_rules, rank_suggestions, suggestion_metrics
+
+
+def make_totals(users: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    assigned = rng.integers(0, 60, users)
+    return pd.DataFrame({
+        "user_id": np.arange(1, users + 1),
+        "user_name": [f"user{i}" for i in range(users)],
+        "tasks_assigned": assigned,
+        "tasks_completed": np.minimum(assigned, rng.integers(0, 60, users)),
+        "work_hours": rng.uniform(0, 60, users),
+        "active_minutes": rng.integers(0, 3000, users),
+        "idle_minutes": rng.integers(0, 1500, users),
+    })
+
+
+def legacy(agg: pd.DataFrame, top_n: int):
+    suggestions = []
+    agg["completion_rate"] = agg.apply(lambda r: (r["tasks_completed"]/r["tasks_assigned"]*100) if r["tasks_assigned"]>0 else 0.0, axis=1)
+    for _, r in agg.iterrows():
+        cr, wh, ta = r["completion_rate"], r["work_hours"], r["tasks_assigned"]
+        if ta == 0:
+            continue
+        if cr < 40 and wh > 20:
+            suggestions.append({"user_id": r["user_id"], "reason": f"Low completion {cr:.1f}% despite high hours ({wh}h)"})
+        elif cr < 40 and wh < 10:
+            suggestions.append({"user_id": r["user_id"], "reason": f"Low completion {cr:.1f}% and low hours ({wh}h)"})
+        elif cr > 80 and wh > 30:
+            suggestions.append({"user_id": r["user_id"], "reason": f"High completion {cr:.1f}% and high hours ({wh}h)"})
+    return suggestions[:top_n]
+
+
+def engine(agg: pd.DataFrame, top_n: int):
+    metrics = suggestion_metrics(agg["tasks_assigned"], agg["tasks_completed"], agg["work_hours"],
+                                 agg["active_minutes"], agg["idle_minutes"])
+    ranked = rank_suggestions(metrics, load_suggestion_rules(), top_n)
+    return [(int(agg["user_id"].iat[i]), format_reason(rule, metrics, i), sev) for i, rule, sev in ranked]
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--users", type=int, default=100_000)
+    ap.add_argument("--top", type=int, default=10)
+    ap.add_argument("--skip-legacy", action="store_true")
+    args = ap.parse_args()
+
+    agg = make_totals(args.users)
+    load_suggestion_rules()  # parse once, like a warm server
+    t0 = time.perf_counter()
+    top = engine(agg, args.top)
+    print(f"engine   {time.perf_counter() - t0:8.3f}s  top severity={top[0][2] if top else None}")
+    if not args.skip_legacy:
+        t0 = time.perf_counter()
+        legacy(agg.copy(), args.top)
+        print(f"legacy   {time.perf_counter() - t0:8.3f}s")
+
+
+if __name__ == "__main__":
+    main()
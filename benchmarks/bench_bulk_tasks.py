@@ -0,0 +1,47 @@
+# benchmarks/bench_bulk_tasks.py
+"""
+Create a sprint's worth of tasks through POST /tasks/ (one request and one
+transaction per task) and through POST /tasks/bulk (one request, one transaction).
+
+    DATABASE_URL=sqlite:////tmp/bench_tasks.db python -m benchmarks.bench_bulk_tasks --tasks 200
+
+Runs the app in-process with FastAPI's TestClient against DATABASE_URL (use a
+scratch database: users and tasks are added to it).
+"""
+import argparse
+import uuid
+from fastapi.testclient import TestClient
+import main
+from utils.db_timing import track_db_time
+
+
+def login(client: TestClient, role: str) -> tuple[dict, int]:
+    email = f"bench-{uuid.uuid4().hex[:8]}@example.com"
+    uid = client.post("/users/register", json={"name": email, "email": email, "password": "x", "role_name": role}).json()["id"]
+    token = client.post("/users/login", data={"username": email, "password": "x"}).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}, uid
+
+
+def main_():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--tasks", type=int, default=200)
+    args = ap.parse_args()
+
+    client = TestClient(main.app)
+    headers, _ = login(client, "manager")
+    _, assignee = login(client, "employee")
+    items = [{"title": f"Sprint task {i}", "description": "bench", "assigned_to": assignee} for i in range(args.tasks)]
+
+    with track_db_time("per-task") as timer:
+        for item in items:
+            assert client.post("/tasks/", json=item, headers=headers).status_code == 200
+    timer.report(tasks=args.tasks)
+
+    with track_db_time("bulk") as timer:
+        r = client.post("/tasks/bulk", json={"tasks": items}, headers=headers)
+    assert r.status_code == 200 and len(r.json()["created"]) == args.tasks, r.text
+    timer.report(tasks=args.tasks)
+
+
+if __name__ == "__main__":
+    main_()
@@ -0,0 +1,101 @@
+# benchmarks/bench_pdf_render.py
+"""
+Render a synthetic productivity table to PDF with the table renderer
+(in-process and with a process pool) and with the old iterrows/drawString loop.
+
+    python -m benchmarks.bench_pdf_render --rows 100000
+
+No database needed; cell formatting is checked before timing. The parallel run
+needs pypdf and more than one CPU to help.
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import date, timedelta
+import numpy as np
+import pandas as pd
+from reportlab.lib.pagesizes import letter
+from reportlab.pdfgen import canvas
+from services.pdf_report import PdfWriter, _format_column, render_table_pdf
+
+
+def make_frame(rows: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    assigned = rng.integers(0, 12, rows)
+    completed = np.minimum(assigned, rng.integers(0, 12, rows))
+    names = [f"Employee number {i} of the operations team" for i in rng.integers(1, 5000, rows)]
+    names[::97] = [None] * len(names[::97])  # users without a name come through as NULL
+    return pd.DataFrame({
+        "Date": [date(2025, 1, 1) + timedelta(days=int(d)) for d in rng.integers(0, 365, rows)],
+        "User ID": rng.integers(1, 5000, rows),
+        "User Name": names,
+        "Tasks Assigned": assigned,
+        "Tasks Completed": completed,
+        "Completion %": np.where(assigned > 0, completed * 100.0 / np.maximum(assigned, 1), 0.0),
+        "Work Hours": rng.uniform(0, 10, rows),
+    })
+
+
+def legacy_pdf(df: pd.DataFrame, path: str, title: str = "Report"):
+    c = canvas.Canvas(path, pagesize=letter)
+    width, height = letter
+    c.setFont("Helvetica-Bold", 14)
+    c.drawString(30, height - 40, title)
+    c.setFont("Helvetica", 10)
+    x = 30
+    y = height - 60
+    row_height = 14
+    for col in df.columns:
+        c.drawString(x, y, str(col))
+        x += 100
+    y -= row_height
+    x = 30
+    for idx, row in df.iterrows():
+        for col in df.columns:
+            text = str(row[col]) if not pd.isna(row[col]) else ""
+            c.drawString(x, y, text[:20])
+            x += 100
+        y -= row_height
+        x = 30
+        if y < 40:
+            c.showPage()
+            c.setFont("Helvetica", 10)
+            y = height - 40
+    c.save()
+
+
+def check_formatting():
+    """Cells must come out whole, with missing values as empty strings."""
+    assert _format_column(pd.Series(["b (x)", None, "alice"])) == ["b (x)", "", "alice"]
+    assert _format_column(pd.Series(["two\nlines", pd.NA], dtype="string")) == ["two lines", ""]
+    assert _format_column(pd.Series([1.5, None])) == ["1.50", ""]
+    assert _format_column(pd.Series([date(2025, 1, 2), None])) == ["2025-01-02", ""]
+
+
+def timed(label: str, fn, path: str):
+    t0 = time.perf_counter()
+    fn(path)
+    elapsed = time.perf_counter() - t0
+    print(f"{label:<18} {elapsed:8.2f}s  {os.path.getsize(path) / 2**20:6.1f} MiB")
+    os.remove(path)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=100_000)
+    ap.add_argument("--skip-legacy", action="store_true")
+    args = ap.parse_args()
+
+    check_formatting()
+    df = make_frame(args.rows)
+    path = os.path.join(tempfile.gettempdir(), "bench_pdf_render.pdf")
+    timed("table", lambda p: render_table_pdf(df, p, "Productivity", parallel=False), path)
+    if PdfWriter is not None:
+        timed("table parallel", lambda p: render_table_pdf(df, p, "Productivity", parallel=True), path)
+    if not args.skip_legacy:
+        timed("legacy iterrows", lambda p: legacy_pdf(df, p, "Productivity"), path)
+
+
+if __name__ == "__main__":
+    main()
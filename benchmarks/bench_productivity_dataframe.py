@@ -0,0 +1,104 @@
+# benchmarks/bench_productivity_dataframe.py
+"""
+Compare productivity_dataframe (read from user_day_facts) with the previous
+ORM + pandas implementation over the raw tables.
+
+    python -m benchmarks.bench_productivity_dataframe --tasks 1000000 --users 2000 --days 30
+
+Runs against DATABASE_URL (use a scratch database: the tables are filled with
+synthetic rows). Pass --skip-legacy for very large runs, the legacy path loads
+every task as an ORM object.
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+import pandas as pd
+from sqlalchemy import insert
+from core.database import Base, SessionLocal, engine
+from models import user, task, attendance, project, tracking, notification, monitoring, leave, user_day_fact  # noqa: F401 (register tables)
+from models.attendance import Attendance
+from models.task import Task
+from models.user import User
+from services.report_service import productivity_dataframe
+from services.fact_service import rebuild_facts
+
+
+def legacy_productivity_dataframe(db, s, e):
+    """The pre-aggregation implementation, kept here as the baseline."""
+    tasks = db.query(Task).filter(Task.created_at >= datetime.combine(s, datetime.min.time()), Task.created_at <= datetime.combine(e, datetime.max.time())).all()
+    atts = db.query(Attendance).filter(Attendance.date >= datetime.combine(s, datetime.min.time()), Attendance.date <= datetime.combine(e, datetime.max.time())).all()
+    task_rows = [{"date": t.created_at.date() if t.created_at else None, "user_id": t.assigned_to,
+                  "user_name": t.assignee.name if t.assignee else None, "task_id": t.id,
+                  "completed": 1 if (t.status and t.status.lower() == "completed") else 0} for t in tasks]
+    df_tasks = pd.DataFrame(task_rows) if task_rows else pd.DataFrame(columns=["date","user_id","user_name","task_id","completed"])
+    att_rows = [{"date": a.date.date() if a.date else None, "user_id": a.user_id, "work_hours": a.work_hours or 0.0} for a in atts]
+    df_att = pd.DataFrame(att_rows) if att_rows else pd.DataFrame(columns=["date","user_id","work_hours"])
+    task_grp = df_tasks.groupby(["date","user_id","user_name"]).agg(tasks_assigned=("task_id","nunique"), tasks_completed=("completed","sum")).reset_index()
+    att_grp = df_att.groupby(["date","user_id"]).agg(work_hours=("work_hours","sum")).reset_index()
+    merged = pd.merge(task_grp, att_grp, how="outer", on=["date","user_id"]).fillna(0)
+    merged["completion_rate"] = merged.apply(lambda r: (r["tasks_completed"] / r["tasks_assigned"] * 100) if r["tasks_assigned"]>0 else 0.0, axis=1)
+    return merged
+
+
+def seed(n_tasks: int, n_users: int, days: int, start: datetime):
+    Base.metadata.create_all(bind=engine)
+    rnd = random.Random(42)
+    with engine.begin() as conn:
+        conn.execute(insert(User.__table__), [
+            {"name": f"bench{i}", "email": f"bench{i}@example.com", "password": "x", "role_name": "employee",
+             "department": f"dept{i % 20}", "team": f"team{i % 100}"} for i in range(n_users)])
+        uids = [r[0] for r in conn.execute(User.__table__.select().with_only_columns(User.id).where(User.email.like("bench%")))]
+        batch = []
+        for i in range(n_tasks):
+            batch.append({"title": f"task{i}", "assigned_to": rnd.choice(uids),
+                          "created_at": start + timedelta(seconds=rnd.randrange(days * 86400)),
+                          "status": rnd.choice(["Pending", "In Progress", "Completed"]), "progress": 0.0})
+            if len(batch) == 50000:
+                conn.execute(insert(Task.__table__), batch)
+                batch = []
+        if batch:
+            conn.execute(insert(Task.__table__), batch)
+        conn.execute(insert(Attendance.__table__), [
+            {"user_id": uid, "date": start + timedelta(days=d, hours=9), "work_hours": round(rnd.uniform(4, 10), 2), "is_present": True, "status": "Active"}
+            for uid in uids for d in range(days)])
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--tasks", type=int, default=1_000_000)
+    ap.add_argument("--users", type=int, default=2000)
+    ap.add_argument("--days", type=int, default=30)
+    ap.add_argument("--no-seed", action="store_true")
+    ap.add_argument("--skip-legacy", action="store_true")
+    args = ap.parse_args()
+
+    start = datetime(2025, 1, 1)
+    s, e = start.date(), (start + timedelta(days=args.days - 1)).date()
+    if not args.no_seed:
+        t0 = time.perf_counter()
+        seed(args.tasks, args.users, args.days, start)
+        print(f"seeded {args.tasks} tasks in {time.perf_counter() - t0:.1f}s")
+        # bulk-seeded rows bypass the ORM write hooks, so build the facts once
+        db = SessionLocal()
+        t0 = time.perf_counter()
+        rebuild_facts(db, s, e)
+        print(f"fact catch-up    : {time.perf_counter() - t0:8.2f}s")
+        db.close()
+
+    db = SessionLocal()
+    t0 = time.perf_counter()
+    df, _, _ = productivity_dataframe(db, "custom", s, e)
+    print(f"facts report     : {time.perf_counter() - t0:8.2f}s  rows={len(df)}")
+    db.close()
+
+    if not args.skip_legacy:
+        db = SessionLocal()
+        t0 = time.perf_counter()
+        legacy = legacy_productivity_dataframe(db, s, e)
+        print(f"legacy orm+pandas: {time.perf_counter() - t0:8.2f}s  rows={len(legacy)}")
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+# benchmarks/bench_streaming_export.py
+"""
+Time and peak Python memory of the streaming productivity exports versus the
+DataFrame + openpyxl path.
+
+    python -m benchmarks.bench_streaming_export --rows 1000000
+
+Runs against DATABASE_URL (use a scratch database: user_day_facts is filled with
+synthetic rows). Peak memory is measured with tracemalloc around consuming the
+whole response body; tracemalloc slows allocation-heavy code a lot, so pass
+--time-only for wall-clock numbers.
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+from sqlalchemy import insert
+from core.database import Base, SessionLocal, engine
+from models import user, task, attendance, project, tracking, notification, user_day_fact  # noqa: F401 (register tables)
+from models.user import User
+from models.user_day_fact import UserDayFact
+from services.report_service import PRODUCTIVITY_HEADERS, productivity_dataframe, productivity_export_row, productivity_query
+from services.stream_export import iter_row_chunks, stream_rows
+
+
+def seed(rows: int, users: int, start: date):
+    Base.metadata.create_all(bind=engine)
+    days = max(rows // users, 1)
+    with engine.begin() as conn:
+        conn.execute(insert(User.__table__), [
+            {"name": f"stream{i}", "email": f"stream{i}@example.com", "password": "x", "role_name": "employee"} for i in range(users)])
+        uids = [r[0] for r in conn.execute(User.__table__.select().with_only_columns(User.id).where(User.email.like("stream%")))]
+        batch = []
+        for d in range(days):
+            for uid in uids:
+                batch.append({"user_id": uid, "day": start + timedelta(days=d), "tasks_assigned": 5, "tasks_completed": (uid + d) % 6,
+                              "work_hours": 7.5, "active_minutes": 400, "idle_minutes": 50, "on_leave": False})
+                if len(batch) == 50000:
+                    conn.execute(insert(UserDayFact.__table__), batch)
+                    batch = []
+        if batch:
+            conn.execute(insert(UserDayFact.__table__), batch)
+    return start + timedelta(days=days - 1)
+
+
+def measure(label, fn, trace: bool = True):
+    if trace:
+        tracemalloc.start()
+    t0 = time.perf_counter()
+    size = fn()
+    elapsed = time.perf_counter() - t0
+    peak = "-"
+    if trace:
+        peak = f"{tracemalloc.get_traced_memory()[1] / 2**20:.1f} MiB"
+        tracemalloc.stop()
+    print(f"{label:<22} {elapsed:8.2f}s  peak={peak:>10}  bytes={size}")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=1_000_000)
+    ap.add_argument("--users", type=int, default=5000)
+    ap.add_argument("--no-seed", action="store_true")
+    ap.add_argument("--skip-legacy", action="store_true")
+    ap.add_argument("--time-only", action="store_true")
+    args = ap.parse_args()
+
+    start = date(2025, 1, 1)
+    end = start + timedelta(days=max(args.rows // args.users, 1) - 1)
+    if not args.no_seed:
+        end = seed(args.rows, args.users, start)
+
+    headers = list(PRODUCTIVITY_HEADERS.values())
+    for fmt in ("csv", "ndjson", "xlsx"):
+        def consume(fmt=fmt):
+            chunks = iter_row_chunks(productivity_query(start, end), transform=productivity_export_row)
+            return sum(len(b) for b in stream_rows(fmt, headers, chunks))
+        measure(f"stream {fmt}", consume, not args.time_only)
+
+    if not args.skip_legacy:
+        def legacy():
+            db = SessionLocal()
+            df, _, _ = productivity_dataframe(db, "custom", start, end)
+            db.close()
+            fd, path = tempfile.mkstemp(suffix=".xlsx")
+            os.close(fd)
+            df.rename(columns=PRODUCTIVITY_HEADERS).to_excel(path, index=False, engine="openpyxl")
+            size = os.path.getsize(path)
+            os.remove(path)
+            return size
+        measure("dataframe + to_excel", legacy, not args.time_only)
+
+
+if __name__ == "__main__":
+    main()
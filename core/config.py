@@ -11,3 +11,9 @@ JWT_SECRET = os.getenv("JWT_SECRET", "myjwtsecret")
 JWT_ALGORITHM = "HS256"
 
 
+SUGGESTION_RULES_PATH = os.getenv(
+    "SUGGESTION_RULES_PATH", os.path.join(os.path.dirname(__file__), "suggestion_rules.json")
+)
+
+# large list endpoints encode column tuples directly (utils/fast_json.py); "0" restores response_model validation
+FAST_JSON_RESPONSES = os.getenv("FAST_JSON_RESPONSES", "1") != "0"
@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, func, inspect, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from core.config import DATABASE_URL
@@ -14,3 +14,48 @@ def get_db():
     finally:
         db.close()
 
+def dialect_insert(table):
+    """INSERT construct with ON CONFLICT support for the configured dialect."""
+    if engine.dialect.name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        from sqlalchemy.dialects.postgresql import insert
+    return insert(table)
+
+def insert_ignore(table, index_elements: list[str]):
+    """INSERT ... ON CONFLICT DO NOTHING for the configured dialect."""
+    return dialect_insert(table).on_conflict_do_nothing(index_elements=index_elements)
+
+def ist_date(column):
+    """
+    IST calendar day of a timestamp column, as SQL. timezone=True columns hold
+    IST wall-clock time on SQLite and are converted on PostgreSQL; naive columns
+    (datetime.utcnow defaults) hold UTC.
+    """
+    aware = getattr(column.type, "timezone", False)
+    if engine.dialect.name == "sqlite":
+        return func.date(column) if aware else func.date(column, "+330 minutes")
+    if not aware:
+        column = func.timezone("UTC", column)
+    return func.date(func.timezone("Asia/Kolkata", column))
+
+# columns added to existing tables after their first release; create_all only creates missing tables
+ADDED_COLUMNS = (
+    ("notifications", "dedupe_key"),
+    ("export_jobs", "heartbeat_at"),
+    ("outbox_events", "failed_at"),
+)
+
+def ensure_added_columns():
+    """Idempotently add ADDED_COLUMNS (and their indexes) to tables created before them. Run after create_all."""
+    existing = inspect(engine)
+    with engine.begin() as conn:
+        for table_name, column_name in ADDED_COLUMNS:
+            table = Base.metadata.tables[table_name]
+            if column_name not in {c["name"] for c in existing.get_columns(table_name)}:
+                column = table.c[column_name]
+                conn.execute(text(f"ALTER TABLE {table_name} ADD COLUMN {column_name} {column.type.compile(dialect=engine.dialect)}"))
+            for index in table.indexes:
+                if column_name in index.columns:
+                    index.create(bind=conn, checkfirst=True)
+
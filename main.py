@@ -1,12 +1,14 @@
 import asyncio
 from fastapi import FastAPI
-from core.database import Base, engine
-from routers import user_router, role_router, monitoring_router, productivity_router,attendance_router,leave_router,task_router,tracking_router,notification_router,reporting_router,alerts_router
-from models import user,leave, attendance,task,tracking,project,notification
+from core.database import Base, engine, ensure_added_columns
+from routers import user_router, role_router, monitoring_router, productivity_router,attendance_router,leave_router,task_router,project_router,tracking_router,notification_router,reporting_router,alerts_router,sync_router,presence_router
+from models import user,leave, attendance,task,tracking,project,notification,notification_counter,notification_archive,data_version,user_day_fact,export_job,task_latest_tracking,change_log,outbox_event,user_presence
 from services.alert_service import start_alert_workers
+from services.notification_broker import start_notification_broker
 
 
 Base.metadata.create_all(bind=engine)
+ensure_added_columns()
 
 app = FastAPI(title="User Management System with Authentication")
 
@@ -16,16 +18,21 @@ app.include_router(user_router.router)
 app.include_router(attendance_router.router)
 app.include_router(leave_router.router)
 app.include_router(task_router.router)
+app.include_router(project_router.router)
 app.include_router(tracking_router.router)
 app.include_router(monitoring_router.router)
 app.include_router(productivity_router.router)
 app.include_router(notification_router.router)
 app.include_router(reporting_router.router)
 app.include_router(alerts_router.router)
+app.include_router(sync_router.router)
+app.include_router(presence_router.router)
 
 @app.on_event("startup")
 async def startup_event():
     # previous background workers
     loop = asyncio.get_event_loop()
+    # live notification push (SSE / WebSocket)
+    await start_notification_broker()
     # start notification/alert workers
     await start_alert_workers()
\ No newline at end of file
@@ -0,0 +1,20 @@
+# models/change_log.py
+from sqlalchemy import Column, Integer, String, DateTime, Index
+from core.database import Base
+from utils.timezone import now_ist
+
+class ChangeLog(Base):
+    __tablename__ = "change_log"
+
+    id = Column(Integer, primary_key=True)
+    collection = Column(String(32), nullable=False)  # "tasks", "projects", "leaves", "notifications"
+    seq = Column(Integer, nullable=False)  # per-collection change sequence (sync cursor)
+    row_id = Column(Integer, nullable=False)
+    user_id = Column(Integer, nullable=True)  # whose collection the row is (or was) in; no FK, outlives users
+    changed_at = Column(DateTime(timezone=True), default=now_ist, nullable=False)
+
+    __table_args__ = (
+        Index("ix_change_log_collection_seq", "collection", "seq"),
+        Index("ix_change_log_collection_user_seq", "collection", "user_id", "seq"),
+        Index("ix_change_log_changed_at", "changed_at"),  # retention
+    )
@@ -0,0 +1,9 @@
+# models/data_version.py
+from sqlalchemy import Column, Integer, String
+from core.database import Base
+
+class DataVersion(Base):
+    __tablename__ = "data_versions"
+
+    name = Column(String, primary_key=True)  # table / domain name, e.g. "tasks"
+    version = Column(Integer, nullable=False, default=0)
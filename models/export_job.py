@@ -0,0 +1,23 @@
+# models/export_job.py
+from sqlalchemy import Column, Integer, String, Float, Text, Date, DateTime, ForeignKey
+from core.database import Base
+from utils.timezone import now_ist
+
+class ExportJob(Base):
+    __tablename__ = "export_jobs"
+
+    id = Column(String(32), primary_key=True)  # uuid4 hex
+    kind = Column(String, nullable=False, default="productivity")
+    format = Column(String, nullable=False)
+    start_date = Column(Date, nullable=True)
+    end_date = Column(Date, nullable=True)
+    params_key = Column(String(64), nullable=False, index=True)  # hash of kind/format/range for dedupe
+    data_version = Column(String, nullable=True)  # report source versions the file was built from
+    status = Column(String, default="queued")  # queued / running / done / failed / expired
+    progress = Column(Float, default=0.0)  # 0-1
+    file_path = Column(String, nullable=True)
+    error = Column(Text, nullable=True)
+    requested_by = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    created_at = Column(DateTime(timezone=True), default=now_ist)
+    heartbeat_at = Column(DateTime(timezone=True), nullable=True)  # stamped periodically while running
+    finished_at = Column(DateTime(timezone=True), nullable=True)
@@ -1,5 +1,5 @@
 # models/notification.py
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, Index
 from sqlalchemy.orm import relationship
 from core.database import Base
 from utils.timezone import now_ist
@@ -14,6 +14,12 @@ class Notification(Base):
     message = Column(Text, nullable=True)
     is_read = Column(Boolean, default=False)
     created_at = Column(DateTime(timezone=True), default=now_ist)
+    # "<alert type>:<subject>:<recipient>:<time bucket>" for sweep alerts, NULL for ad-hoc ones
+    dedupe_key = Column(String, nullable=True, unique=True, index=True)
 
     user = relationship("User")
     task = relationship("Task")
+
+    __table_args__ = (
+        Index("ix_notifications_read_created", "is_read", "created_at"),  # retention scan
+    )
@@ -0,0 +1,18 @@
+# models/notification_archive.py
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text
+from core.database import Base
+from utils.timezone import now_ist
+
+class NotificationArchive(Base):
+    __tablename__ = "notifications_archive"
+
+    # same ids as the hot table; no FKs so archived rows outlive their task
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, nullable=True, index=True)
+    task_id = Column(Integer, nullable=True)
+    title = Column(String, nullable=False)
+    message = Column(Text, nullable=True)
+    is_read = Column(Boolean, default=True)
+    created_at = Column(DateTime(timezone=True))
+    dedupe_key = Column(String, nullable=True)
+    archived_at = Column(DateTime(timezone=True), default=now_ist)
@@ -0,0 +1,9 @@
+# models/notification_counter.py
+from sqlalchemy import Column, Integer, ForeignKey
+from core.database import Base
+
+class NotificationCounter(Base):
+    __tablename__ = "notification_counters"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    unread = Column(Integer, nullable=False, default=0)  # maintained on insert / mark-read / delete
@@ -0,0 +1,20 @@
+# models/outbox_event.py
+from sqlalchemy import Column, Integer, String, Text, DateTime, JSON, Index
+from core.database import Base
+from utils.timezone import now_ist
+
+class OutboxEvent(Base):
+    __tablename__ = "outbox_events"
+
+    id = Column(Integer, primary_key=True)
+    event_type = Column(String(64), nullable=False)  # e.g. "tasks.assigned", "leave.decided"
+    payload = Column(JSON, nullable=False)
+    created_at = Column(DateTime(timezone=True), default=now_ist, nullable=False)
+    dispatched_at = Column(DateTime(timezone=True), nullable=True)  # NULL while pending
+    attempts = Column(Integer, nullable=False, default=0)  # failed dispatch attempts
+    last_error = Column(Text, nullable=True)
+    failed_at = Column(DateTime(timezone=True), nullable=True)  # set when attempts reach the limit; no more retries
+
+    __table_args__ = (
+        Index("ix_outbox_events_pending", "dispatched_at", "id"),
+    )
@@ -0,0 +1,13 @@
+# models/task_latest_tracking.py
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from core.database import Base
+
+class TaskLatestTracking(Base):
+    __tablename__ = "task_latest_tracking"  # newest tracking per task, maintained by services.tracking_service
+
+    task_id = Column(Integer, ForeignKey("tasks.id", ondelete="CASCADE"), primary_key=True)
+    tracking_id = Column(Integer, ForeignKey("trackings.id", ondelete="CASCADE"), nullable=False)
+    project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), nullable=True)
+    status = Column(String(50), nullable=False)
+    remarks = Column(String(255))
+    updated_at = Column(DateTime(timezone=True), nullable=False, index=True)
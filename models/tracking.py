@@ -1,5 +1,5 @@
 # models/tracking.py
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey,Float
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey,Float, Index
 from sqlalchemy.orm import relationship
 from core.database import Base
 from utils.timezone import now_ist
@@ -16,3 +16,9 @@ class Tracking(Base):
 
     task = relationship("Task", back_populates="trackings")
     project = relationship("Project", back_populates="trackings")
+
+    __table_args__ = (
+        # timeline pages: newest first per task / project
+        Index("ix_trackings_task_updated", "task_id", "updated_at", "id"),
+        Index("ix_trackings_project_updated", "project_id", "updated_at", "id"),
+    )
@@ -0,0 +1,17 @@
+# models/user_day_fact.py
+from sqlalchemy import Column, Integer, Float, Boolean, Date, DateTime, ForeignKey
+from core.database import Base
+from utils.timezone import now_ist
+
+class UserDayFact(Base):
+    __tablename__ = "user_day_facts"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    day = Column(Date, primary_key=True, index=True)
+    tasks_assigned = Column(Integer, nullable=False, default=0)
+    tasks_completed = Column(Integer, nullable=False, default=0)
+    work_hours = Column(Float, nullable=False, default=0.0)
+    active_minutes = Column(Integer, nullable=False, default=0)
+    idle_minutes = Column(Integer, nullable=False, default=0)
+    on_leave = Column(Boolean, nullable=False, default=False)
+    updated_at = Column(DateTime(timezone=True), default=now_ist, onupdate=now_ist)
@@ -0,0 +1,11 @@
+# models/user_presence.py
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from core.database import Base
+
+class UserPresence(Base):
+    __tablename__ = "user_presence"  # one row per user, written by services.presence_service
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    last_seen_at = Column(DateTime(timezone=True), nullable=False)  # last heartbeat
+    last_active_at = Column(DateTime(timezone=True), nullable=True)  # last heartbeat reporting user input
+    source = Column(String(32), nullable=True)  # "agent", "web", "mobile", ...
@@ -1,11 +1,15 @@
 # routers/alerts_router.py
+from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import delete, update
 from sqlalchemy.orm import Session
 from core.database import get_db
 from utils.security import get_current_user
 from models.user import User
 from models.notification import Notification
 from schemas.notification_schema import NotificationResponse
+from services.unread_service import get_unread_count, apply_unread_deltas
+from services.sync_service import record_changes
 
 router = APIRouter(prefix="/alerts", tags=["Alerts & Notifications"])
 
@@ -15,6 +19,31 @@ def list_my_notifications(db: Session = Depends(get_db), current_user: User = De
     notifs = db.query(Notification).filter(Notification.user_id == current_user.id).order_by(Notification.created_at.desc()).limit(200).all()
     return notifs
 
+@router.put("/read_all", status_code=200)
+def mark_all_read(up_to_id: int | None = None, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    """Mark every unread notification (optionally only ids <= up_to_id) as read in one statement."""
+    stmt = update(Notification).where(Notification.user_id == current_user.id, Notification.is_read == False)
+    if up_to_id is not None:
+        stmt = stmt.where(Notification.id <= up_to_id)
+    ids = db.execute(stmt.values(is_read=True).returning(Notification.id).execution_options(synchronize_session=False)).scalars().all()
+    updated = len(ids)
+    apply_unread_deltas(db, {current_user.id: -updated})
+    record_changes(db, "notifications", {(nid, current_user.id) for nid in ids})
+    db.commit()
+    return {"detail": "ok", "updated": updated}
+
+@router.delete("/", status_code=200)
+def delete_notifications_before(before: datetime, read_only: bool = False, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    """Delete the user's notifications created before `before` in one statement."""
+    stmt = delete(Notification).where(Notification.user_id == current_user.id, Notification.created_at < before)
+    if read_only:
+        stmt = stmt.where(Notification.is_read == True)
+    deleted = db.execute(stmt.returning(Notification.id, Notification.is_read).execution_options(synchronize_session=False)).all()
+    apply_unread_deltas(db, {current_user.id: -sum(1 for r in deleted if not r.is_read)})
+    record_changes(db, "notifications", {(r.id, current_user.id) for r in deleted})
+    db.commit()
+    return {"detail": "deleted", "deleted": len(deleted)}
+
 @router.put("/{nid}/read", status_code=200)
 def mark_notification_read(nid: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
     n = db.query(Notification).filter(Notification.id == nid, Notification.user_id == current_user.id).first()
@@ -35,5 +64,4 @@ def delete_notification(nid: int, db: Session = Depends(get_db), current_user: U
 
 @router.get("/unread_count")
 def unread_count(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    cnt = db.query(Notification).filter(Notification.user_id == current_user.id, Notification.is_read == False).count()
-    return {"unread": cnt}
+    return {"unread": get_unread_count(db, current_user.id)}
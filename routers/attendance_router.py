@@ -1,23 +1,25 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.orm import Session
-from sqlalchemy import func
 from core.database import get_db
 from utils.security import get_current_user
-from utils.timezone import now_ist, today_ist_date
+from utils.timezone import ist_day_bounds, now_ist, today_ist_date, utc_to_ist
 from models.attendance import Attendance
 from models.user import User
-from utils.timezone import now_ist, utc_to_ist
-from schemas.attendance_schema import AttendanceResponse
+from schemas.attendance_schema import AttendanceResponse, TeamTodayEntry, TeamTodayResponse
+from services.attendance_board import BOARD_STATES, attendance_board
+from services.org_service import get_org_index
+from services.report_cache import current_versions
+from utils.http_cache import make_etag, not_modified
 
 router = APIRouter(prefix="/attendance", tags=["Attendance & Time Tracking"])
 
 @router.post("/punch_in", response_model=AttendanceResponse)
 def punch_in(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    today = today_ist_date()
+    start, end = ist_day_bounds(today_ist_date())
 
     record = db.query(Attendance).filter(
         Attendance.user_id == current_user.id,
-        func.date(Attendance.date) == today
+        Attendance.date >= start, Attendance.date < end
     ).first()
 
     if record:
@@ -37,10 +39,10 @@ def punch_in(db: Session = Depends(get_db), current_user: User = Depends(get_cur
 
 @router.put("/punch_out", response_model=AttendanceResponse)
 def punch_out(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    today = today_ist_date()
+    start, end = ist_day_bounds(today_ist_date())
     record = db.query(Attendance).filter(
         Attendance.user_id == current_user.id,
-        func.date(Attendance.date) == today
+        Attendance.date >= start, Attendance.date < end
     ).first()
 
     if not record:
@@ -76,9 +78,15 @@ def get_all_attendance(
 
 @router.get("/me", response_model=list[AttendanceResponse])
 def get_my_attendance(
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
+    # attendance writes bump its data version (table-wide, so other users' punches also revalidate)
+    cached = not_modified(request, response, make_etag("attendance/me", current_user.id, current_versions(db, ("attendance",))))
+    if cached:
+        return cached
     records = db.query(Attendance).filter(Attendance.user_id == current_user.id).all()
     
     # Convert existing UTC times to IST before returning
@@ -86,4 +94,24 @@ def get_my_attendance(
         record.date = utc_to_ist(record.date)
         record.punch_in = utc_to_ist(record.punch_in)
         record.punch_out = utc_to_ist(record.punch_out)
-    return records
\ No newline at end of file
+    return records
+
+@router.get("/team/today", response_model=TeamTodayResponse)
+def team_today(team: str | None = None, department: str | None = None,
+               db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    """Who is in / out / on leave / absent today and their hours so far (defaults to the caller's team)."""
+    if current_user.role_name.lower() not in ["admin", "manager"]:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    org = get_org_index(db)
+    members = org.members_for(team, department, current_user)
+    if members is None:
+        raise HTTPException(status_code=400, detail="Provide team or department")
+
+    attendance_board.ensure_current(db)
+    counts = dict.fromkeys(BOARD_STATES, 0)
+    out = []
+    for entry in attendance_board.entries(members):
+        name, _, dept, tm = org.users[entry["user_id"]]
+        counts[entry["state"]] += 1
+        out.append(TeamTodayEntry(**entry, name=name, department=dept, team=tm))
+    return TeamTodayResponse(day=attendance_board.day, counts=counts, members=sorted(out, key=lambda r: r.name))
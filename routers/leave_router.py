@@ -1,10 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.orm import Session
 from core.database import get_db
 from models.leave import Leave, LeaveStatus
 from models.user import User
 from schemas.leave_schema import LeaveCreate, LeaveUpdate, LeaveResponse
 from utils.security import get_current_user
+from utils.http_cache import make_etag, not_modified
+from services.sync_service import collection_stamp
+from services.outbox_service import emit
 
 router = APIRouter(prefix="/leave", tags=["Leave Management"])
 
@@ -32,9 +35,15 @@ def create_leave(
 
 @router.get("/me", response_model=list[LeaveResponse])
 def get_my_leaves(
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
+    seq, changed_at = collection_stamp(db, "leaves", current_user.id)
+    cached = not_modified(request, response, make_etag("leave/me", current_user.id, seq), changed_at)
+    if cached:
+        return cached
     return db.query(Leave).filter(Leave.user_id == current_user.id).all()
 
 
@@ -66,6 +75,8 @@ def update_leave_status(
         raise HTTPException(status_code=404, detail="Leave not found")
 
     leave.status = update_data.status
+    emit(db, "leave.decided", {"leave_id": leave.id, "user_id": leave.user_id, "status": update_data.status.value,
+                               "start_date": leave.start_date.isoformat(), "end_date": leave.end_date.isoformat()})
     db.commit()
     db.refresh(leave)
     return leave
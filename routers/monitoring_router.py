@@ -1,9 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from core.database import get_db
 from models.monitoring import EmployeeMonitoring
 from schemas.monitoring_schema import MonitoringCreate, MonitoringUpdate, MonitoringResponse
 from utils.security import get_current_user
+from utils.fast_json import list_response, response_columns
 from models.user import User
 
 router = APIRouter(prefix="/monitoring", tags=["Employee Monitoring"])
@@ -68,21 +70,25 @@ def delete_monitoring(
 
 @router.get("/", response_model=list[MonitoringResponse])
 def get_all_monitoring(
+    request: Request,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     if current_user.role_name.lower() not in ["admin", "manager"]:
         raise HTTPException(status_code=403, detail="Only Admin or Manager can view monitoring data")
 
-    return db.query(EmployeeMonitoring).all()
+    stmt = select(*response_columns(EmployeeMonitoring, MonitoringResponse))
+    return list_response(request, db, stmt, MonitoringResponse)
 
 
 @router.get("/me", response_model=list[MonitoringResponse])
 def get_my_monitoring_data(
+    request: Request,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     if current_user.role_name.lower() != "employee":
         raise HTTPException(status_code=403, detail="Only Employees can access their own data")
 
-    return db.query(EmployeeMonitoring).filter(EmployeeMonitoring.user_id == current_user.id).all()
+    stmt = select(*response_columns(EmployeeMonitoring, MonitoringResponse)).where(EmployeeMonitoring.user_id == current_user.id)
+    return list_response(request, db, stmt, MonitoringResponse)
@@ -1,17 +1,21 @@
 # routers/notification_router.py
-from fastapi import APIRouter, Depends
+import json
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from core.database import get_db
+from core.database import get_db, SessionLocal
 from models.notification import Notification
 from schemas.notification_schema import NotificationResponse
-from utils.security import get_current_user
+from services.notification_broker import notification_events
+from utils.security import get_current_user, user_from_token
 from models.user import User
 
 router = APIRouter(prefix="/notifications", tags=["Notifications"])
 
 @router.get("/", response_model=list[NotificationResponse])
-def get_notifications(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    return db.query(Notification).filter(Notification.user_id == current_user.id).order_by(Notification.created_at.desc()).all()
+def get_notifications(limit: int = Query(100, ge=1, le=500),
+                      db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    return db.query(Notification).filter(Notification.user_id == current_user.id).order_by(Notification.created_at.desc()).limit(limit).all()
 
 @router.put("/{nid}/read")
 def mark_read(nid: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
@@ -21,3 +25,48 @@ def mark_read(nid: int, db: Session = Depends(get_db), current_user: User = Depe
         db.commit()
     return {"detail": "ok"}
 
+@router.get("/stream")
+def stream_notifications(last_id: int | None = None,
+                         last_event_id: int | None = Header(None),
+                         db: Session = Depends(get_db),
+                         current_user: User = Depends(get_current_user)):
+    """
+    Server-Sent Events stream of new notifications.
+    Reconnecting clients resume via the Last-Event-ID header (or ?last_id=).
+    """
+    user_id = current_user.id
+    db.close()  # don't hold a pooled connection for the lifetime of the stream
+    resume_from = last_event_id if last_event_id is not None else last_id
+
+    async def events():
+        yield "retry: 3000\n\n"
+        async for p in notification_events(user_id, resume_from):
+            if p is None:
+                yield ": keepalive\n\n"
+            else:
+                yield f"id: {p['id']}\nevent: notification\ndata: {json.dumps(p)}\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@router.websocket("/ws")
+async def notifications_ws(websocket: WebSocket, token: str, last_id: int | None = None):
+    """WebSocket push of new notifications; browsers pass the JWT as ?token=."""
+    db = SessionLocal()
+    try:
+        user_id = user_from_token(token, db).id
+    except HTTPException:
+        await websocket.close(code=1008)
+        return
+    finally:
+        db.close()
+
+    await websocket.accept()
+    try:
+        async for p in notification_events(user_id, last_id):
+            if p is None:
+                await websocket.send_json({"type": "keepalive"})
+            else:
+                await websocket.send_json({"type": "notification", "data": p})
+    except WebSocketDisconnect:
+        pass
@@ -0,0 +1,46 @@
+# routers/presence_router.py
+from datetime import timedelta
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from core.database import get_db
+from models.user import User
+from schemas.presence_schema import Heartbeat, HeartbeatAck, PresenceResponse
+from services.org_service import get_org_index
+from services.presence_service import HEARTBEAT_INTERVAL_SECONDS, get_presence, presence_state, presence_store
+from utils.security import get_current_user
+from utils.timezone import now_ist
+
+router = APIRouter(prefix="/presence", tags=["Presence"])
+
+@router.post("/heartbeat", response_model=HeartbeatAck)
+def heartbeat(data: Heartbeat, current_user: User = Depends(get_current_user)):
+    """Record that the caller's agent/client is running (and whether the user is active). Memory only."""
+    now = now_ist()
+    if data.idle_seconds is not None:
+        active_at = now - timedelta(seconds=data.idle_seconds)
+    else:
+        active_at = now if data.active else None
+    presence_store.heartbeat(current_user.id, active_at, data.source, at=now)
+    return HeartbeatAck(next_heartbeat_seconds=HEARTBEAT_INTERVAL_SECONDS)
+
+@router.get("/team", response_model=list[PresenceResponse])
+def team_presence(team: str | None = None, department: str | None = None,
+                  db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    """Who is online / idle / offline now in a team or department (defaults to the caller's team)."""
+    if current_user.role_name.lower() not in ["admin", "manager"]:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    org = get_org_index(db)
+    members = org.members_for(team, department, current_user)
+    if members is None:
+        raise HTTPException(status_code=400, detail="Provide team or department")
+
+    presence = get_presence(db, members)
+    now = now_ist()
+    out = []
+    for uid in members:
+        name, _, dept, tm = org.users[uid]
+        p = presence.get(uid)
+        out.append(PresenceResponse(user_id=uid, name=name, department=dept, team=tm, state=presence_state(p, now),
+                                    last_seen_at=p and p["last_seen_at"], last_active_at=p and p["last_active_at"],
+                                    source=p and p["source"]))
+    return sorted(out, key=lambda r: r.name)
@@ -1,7 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from core.database import get_db
 from utils.security import get_current_user
+from utils.fast_json import list_response, response_columns
 from models.productivity import Productivity
 from schemas.productivity_schema import ProductivityCreate, ProductivityUpdate, ProductivityResponse
 from models.user import User
@@ -73,19 +75,23 @@ def delete_productivity(
 
 @router.get("/", response_model=list[ProductivityResponse])
 def get_all_productivity(
+    request: Request,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     if current_user.role_name.lower() not in ["admin", "manager"]:
         raise HTTPException(status_code=403, detail="Only Admin or Manager can view all productivity data")
-    return db.query(Productivity).all()
+    stmt = select(*response_columns(Productivity, ProductivityResponse))
+    return list_response(request, db, stmt, ProductivityResponse)
 
 
 @router.get("/me", response_model=list[ProductivityResponse])
 def get_my_productivity(
+    request: Request,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     if current_user.role_name.lower() != "employee":
         raise HTTPException(status_code=403, detail="Only employees can access their productivity data")
-    return db.query(Productivity).filter(Productivity.user_id == current_user.id).all()
+    stmt = select(*response_columns(Productivity, ProductivityResponse)).where(Productivity.user_id == current_user.id)
+    return list_response(request, db, stmt, ProductivityResponse)
@@ -1,11 +1,15 @@
 # routers/project_router.py
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session
 from core.database import get_db
 from models.project import Project
 from models.task import Task
-from schemas.project_schema import ProjectResponse, ProjectUpdate
+from schemas.project_schema import ProjectResponse, ProjectUpdate, ProjectBulkUpdate
+from schemas.task_schema import BulkUpdateResponse
+from services.task_service import bulk_update_status, BULK_TASK_LIMIT
+from services.sync_service import collection_stamp
 from utils.security import get_current_user
+from utils.http_cache import make_etag, not_modified
 from models.user import User
 
 router = APIRouter(prefix="/projects", tags=["Projects"])
@@ -17,9 +21,25 @@ def get_all_projects(db: Session = Depends(get_db), current_user: User = Depends
     return db.query(Project).all()
 
 @router.get("/my", response_model=list[ProjectResponse])
-def get_my_projects(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+def get_my_projects(request: Request, response: Response, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    # the sync log stamp changes whenever a project enters, leaves or changes in this list
+    seq, changed_at = collection_stamp(db, "projects", current_user.id)
+    cached = not_modified(request, response, make_etag("projects/my", current_user.id, seq), changed_at)
+    if cached:
+        return cached
     return db.query(Project).join(Task).filter(Task.assigned_to == current_user.id).all()
 
+@router.put("/bulk", response_model=BulkUpdateResponse)
+def update_projects(data: ProjectBulkUpdate, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    """Close out or move many projects (and their tasks) at once; see PUT /tasks/bulk."""
+    if current_user.role_name.lower() not in ["admin", "manager"]:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    if data.status is None and data.progress is None:
+        raise HTTPException(status_code=400, detail="Provide status or progress")
+    if len(data.project_ids) > BULK_TASK_LIMIT:
+        raise HTTPException(status_code=400, detail=f"At most {BULK_TASK_LIMIT} projects per request")
+    return bulk_update_status(db, project_ids=data.project_ids, status=data.status, progress=data.progress, remarks=data.remarks)
+
 @router.put("/{project_id}", response_model=ProjectResponse)
 def update_project(project_id: int, data: ProjectUpdate, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
     if current_user.role_name.lower() not in ["admin", "manager"]:
@@ -1,12 +1,21 @@
 # routers/reporting_router.py
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import FileResponse, StreamingResponse
 from sqlalchemy.orm import Session
 from core.database import get_db
-from services.report_service import productivity_dataframe, save_dataframe_to_excel, save_dataframe_to_pdf, department_dashboard, ai_suggestions
-from schemas.report_schema import PeriodQuery, ProductivityRow, DashboardResponse, ExportResponse, AISuggestion
+from services.report_service import productivity_dataframe, save_dataframe_to_excel, save_dataframe_to_pdf, department_dashboard, ai_suggestions, _normalize_dates, productivity_query, productivity_export_row, PRODUCTIVITY_HEADERS, previous_period, period_comparison
+from services.stream_export import iter_row_chunks, stream_rows, STREAM_MEDIA_TYPES
+from services.report_cache import report_cache, SUGGESTION_SOURCES
+from services.suggestion_engine import suggestion_rules_version
+from schemas.report_schema import PeriodQuery, ProductivityRow, DashboardResponse, ExportResponse, AISuggestion, ExportJobCreate, ExportJobResponse, ComparisonResponse
+from services.export_service import enqueue_export, EXPORT_EXTENSIONS
+from services.columnar_export import columnar_available, COLUMNAR_FORMATS
+from models.export_job import ExportJob
 from utils.security import get_current_user
+from utils.timezone import today_ist_date
 from models.user import User
-from datetime import datetime, date, timedelta
+from datetime import date, timedelta
+import os
 
 router = APIRouter(prefix="/reports", tags=["Reporting & Analytics"])
 
@@ -20,7 +29,11 @@ def get_productivity(period: str = Query("day", enum=["day","week","month","cust
     Returns productivity rows aggregated by date & user.
     period: day/week/month/custom (use start_date & end_date for custom)
     """
-    df, s, e = productivity_dataframe(db, period, start_date, end_date)
+    s, e = _normalize_dates(period, start_date, end_date)
+    return report_cache.get_or_compute(db, "productivity", s, e, lambda: _productivity_rows(db, s, e))
+
+def _productivity_rows(db: Session, s: date, e: date):
+    df, s, e = productivity_dataframe(db, "custom", s, e)
     # convert to list of dict for Pydantic
     rows = []
     for _, r in df.iterrows():
@@ -41,18 +54,42 @@ def pd_is_na(x):
 
 @router.get("/department", response_model=DashboardResponse)
 def get_department_dashboard(start_date: date | None = None, end_date: date | None = None,
+                             group_by: str = Query("department", enum=["department","team"]),
                              db: Session = Depends(get_db),
                              current_user: User = Depends(get_current_user)):
     if current_user.role_name.lower() not in ["admin","manager"]:
         raise HTTPException(status_code=403, detail="Not authorized")
     # default last month
     if not start_date or not end_date:
-        today = datetime.now().date()
+        today = today_ist_date()
         start_date = (today - timedelta(days=30))
         end_date = today
-    df = department_dashboard(db, start_date, end_date)
-    rows = df.to_dict(orient="records") if not df.empty else []
-    return {"title": f"Department dashboard ({start_date} - {end_date})", "rows": rows}
+    def compute():
+        df = department_dashboard(db, start_date, end_date, dept_field=group_by)
+        return df.to_dict(orient="records") if not df.empty else []
+    rows = report_cache.get_or_compute(db, "department", start_date, end_date, compute, params=(group_by,))
+    label = "Department" if group_by == "department" else "Team"
+    return {"title": f"{label} dashboard ({start_date} - {end_date})", "rows": rows}
+
+@router.get("/compare", response_model=ComparisonResponse)
+def get_period_comparison(period: str = Query("week", enum=["day","week","month","custom"]),
+                          start_date: date | None = None,
+                          end_date: date | None = None,
+                          db: Session = Depends(get_db),
+                          current_user: User = Depends(get_current_user)):
+    """
+    Current period vs the one before it (previous day/week/month, or the same
+    number of days before a custom range), with deltas per user, team and department.
+    """
+    if current_user.role_name.lower() not in ["admin","manager"]:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    s, e = _normalize_dates(period, start_date, end_date)
+    ps, pe = previous_period(period, s, e)
+    result = report_cache.get_or_compute(db, "compare", s, e, lambda: period_comparison(db, s, e, ps, pe), params=(ps, pe))
+    return {"title": f"{s} - {e} vs {ps} - {pe}",
+            "current": {"start_date": s, "end_date": e},
+            "previous": {"start_date": ps, "end_date": pe},
+            **result}
 
 @router.get("/export")
 def export_productivity(format: str = Query("excel", enum=["excel","pdf"]),
@@ -68,7 +105,7 @@ def export_productivity(format: str = Query("excel", enum=["excel","pdf"]),
         raise HTTPException(status_code=403, detail="Not authorized")
     df, s, e = productivity_dataframe(db, period, start_date, end_date)
     # small transform
-    df_out = df.rename(columns={"date":"Date","user_id":"User ID","user_name":"User Name","tasks_assigned":"Tasks Assigned","tasks_completed":"Tasks Completed","completion_rate":"Completion %","work_hours":"Work Hours"})
+    df_out = df.rename(columns=PRODUCTIVITY_HEADERS)
     if format == "excel":
         fname = f"productivity_{s}_{e}.xlsx"
         path = save_dataframe_to_excel(df_out, fname)
@@ -77,18 +114,90 @@ def export_productivity(format: str = Query("excel", enum=["excel","pdf"]),
         path = save_dataframe_to_pdf(df_out, fname, title=f"Productivity {s} to {e}")
     return {"download_path": path}
 
+@router.get("/export/stream")
+def stream_productivity_export(format: str = Query("csv", enum=["csv","ndjson","xlsx"]),
+                               period: str = Query("day", enum=["day","week","month","custom"]),
+                               start_date: date | None = None,
+                               end_date: date | None = None,
+                               current_user: User = Depends(get_current_user)):
+    """
+    Stream productivity rows as CSV, NDJSON or XLSX straight from a server-side
+    cursor; memory stays flat regardless of the number of rows.
+    """
+    if current_user.role_name.lower() not in ["admin","manager"]:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    s, e = _normalize_dates(period, start_date, end_date)
+    chunks = iter_row_chunks(productivity_query(s, e), transform=productivity_export_row)
+    body = stream_rows(format, list(PRODUCTIVITY_HEADERS.values()), chunks, sheet_title=f"Productivity {s} to {e}")
+    return StreamingResponse(body, media_type=STREAM_MEDIA_TYPES[format],
+                             headers={"Content-Disposition": f'attachment; filename="productivity_{s}_{e}.{format}"'})
+
+def _job_response(job: ExportJob):
+    out = ExportJobResponse.model_validate(job)
+    if job.status == "done":
+        out.download_url = f"/reports/exports/{job.id}/download"
+    return out
+
+def _get_job(db: Session, job_id: str) -> ExportJob:
+    job = db.query(ExportJob).filter(ExportJob.id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Export job not found")
+    return job
+
+@router.post("/exports", response_model=ExportJobResponse, status_code=202)
+def create_export_job(payload: ExportJobCreate,
+                      db: Session = Depends(get_db),
+                      current_user: User = Depends(get_current_user)):
+    """
+    Queue an export. excel/pdf cover productivity; parquet/arrow produce a zip of
+    a date-partitioned dataset for productivity, department, attendance,
+    monitoring or activity (raw productivity) data.
+    Poll GET /reports/exports/{id} and download from /reports/exports/{id}/download once done.
+    """
+    if current_user.role_name.lower() not in ["admin","manager"]:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    if payload.format not in EXPORT_EXTENSIONS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {list(EXPORT_EXTENSIONS)}")
+    if payload.format in COLUMNAR_FORMATS and not columnar_available():
+        raise HTTPException(status_code=501, detail="Parquet/Arrow exports are not available on this server")
+    try:
+        job = enqueue_export(db, current_user.id, payload.format, payload.period, payload.start_date, payload.end_date, kind=payload.kind)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    return _job_response(job)
+
+@router.get("/exports/{job_id}", response_model=ExportJobResponse)
+def get_export_job(job_id: str, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    if current_user.role_name.lower() not in ["admin","manager"]:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    return _job_response(_get_job(db, job_id))
+
+@router.get("/exports/{job_id}/download")
+def download_export_job(job_id: str, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    if current_user.role_name.lower() not in ["admin","manager"]:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    job = _get_job(db, job_id)
+    if job.status != "done" or not job.file_path:
+        raise HTTPException(status_code=409, detail=f"Export is {job.status}")
+    return FileResponse(job.file_path, filename=os.path.basename(job.file_path).replace(f"_{job.id}", ""))
+
 @router.get("/ai_suggestions", response_model=list[AISuggestion])
 def get_ai_suggestions(start_date: date | None = None, end_date: date | None = None,
+                       top_n: int = Query(10, ge=1, le=1000),
                        db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    """Most severe rule matches across the org for the period (default: last 30 days)."""
     if current_user.role_name.lower() not in ["admin","manager"]:
         raise HTTPException(status_code=403, detail="Not authorized")
     if not start_date or not end_date:
-        today = datetime.now().date()
+        today = today_ist_date()
         start_date = today - timedelta(days=30)
         end_date = today
-    suggestions = ai_suggestions(db, start_date, end_date)
-    # map to AISuggestion
-    out = []
-    for s in suggestions:
-        out.append({"user_id": s["user_id"], "user_name": s["user_name"], "suggestion": s["suggestion"], "reason": s["reason"]})
-    return out
+    return report_cache.get_or_compute(db, "ai_suggestions", start_date, end_date,
+                                       lambda: ai_suggestions(db, start_date, end_date, top_n),
+                                       params=(top_n, suggestion_rules_version()), sources=SUGGESTION_SOURCES)
+
+@router.get("/cache_stats")
+def get_report_cache_stats(current_user: User = Depends(get_current_user)):
+    if current_user.role_name.lower() not in ["admin","manager"]:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    return report_cache.stats()
@@ -0,0 +1,22 @@
+# routers/sync_router.py
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from core.database import get_db
+from models.user import User
+from schemas.sync_schema import SyncResponse
+from services.sync_service import sync_collection
+from utils.security import get_current_user
+
+router = APIRouter(prefix="/sync", tags=["Sync"])
+
+@router.get("/", response_model=SyncResponse, response_model_exclude_unset=True)
+def sync(tasks: int | None = Query(None, ge=0), projects: int | None = Query(None, ge=0),
+         leaves: int | None = Query(None, ge=0), notifications: int | None = Query(None, ge=0),
+         db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    """
+    Delta sync. Pass the last cursor per collection (0 for a first sync); only
+    the collections passed are returned. Each gets the rows created or updated
+    since the cursor, tombstones for removed ids and the next cursor.
+    """
+    cursors = {"tasks": tasks, "projects": projects, "leaves": leaves, "notifications": notifications}
+    return {name: sync_collection(db, name, current_user, cursor) for name, cursor in cursors.items() if cursor is not None}
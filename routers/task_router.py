@@ -1,13 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.orm import Session
 from core.database import get_db
 from models.task import Task
 from models.project import Project
-from schemas.task_schema import TaskCreate, TaskResponse, TaskUpdate
+from schemas.task_schema import TaskCreate, TaskResponse, TaskUpdate, TaskBulkCreate, TaskBulkResponse, TaskBulkUpdate, BulkUpdateResponse
+from services.task_service import create_task as create_task_in_tx, create_tasks_bulk, bulk_update_status, BULK_TASK_LIMIT
+from services.outbox_service import emit, task_ref
 from utils.security import get_current_user
+from utils.http_cache import not_modified, row_etag
 from models.user import User
-from models.notification import Notification
-from utils.timezone import now_ist
 
 router = APIRouter(prefix="/tasks", tags=["Tasks"])
 
@@ -22,41 +23,28 @@ def create_task(
     if current_user.role_name.lower() not in ["admin", "manager"]:
         raise HTTPException(status_code=403, detail="Only Admin or Manager can create tasks")
 
-    # create task
-    task = Task(
-        title=task_in.title,
-        description=task_in.description,
-        due_date=task_in.due_date,
-        created_by=current_user.id,
-        assigned_to=task_in.assigned_to
-    )
-    db.add(task)
-    db.commit()
-    db.refresh(task)
+    # task, linked project and assignee notification in one transaction
+    return create_task_in_tx(db, task_in, current_user.id)
 
-    # create linked project
-    proj = Project(
-        task_id=task.id,
-        project_name=task.title,
-        progress=task.progress,
-        status=task.status
-    )
-    db.add(proj)
-    db.commit()
 
-    # ✅ create notification for the assigned user
-    if task.assigned_to:
-        notification = Notification(
-            user_id=task.assigned_to,
-            task_id=task.id,
-            title="New Task Assigned",
-            message=f"You have been assigned a new task: '{task.title}'",
-            created_at=now_ist()
-        )
-        db.add(notification)
-        db.commit()
+# 🟢 Bulk Create Tasks - Only Admin or Manager
+@router.post("/bulk", response_model=TaskBulkResponse)
+def create_tasks(
+    payload: TaskBulkCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Create many tasks (with projects and notifications) in one transaction.
+    Invalid items are skipped and listed in `errors` by their index in the request.
+    """
+    if current_user.role_name.lower() not in ["admin", "manager"]:
+        raise HTTPException(status_code=403, detail="Only Admin or Manager can create tasks")
+    if len(payload.tasks) > BULK_TASK_LIMIT:
+        raise HTTPException(status_code=400, detail=f"At most {BULK_TASK_LIMIT} tasks per request")
 
-    return task
+    created, errors = create_tasks_bulk(db, payload.tasks, current_user.id)
+    return {"created": created, "errors": errors}
 
 
 # 🟡 Get Tasks - Admin/Manager see all, Employee sees only their assigned
@@ -76,6 +64,8 @@ def get_tasks(
 @router.get("/{task_id}", response_model=TaskResponse)
 def get_task(
     task_id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -85,11 +75,36 @@ def get_task(
 
     # permission check
     if current_user.role_name.lower() in ["admin", "manager"] or t.assigned_to == current_user.id:
+        cached = not_modified(request, response, row_etag(t, TaskResponse.model_fields))
+        if cached:
+            return cached
         return t
 
     raise HTTPException(status_code=403, detail="Not authorized")
 
 
+# 🟠 Bulk Update Task Status/Progress - Only Admin or Manager
+@router.put("/bulk", response_model=BulkUpdateResponse)
+def update_tasks(
+    data: TaskBulkUpdate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Set status and/or progress on many tasks and their projects in one
+    transaction; a tracking entry is recorded per project and each assignee
+    gets one notification.
+    """
+    if current_user.role_name.lower() not in ["admin", "manager"]:
+        raise HTTPException(status_code=403, detail="Only Admin or Manager can update tasks")
+    if data.status is None and data.progress is None:
+        raise HTTPException(status_code=400, detail="Provide status or progress")
+    if len(data.task_ids) > BULK_TASK_LIMIT:
+        raise HTTPException(status_code=400, detail=f"At most {BULK_TASK_LIMIT} tasks per request")
+
+    return bulk_update_status(db, task_ids=data.task_ids, status=data.status, progress=data.progress, remarks=data.remarks)
+
+
 # 🟠 Update Task - Only Admin or Manager
 @router.put("/{task_id}", response_model=TaskResponse)
 def update_task(
@@ -108,28 +123,18 @@ def update_task(
     # update fields
     for k, v in data.dict(exclude_unset=True).items():
         setattr(task, k, v)
-    db.commit()
-    db.refresh(task)
 
     # sync project
     project = db.query(Project).filter(Project.task_id == task.id).first()
     if project:
         project.progress = task.progress
         project.status = task.status
-        db.commit()
 
-    # ✅ notify employee about task update
+    # ✅ notify employee about task update (dispatched from the outbox after commit)
     if task.assigned_to:
-        notification = Notification(
-            user_id=task.assigned_to,
-            task_id=task.id,
-            title="Task Updated",
-            message=f"Task '{task.title}' has been updated. Current status: {task.status}",
-            created_at=now_ist()
-        )
-        db.add(notification)
-        db.commit()
-
+        emit(db, "tasks.updated", {"status": None, "tasks": [task_ref(task)]})
+    db.commit()
+    db.refresh(task)
     return task
 
 
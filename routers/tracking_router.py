@@ -1,11 +1,14 @@
 # routers/tracking_router.py
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from core.database import get_db
 from models.tracking import Tracking
 from models.task import Task
 from models.project import Project
-from schemas.tracking_schema import TrackingCreate, TrackingResponse, TrackingUpdate
+from models.task_latest_tracking import TaskLatestTracking
+from schemas.tracking_schema import TrackingCreate, TrackingResponse, TrackingUpdate, TrackingPage, LatestTrackingResponse
+from services.tracking_service import TIMELINE_PAGE_SIZE, tracking_timeline
+from services.outbox_service import emit
 from utils.security import get_current_user
 from models.user import User
 
@@ -29,21 +32,18 @@ def create_tracking(payload: TrackingCreate, db: Session = Depends(get_db), curr
 
     tr = Tracking(task_id=payload.task_id, project_id=payload.project_id, status=payload.status, remarks=payload.remarks)
     db.add(tr)
-    db.commit()
-    db.refresh(tr)
 
-    # sync to task/project
+    # sync to task/project in the same transaction
     if tr.task_id:
-        t.status = float(tr.status) if tr.status.replace('.','',1).isdigit() else t.status
         t.status = tr.status
-        db.commit()
     if tr.project_id:
-        p = db.query(Project).filter(Project.id == tr.project_id).first()
-        if p:
-            p.status = float(tr.status) if tr.status.replace('.','',1).isdigit() else p.status
-            p.status = tr.status
-            db.commit()
-
+        p.status = tr.status
+    db.flush()
+    if tr.task_id:
+        emit(db, "tracking.recorded", {"tracking_id": tr.id, "task_id": t.id, "project_id": tr.project_id, "title": t.title,
+                                       "status": tr.status, "remarks": tr.remarks, "assigned_to": t.assigned_to})
+    db.commit()
+    db.refresh(tr)
     return tr
 
 @router.put("/{tracking_id}", response_model=TrackingResponse)
@@ -71,3 +71,49 @@ def update_tracking(tracking_id: int, data: TrackingUpdate, db: Session = Depend
             db.commit()
 
     return tr
+
+def _timeline_page(db: Session, limit: int, cursor: str | None, **target) -> TrackingPage:
+    try:
+        items, next_cursor = tracking_timeline(db, limit=limit, cursor=cursor, **target)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return TrackingPage(items=items, next_cursor=next_cursor)
+
+@router.get("/task/{task_id}", response_model=TrackingPage)
+def task_timeline(task_id: int, limit: int = Query(TIMELINE_PAGE_SIZE, ge=1, le=500), cursor: str | None = None,
+                  db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    """Tracking history of a task, newest first; pass next_cursor back to get the following page."""
+    t = db.query(Task).filter(Task.id == task_id).first()
+    if not t:
+        raise HTTPException(404, "Task not found")
+    if current_user.role_name.lower() not in ["admin", "manager"] and t.assigned_to != current_user.id:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    return _timeline_page(db, limit, cursor, task_id=task_id)
+
+@router.get("/project/{project_id}", response_model=TrackingPage)
+def project_timeline(project_id: int, limit: int = Query(TIMELINE_PAGE_SIZE, ge=1, le=500), cursor: str | None = None,
+                     db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    """Tracking history of a project, newest first; pass next_cursor back to get the following page."""
+    p = db.query(Project).filter(Project.id == project_id).first()
+    if not p:
+        raise HTTPException(404, "Project not found")
+    if current_user.role_name.lower() not in ["admin", "manager"]:
+        t = db.query(Task).filter(Task.id == p.task_id).first()
+        if not t or t.assigned_to != current_user.id:
+            raise HTTPException(status_code=403, detail="Not authorized")
+    return _timeline_page(db, limit, cursor, project_id=project_id)
+
+@router.get("/latest", response_model=list[LatestTrackingResponse])
+def latest_trackings(user_id: int | None = None, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    """Current tracking status of every task assigned to the user (managers may pass user_id)."""
+    if user_id is not None and user_id != current_user.id and current_user.role_name.lower() not in ["admin", "manager"]:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    uid = user_id if user_id is not None else current_user.id
+    rows = db.query(TaskLatestTracking, Task.title, Task.status).join(Task, TaskLatestTracking.task_id == Task.id).filter(
+        Task.assigned_to == uid
+    ).order_by(TaskLatestTracking.updated_at.desc()).all()
+    return [
+        LatestTrackingResponse(task_id=lt.task_id, task_title=title, task_status=status, tracking_id=lt.tracking_id,
+                               project_id=lt.project_id, status=lt.status, remarks=lt.remarks, updated_at=lt.updated_at)
+        for lt, title, status in rows
+    ]
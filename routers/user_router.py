@@ -1,10 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.orm import Session
 from fastapi.security import OAuth2PasswordRequestForm
 from core.database import get_db
 from schemas.user_schema import UserCreate, UserResponse
 from services.user_service import create_user, authenticate_user
 from utils.security import get_current_user
+from utils.http_cache import not_modified, row_etag
 from models.user import User
 
 router = APIRouter(prefix="/users", tags=["Users"])
@@ -27,7 +28,10 @@ def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depend
 
 
 @router.get("/profile", response_model=UserResponse)
-def get_profile(current_user: User = Depends(get_current_user)):
+def get_profile(request: Request, response: Response, current_user: User = Depends(get_current_user)):
+    cached = not_modified(request, response, row_etag(current_user, UserResponse.model_fields))
+    if cached:
+        return cached
     return current_user
 
 @router.get("/department_team")
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from datetime import datetime
+from datetime import date, datetime
 
 class AttendanceBase(BaseModel):
     date: datetime | None = None
@@ -18,3 +18,18 @@ class AttendanceResponse(AttendanceBase):
 
     class Config:
         orm_mode = True
+
+class TeamTodayEntry(BaseModel):
+    user_id: int
+    name: str
+    team: str | None = None
+    department: str | None = None
+    state: str                      # in / out / on_leave / absent
+    punch_in: datetime | None = None
+    punch_out: datetime | None = None
+    hours_so_far: float = 0.0
+
+class TeamTodayResponse(BaseModel):
+    day: date
+    counts: dict[str, int]
+    members: list[TeamTodayEntry]
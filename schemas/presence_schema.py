@@ -0,0 +1,21 @@
+# schemas/presence_schema.py
+from pydantic import BaseModel, Field
+from datetime import datetime
+
+class Heartbeat(BaseModel):
+    active: bool = True                                 # user input since the previous heartbeat
+    idle_seconds: int | None = Field(None, ge=0)        # seconds since the last input, when the agent knows it
+    source: str | None = Field(None, max_length=32)     # "agent", "web", "mobile", ...
+
+class HeartbeatAck(BaseModel):
+    next_heartbeat_seconds: int
+
+class PresenceResponse(BaseModel):
+    user_id: int
+    name: str
+    department: str | None = None
+    team: str | None = None
+    state: str                                          # online / idle / offline
+    last_seen_at: datetime | None = None
+    last_active_at: datetime | None = None
+    source: str | None = None
@@ -1,5 +1,5 @@
 # schemas/project_schema.py
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
 
 class ProjectBase(BaseModel):
@@ -18,3 +18,9 @@ class ProjectResponse(ProjectBase):
 
     class Config:
         from_attributes = True
+
+class ProjectBulkUpdate(BaseModel):
+    project_ids: list[int]
+    status: str | None = None
+    progress: float | None = Field(None, ge=0, le=100)
+    remarks: str | None = None  # stored on the tracking entries
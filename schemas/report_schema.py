@@ -24,6 +24,18 @@ class DashboardResponse(BaseModel):
     title: str
     rows: List[dict]
 
+class PeriodRange(BaseModel):
+    start_date: date
+    end_date: date
+
+class ComparisonResponse(BaseModel):
+    title: str
+    current: PeriodRange
+    previous: PeriodRange
+    users: List[dict]
+    teams: List[dict]
+    departments: List[dict]
+
 class ExportResponse(BaseModel):
     download_path: str
 
@@ -32,3 +44,26 @@ class AISuggestion(BaseModel):
     user_name: str | None
     suggestion: str
     reason: str
+    rule_id: str | None = None
+    severity: float | None = None
+
+class ExportJobCreate(BaseModel):
+    format: str = "excel"  # excel, pdf, parquet, arrow
+    kind: str = "productivity"  # productivity; parquet/arrow also: department, attendance, monitoring, activity
+    period: str | None = "day"
+    start_date: date | None = None
+    end_date: date | None = None
+
+class ExportJobResponse(BaseModel):
+    id: str
+    kind: str
+    format: str
+    status: str
+    progress: float
+    error: str | None = None
+    created_at: datetime
+    finished_at: datetime | None = None
+    download_url: str | None = None
+
+    class Config:
+        from_attributes = True
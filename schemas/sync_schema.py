@@ -0,0 +1,22 @@
+# schemas/sync_schema.py
+from typing import Generic, TypeVar
+from pydantic import BaseModel
+from schemas.task_schema import TaskResponse
+from schemas.project_schema import ProjectResponse
+from schemas.leave_schema import LeaveResponse
+from schemas.notification_schema import NotificationResponse
+
+T = TypeVar("T")
+
+class SyncPage(BaseModel, Generic[T]):
+    cursor: int                 # send back as this collection's cursor next time
+    reset: bool = False         # full snapshot: replace the local copy
+    has_more: bool = False      # more changes pending; call again with cursor
+    upserts: list[T] = []
+    deleted: list[int] = []     # ids removed from the collection (deleted or no longer visible)
+
+class SyncResponse(BaseModel):
+    tasks: SyncPage[TaskResponse] | None = None
+    projects: SyncPage[ProjectResponse] | None = None
+    leaves: SyncPage[LeaveResponse] | None = None
+    notifications: SyncPage[NotificationResponse] | None = None
@@ -1,5 +1,5 @@
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
 
 class TaskBase(BaseModel):
@@ -28,3 +28,30 @@ class TaskResponse(TaskBase):
 
     class Config:
         from_attributes = True
+
+class TaskBulkCreate(BaseModel):
+    tasks: list[TaskCreate]
+
+class TaskBulkError(BaseModel):
+    index: int
+    detail: str
+
+class TaskBulkResponse(BaseModel):
+    created: list[TaskResponse]
+    errors: list[TaskBulkError]
+
+class TaskBulkUpdate(BaseModel):
+    task_ids: list[int]
+    status: str | None = None
+    progress: float | None = Field(None, ge=0, le=100)
+    remarks: str | None = None  # stored on the tracking entries
+
+class BulkUpdateError(BaseModel):
+    id: int
+    detail: str
+
+class BulkUpdateResponse(BaseModel):
+    tasks: list[int]
+    projects: list[int]
+    trackings: int
+    errors: list[BulkUpdateError]
@@ -22,3 +22,17 @@ class TrackingResponse(TrackingBase):
 
     class Config:
         from_attributes = True
+
+class TrackingPage(BaseModel):
+    items: list[TrackingResponse]
+    next_cursor: str | None = None
+
+class LatestTrackingResponse(BaseModel):
+    task_id: int
+    task_title: str
+    task_status: str
+    tracking_id: int
+    project_id: int | None
+    status: str
+    remarks: str | None = None
+    updated_at: datetime
@@ -4,11 +4,20 @@ from datetime import timedelta
 from sqlalchemy.orm import Session
 from core.database import SessionLocal
 from utils.timezone import now_ist
-from models.user import User
 from models.task import Task
-from models.tracking import Tracking
-from models.attendance import Attendance
-from models.notification import Notification
+from services.org_service import get_org_index
+from services.anomaly_service import detect_completion_anomalies
+from services.notification_service import bulk_insert_notifications, dedupe_key
+from services.unread_service import unread_reconcile_loop
+from services.retention_service import notification_retention_loop
+from services.fact_service import facts_catchup_loop
+from services.export_service import export_cleanup_loop
+from services.tracking_service import latest_tracking_backfill
+from services.sync_service import change_log_retention_loop
+from services.outbox_service import outbox_dispatch_loop
+from services.attendance_board import attendance_board_startup
+from services.presence_service import get_presence, inactive_since, presence_flush_loop, presence_state
+from utils.db_timing import track_db_time
 
 
 IDLE_THRESHOLD_MINUTES = 30           
@@ -18,89 +27,62 @@ DEADLINE_WINDOW_MINUTES = 60 * 6
 DEADLINE_CHECK_INTERVAL_SECONDS = 300 
 
 ANOMALY_LOOKBACK_DAYS = 14           
-ANOMALY_DROP_PERCENT = 50.0          
+ANOMALY_RECENT_DAYS = 7               # compared against the days before it
+ANOMALY_METHOD = "zscore"             # "zscore" or "ewma"
+ANOMALY_SENSITIVITY = 2.0             # flag when the recent mean is this many std below baseline
+ANOMALY_EWMA_SPAN = 7
 ANOMALY_CHECK_INTERVAL_SECONDS = 1800 
 
 def get_session():
     return SessionLocal()
 
-def _create_notification(db: Session, user_id: int | None, task_id: int | None, title: str, message: str):
-    n = Notification(user_id=user_id, task_id=task_id, title=title, message=message)
-    db.add(n)
-    db.commit()
-
 async def idle_check_loop():
     """
-    Detect idle employees. Last activity comes from:
-      - latest Tracking.updated_at (if exists)
-      - latest Task.updated_at or Task.created_at if updated_at missing
-      - Attendance.punch_in (if still punched in and no punch_out) — consider active
-    If last_activity older than threshold -> notify employee and manager.
+    Detect idle employees from heartbeat presence (services.presence_service):
+    an employee whose agent/client is online but who has had no input for
+    IDLE_THRESHOLD_MINUTES is idle. Employees without a running agent (offline)
+    are not alerted. Reads one presence row per employee, no history tables.
+    If idle -> notify employee and manager.
     """
     while True:
         try:
-            db = get_session()
-            now = now_ist()
-            idle_threshold = now - timedelta(minutes=IDLE_THRESHOLD_MINUTES)
-
-            
-            users = db.query(User).filter(User.is_active == True).all()
-            for u in users:
-                
-                if u.role and u.role.lower() in ("admin","manager"):
-                    continue
-
-                
-                last_tracking = db.query(Tracking).filter(Tracking.task_id.isnot(None)).join(Task, Tracking.task_id==Task.id).filter(
-                    (Task.assigned_to == u.id) | (Task.created_by == u.id)
-                ).order_by(Tracking.updated_at.desc()).first()
-
-                last_task = db.query(Task).filter((Task.assigned_to == u.id) | (Task.created_by == u.id)).order_by(Task.created_at.desc()).first()
-
-                last_att = db.query(Attendance).filter(Attendance.user_id == u.id).order_by(Attendance.date.desc()).first()
-
-                candidates = []
-                if last_tracking and last_tracking.updated_at:
-                    candidates.append(last_tracking.updated_at)
-                if last_task and last_task.created_at:
-                    candidates.append(last_task.created_at)
-                if last_att and last_att.punch_in:
-                    
-                    if last_att.punch_out is None:
-                        candidates.append(last_att.punch_in)
-                    else:
-                        
-                        candidates.append(last_att.punch_out)
-
-                if not candidates:
-                    last_activity = None
-                else:
-                    last_activity = max(candidates)
-
-                if last_activity is None or last_activity < idle_threshold:
-                   
-                    exists = db.query(Notification).filter(Notification.user_id == u.id, Notification.title.ilike("%idle%")).order_by(Notification.created_at.desc()).first()
-                    create_it = True
-                    if exists:
-                        
-                        if (now - exists.created_at).total_seconds() < IDLE_THRESHOLD_MINUTES * 60:
-                            create_it = False
-
-                    if create_it:
+            with track_db_time("idle_check") as timer:
+                db = get_session()
+                now = now_ist()
+                idle_threshold = now - timedelta(minutes=IDLE_THRESHOLD_MINUTES)
+                bucket = IDLE_THRESHOLD_MINUTES * 60
+                rows = []
+                org = get_org_index(db)
+
+                employees = [uid for uid, (_, role_name, _, _) in org.users.items()
+                             if not (role_name and role_name.lower() in ("admin", "manager"))]
+                presence = get_presence(db, employees)
+                for uid in employees:
+                    p = presence.get(uid)
+                    if presence_state(p, now) == "offline":
+                        continue
+                    u_name = org.users[uid][0]
+                    last_activity = p["last_active_at"]
+
+                    if inactive_since(p, idle_threshold):
+                        # the dedupe key's time bucket replaces the old "alerted recently?" lookup
                         title = "Idle-time alert"
                         if last_activity:
                             msg = f"No activity detected since {last_activity.isoformat()}. You've been idle for over {IDLE_THRESHOLD_MINUTES} minutes."
                         else:
-                            msg = f"No recorded activity found. Please update task progress / punch-in. Idle threshold: {IDLE_THRESHOLD_MINUTES} minutes."
-                        _create_notification(db, user_id=u.id, task_id=None, title=title, message=msg)
-
-                        # Also notify manager(s)
-                        managers = db.query(User).filter(User.role.ilike("manager")).all()
-                        for m in managers:
-                            mmsg = f"Employee {u.name} (id: {u.id}) appears idle. Last activity: {last_activity.isoformat() if last_activity else 'No record'}."
-                            _create_notification(db, user_id=m.id, task_id=None, title=f"Employee idle: {u.name}", message=mmsg)
-
-            db.close()
+                            msg = f"No activity recorded since your agent started. Idle threshold: {IDLE_THRESHOLD_MINUTES} minutes."
+                        rows.append({"user_id": uid, "title": title, "message": msg,
+                                     "dedupe_key": dedupe_key("idle", f"user:{uid}", uid, bucket, now)})
+
+                        # Also notify the employee's department/team manager(s)
+                        mmsg = f"Employee {u_name} (id: {uid}) appears idle. Last activity: {last_activity.isoformat() if last_activity else 'No record'}."
+                        for mid in org.managers_for(uid):
+                            rows.append({"user_id": mid, "title": f"Employee idle: {u_name}", "message": mmsg,
+                                         "dedupe_key": dedupe_key("idle", f"user:{uid}", mid, bucket, now)})
+
+                inserted = bulk_insert_notifications(db, rows)
+                db.close()
+            timer.report(candidates=len(rows), inserted=inserted)
         except Exception as exc:
             print("idle_check_loop error:", exc)
         await asyncio.sleep(IDLE_CHECK_INTERVAL_SECONDS)
@@ -112,34 +94,38 @@ async def deadline_check_loop():
     """
     while True:
         try:
-            db = get_session()
-            now = now_ist()
-            soon = now + timedelta(minutes=DEADLINE_WINDOW_MINUTES)
-
-            
-            tasks = db.query(Task).filter(Task.due_date.isnot(None), Task.due_date <= soon, Task.due_date >= now, Task.status.ilike("%completed%") == False).all()
-            for t in tasks:
-                
-                exists = db.query(Notification).filter(Notification.task_id == t.id, Notification.title.ilike("%due%")).order_by(Notification.created_at.desc()).first()
-                create_it = True
-                if exists and (now - exists.created_at).total_seconds() < DEADLINE_WINDOW_MINUTES * 0.5:  # don't re-alert too often
-                    create_it = False
-
-                if create_it:
-                    
+            with track_db_time("deadline_check") as timer:
+                db = get_session()
+                now = now_ist()
+                soon = now + timedelta(minutes=DEADLINE_WINDOW_MINUTES)
+                bucket = int(DEADLINE_WINDOW_MINUTES * 60 * 0.5)  # don't re-alert too often
+                rows = []
+                org = get_org_index(db)
+
+
+                tasks = db.query(Task).filter(Task.due_date.isnot(None), Task.due_date <= soon, Task.due_date >= now, Task.status.ilike("%completed%") == False).all()
+                for t in tasks:
+                    subject = f"task:{t.id}"
+
                     if t.assigned_to:
                         msg = f"Task '{t.title}' is due at {t.due_date.isoformat()}. Please complete or request extension."
-                        _create_notification(db, user_id=t.assigned_to, task_id=t.id, title="Task due soon", message=msg)
-
-                    
-                    if t.created_by:
-                        _create_notification(db, user_id=t.created_by, task_id=t.id, title="Task due soon (created)", message=f"Task '{t.title}' you created is due at {t.due_date.isoformat()}.")
+                        rows.append({"user_id": t.assigned_to, "task_id": t.id, "title": "Task due soon", "message": msg,
+                                     "dedupe_key": dedupe_key("due", subject, t.assigned_to, bucket, now)})
 
-                    managers = db.query(User).filter(User.role.ilike("manager")).all()
-                    for m in managers:
-                        _create_notification(db, user_id=m.id, task_id=t.id, title=f"Task due soon: {t.title}", message=f"Task '{t.title}' assigned to user_id={t.assigned_to} is due at {t.due_date.isoformat()}.")
 
-            db.close()
+                    if t.created_by:
+                        rows.append({"user_id": t.created_by, "task_id": t.id, "title": "Task due soon (created)",
+                                     "message": f"Task '{t.title}' you created is due at {t.due_date.isoformat()}.",
+                                     "dedupe_key": dedupe_key("due_created", subject, t.created_by, bucket, now)})
+
+                    for mid in org.managers_for(t.assigned_to or t.created_by):
+                        rows.append({"user_id": mid, "task_id": t.id, "title": f"Task due soon: {t.title}",
+                                     "message": f"Task '{t.title}' assigned to user_id={t.assigned_to} is due at {t.due_date.isoformat()}.",
+                                     "dedupe_key": dedupe_key("due_manager", subject, mid, bucket, now)})
+
+                inserted = bulk_insert_notifications(db, rows)
+                db.close()
+            timer.report(candidates=len(rows), inserted=inserted)
         except Exception as exc:
             print("deadline_check_loop error:", exc)
         await asyncio.sleep(DEADLINE_CHECK_INTERVAL_SECONDS)
@@ -147,48 +133,40 @@ async def deadline_check_loop():
 
 async def anomaly_check_loop():
     """
-    Detect simple performance anomalies:
-     - compare completion counts in two windows of equal length inside the lookback window
-     - if completion drops by >= ANOMALY_DROP_PERCENT for a user, notify all managers
+    Detect performance anomalies in task completion:
+     - fetch per-user daily completion counts for the lookback window in one grouped query
+     - score every employee at once against a z-score or EWMA baseline (services.anomaly_service)
+     - notify each flagged user's managers, most severe drops first
     """
     while True:
         try:
-            db = get_session()
-            from datetime import datetime, timedelta
-            now = now_ist()
-            lookback = timedelta(days=ANOMALY_LOOKBACK_DAYS)
-            window = lookback / 2
-            end_recent = now
-            start_recent = now - window
-            end_prev = start_recent
-            start_prev = end_prev - window
-
-            
-            users = db.query(User).filter(User.is_active == True).all()
-            for u in users:
-                if u.role and u.role.lower() in ("admin","manager"):
-                    continue
-                recent_count = db.query(Task).filter(Task.assigned_to == u.id, Task.status.ilike("%completed%"), Task.created_at >= start_recent, Task.created_at <= end_recent).count()
-                prev_count = db.query(Task).filter(Task.assigned_to == u.id, Task.status.ilike("%completed%"), Task.created_at >= start_prev, Task.created_at <= end_prev).count()
-
-                
-                if prev_count == 0:
-                    continue
-                drop_pct = (1 - (recent_count / prev_count)) * 100.0 if prev_count > 0 else 0.0
-                if drop_pct >= ANOMALY_DROP_PERCENT:
-                    
-                    managers = db.query(User).filter(User.role.ilike("manager")).all()
-                    for m in managers:
-                        exists = db.query(Notification).filter(Notification.user_id == m.id, Notification.title.ilike(f"%anomaly%{u.id}%")).order_by(Notification.created_at.desc()).first()
-                        create_it = True
-                        if exists and (now - exists.created_at).total_seconds() < ANOMALY_CHECK_INTERVAL_SECONDS:
-                            create_it = False
-                        if create_it:
-                            title = f"Performance anomaly: user {u.name} (id:{u.id})"
-                            msg = f"Completed tasks dropped from {prev_count} to {recent_count} (~{drop_pct:.1f}% drop) in the last {lookback.days} days."
-                            _create_notification(db, user_id=m.id, task_id=None, title=title, message=msg)
-
-            db.close()
+            with track_db_time("anomaly_check") as timer:
+                db = get_session()
+                now = now_ist()
+                rows = []
+                org = get_org_index(db)
+
+                employees = [uid for uid, (_, role_name, _, _) in org.users.items()
+                             if not (role_name and role_name.lower() in ("admin", "manager"))]
+                anomalies = detect_completion_anomalies(
+                    db, employees, now.date(),
+                    lookback_days=ANOMALY_LOOKBACK_DAYS, recent_days=ANOMALY_RECENT_DAYS,
+                    method=ANOMALY_METHOD, sensitivity=ANOMALY_SENSITIVITY, ewma_span=ANOMALY_EWMA_SPAN,
+                )
+                for a in anomalies:
+                    uid = a["user_id"]
+                    name = org.users[uid][0]
+                    title = f"Performance anomaly: user {name} (id:{uid})"
+                    msg = (f"Completed tasks fell to {a['recent_per_day']:.2f}/day over the last {ANOMALY_RECENT_DAYS} days "
+                           f"from a baseline of {a['baseline_per_day']:.2f}/day (~{a['drop_pct']:.1f}% drop, "
+                           f"score {a['score']:.2f}, rank {a['rank']} of {len(anomalies)}).")
+                    for mid in org.managers_for(uid):
+                        rows.append({"user_id": mid, "title": title, "message": msg,
+                                     "dedupe_key": dedupe_key("anomaly", f"user:{uid}", mid, ANOMALY_CHECK_INTERVAL_SECONDS, now)})
+
+                inserted = bulk_insert_notifications(db, rows)
+                db.close()
+            timer.report(scored=len(employees), anomalies=len(anomalies), inserted=inserted)
         except Exception as exc:
             print("anomaly_check_loop error:", exc)
         await asyncio.sleep(ANOMALY_CHECK_INTERVAL_SECONDS)
@@ -198,3 +176,12 @@ async def start_alert_workers():
     asyncio.create_task(idle_check_loop())
     asyncio.create_task(deadline_check_loop())
     asyncio.create_task(anomaly_check_loop())
+    asyncio.create_task(unread_reconcile_loop())
+    asyncio.create_task(notification_retention_loop())
+    asyncio.create_task(facts_catchup_loop())
+    asyncio.create_task(export_cleanup_loop())
+    asyncio.create_task(latest_tracking_backfill())
+    asyncio.create_task(change_log_retention_loop())
+    asyncio.create_task(outbox_dispatch_loop())
+    asyncio.create_task(presence_flush_loop())
+    asyncio.create_task(attendance_board_startup())
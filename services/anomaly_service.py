@@ -0,0 +1,99 @@
+# services/anomaly_service.py
+from datetime import date, timedelta
+import numpy as np
+import pandas as pd
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from core.database import ist_date
+from models.task import Task
+from utils.timezone import ist_day_bounds
+
+ANOMALY_METHODS = ("zscore", "ewma")
+
+
+def daily_completion_counts(db: Session, start: date, end: date) -> pd.DataFrame:
+    """
+    One grouped query: completed tasks per assignee per IST day in [start, end].
+    Returns columns user_id, day, completed.
+    """
+    day = ist_date(Task.created_at)
+    rows = db.query(Task.assigned_to, day, func.count(Task.id)).filter(
+        Task.assigned_to.isnot(None),
+        Task.status.ilike("%completed%"),
+        Task.created_at >= ist_day_bounds(start)[0],
+        Task.created_at < ist_day_bounds(end)[1],
+    ).group_by(Task.assigned_to, day).all()
+    df = pd.DataFrame(rows, columns=["user_id", "day", "completed"])
+    df["day"] = pd.to_datetime(df["day"]).dt.date
+    return df
+
+
+def completion_matrix(counts: pd.DataFrame, user_ids, start: date, days: int) -> np.ndarray:
+    """Dense users x days matrix of completion counts (zeros where nothing was completed)."""
+    user_ids = np.asarray(list(user_ids), dtype=np.int64)
+    matrix = np.zeros((len(user_ids), days), dtype=np.float64)
+    if counts.empty or len(user_ids) == 0:
+        return matrix
+    pos = pd.Index(user_ids).get_indexer(counts["user_id"].to_numpy())
+    offs = np.fromiter(((d - start).days for d in counts["day"]), dtype=np.int64, count=len(counts))
+    ok = (pos >= 0) & (offs >= 0) & (offs < days)
+    matrix[pos[ok], offs[ok]] = counts["completed"].to_numpy()[ok]
+    return matrix
+
+
+def score_anomalies(matrix: np.ndarray, recent_days: int, method: str = "zscore", sensitivity: float = 2.0, ewma_span: int = 7):
+    """
+    Score every row of a users x days matrix at once.
+
+    The last `recent_days` columns are compared with a baseline built from the
+    columns before them: their plain mean/std ("zscore") or an exponentially
+    weighted mean/std ("ewma"). Returns (score, baseline, recent, flagged) arrays;
+    score is the z-score of the recent daily mean, flagged = score <= -sensitivity.
+    Rows with an empty baseline are never flagged.
+    """
+    if method not in ANOMALY_METHODS:
+        raise ValueError(f"Unknown anomaly method: {method}")
+    baseline_cols = matrix[:, :-recent_days]
+    recent = matrix[:, -recent_days:].mean(axis=1)
+
+    if method == "ewma":
+        alpha = 2.0 / (ewma_span + 1)
+        n = baseline_cols.shape[1]
+        weights = (1 - alpha) ** np.arange(n - 1, -1, -1)
+        weights /= weights.sum()
+        mean = baseline_cols @ weights
+        std = np.sqrt(((baseline_cols - mean[:, None]) ** 2) @ weights)
+    else:
+        mean = baseline_cols.mean(axis=1)
+        std = baseline_cols.std(axis=1)
+
+    # counts are roughly Poisson, so never trust a spread tighter than sqrt(mean)
+    std = np.maximum(std, np.sqrt(mean))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        score = np.where(mean > 0, (recent - mean) / std, 0.0)
+    flagged = (mean > 0) & (score <= -sensitivity)
+    return score, mean, recent, flagged
+
+
+def detect_completion_anomalies(db: Session, user_ids, end: date, lookback_days: int = 14, recent_days: int = 7,
+                                method: str = "zscore", sensitivity: float = 2.0, ewma_span: int = 7) -> list[dict]:
+    """
+    Fetch per-user daily completions in one query, score every user in one pass
+    and return the flagged users ranked from the most severe drop down.
+    """
+    start = end - timedelta(days=lookback_days - 1)
+    user_ids = list(user_ids)
+    counts = daily_completion_counts(db, start, end)
+    matrix = completion_matrix(counts, user_ids, start, lookback_days)
+    score, baseline, recent, flagged = score_anomalies(matrix, recent_days, method, sensitivity, ewma_span)
+
+    idx = np.flatnonzero(flagged)
+    idx = idx[np.argsort(score[idx], kind="stable")]
+    return [{
+        "user_id": int(user_ids[i]),
+        "score": float(score[i]),
+        "baseline_per_day": float(baseline[i]),
+        "recent_per_day": float(recent[i]),
+        "drop_pct": float((1 - recent[i] / baseline[i]) * 100.0),
+        "rank": rank,
+    } for rank, i in enumerate(idx, start=1)]
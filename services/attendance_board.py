@@ -0,0 +1,150 @@
+# services/attendance_board.py
+"""
+Live "team today" attendance board.
+
+An in-memory view of today's (IST) attendance: per user, the punch times and
+whether an approved leave covers today. Committed attendance and leave writes
+are applied to it in place (collected at flush, applied after commit, so
+rolled-back writes never show). It is rebuilt from the database at startup, on
+day rollover and every BOARD_RESYNC_SECONDS as a safety net for writes made by
+other workers; a rebuild is two range-bounded queries over today's rows.
+A team's board is read by looking up each member from the org index, so serving it
+costs a dict lookup per member.
+"""
+import asyncio
+import threading
+import time
+from datetime import date, datetime
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session
+from core.database import SessionLocal
+from models.attendance import Attendance
+from models.leave import Leave
+from utils.timezone import IST, ist_day_bounds, now_ist, today_ist_date
+
+BOARD_RESYNC_SECONDS = 60
+BOARD_STATES = ("in", "out", "on_leave", "absent")
+
+
+def _ist(ts: datetime | None) -> datetime | None:
+    if ts is None:
+        return None
+    return IST.localize(ts) if ts.tzinfo is None else ts.astimezone(IST)  # naive values are IST wall-clock time
+
+
+def _is_approved(status) -> bool:
+    return str(getattr(status, "value", status) or "").lower() == "approved"
+
+
+def _covers(start: datetime | None, end: datetime | None, day: date) -> bool:
+    return start is not None and end is not None and _ist(start).date() <= day <= _ist(end).date()
+
+
+class AttendanceBoard:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._rebuild_lock = threading.Lock()  # one rebuild at a time; readers keep using the current board
+        self.day: date | None = None
+        self._punches: dict[int, tuple] = {}   # user_id -> (punch_in, punch_out)
+        self._on_leave: set[int] = set()
+        self._built_at = 0.0
+
+    def rebuild(self, db: Session, day: date | None = None):
+        day = day or today_ist_date()
+        start, end = ist_day_bounds(day)
+        punches = {}
+        for uid, punch_in, punch_out in db.query(Attendance.user_id, Attendance.punch_in, Attendance.punch_out).filter(
+            Attendance.date >= start, Attendance.date < end
+        ).order_by(Attendance.id):
+            punches[uid] = (_ist(punch_in), _ist(punch_out))
+        on_leave = {uid for (uid,) in db.query(Leave.user_id).filter(
+            Leave.start_date < end, Leave.end_date >= start, func.lower(Leave.status) == "approved")}
+        with self._lock:
+            self.day, self._punches, self._on_leave = day, punches, on_leave
+            self._built_at = time.monotonic()
+
+    def _stale(self) -> bool:
+        return self.day != today_ist_date() or time.monotonic() - self._built_at > BOARD_RESYNC_SECONDS
+
+    def ensure_current(self, db: Session):
+        if not self._stale():
+            return
+        with self._rebuild_lock:
+            if self._stale():  # callers that waited find it rebuilt
+                self.rebuild(db)
+
+    def apply(self, attendance: list[tuple], leaves: list[tuple]):
+        """Apply committed changes: attendance (user_id, date, punch_in, punch_out), leaves (user_id, start, end, approved)."""
+        with self._lock:
+            if self.day is None:
+                return
+            for uid, day_ts, punch_in, punch_out in attendance:
+                if day_ts is not None and _ist(day_ts).date() == self.day:
+                    self._punches[uid] = (_ist(punch_in), _ist(punch_out))
+            for uid, start, end, approved in leaves:
+                if _covers(start, end, self.day):
+                    if approved:
+                        self._on_leave.add(uid)
+                    else:
+                        self._on_leave.discard(uid)  # another approved leave today is picked up on resync
+
+    def entries(self, user_ids, now: datetime | None = None) -> list[dict]:
+        now = _ist(now or now_ist())
+        out = []
+        with self._lock:
+            for uid in user_ids:
+                punch_in, punch_out = self._punches.get(uid, (None, None))
+                if punch_in is not None:
+                    state = "out" if punch_out is not None else "in"
+                    hours = max(0.0, ((punch_out or now) - punch_in).total_seconds() / 3600)
+                else:
+                    state = "on_leave" if uid in self._on_leave else "absent"
+                    hours = 0.0
+                out.append({"user_id": uid, "state": state, "punch_in": punch_in, "punch_out": punch_out,
+                            "hours_so_far": round(hours, 2)})
+        return out
+
+
+attendance_board = AttendanceBoard()
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _collect_board_changes(session, flush_context):
+    attendance, leaves = [], []
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, Attendance):
+            gone = obj in session.deleted
+            attendance.append((obj.user_id, obj.date, None if gone else obj.punch_in, None if gone else obj.punch_out))
+        elif isinstance(obj, Leave):
+            leaves.append((obj.user_id, obj.start_date, obj.end_date, obj not in session.deleted and _is_approved(obj.status)))
+    if attendance or leaves:
+        pending = session.info.setdefault("board_changes", ([], []))
+        pending[0].extend(attendance)
+        pending[1].extend(leaves)
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _apply_board_changes(session):
+    pending = session.info.pop("board_changes", None)
+    if pending:
+        attendance_board.apply(*pending)
+
+
+@event.listens_for(SessionLocal, "after_soft_rollback")
+def _discard_board_changes(session, previous_transaction):
+    session.info.pop("board_changes", None)
+
+
+def build_attendance_board():
+    db = SessionLocal()
+    try:
+        attendance_board.rebuild(db)
+    finally:
+        db.close()
+
+
+async def attendance_board_startup():
+    try:
+        await asyncio.to_thread(build_attendance_board)
+    except Exception as exc:
+        print("attendance_board_startup error:", exc)
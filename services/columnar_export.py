@@ -0,0 +1,168 @@
+# services/columnar_export.py
+"""
+Columnar exports (Parquet or Arrow IPC) for BI consumers.
+
+Rows are read from a server-side cursor in chunks, turned into Arrow record
+batches with an explicit schema (dates stay dates, nullable ids stay nullable
+integers) and written as a hive-partitioned dataset, one directory per day
+(date=2025-01-31/part-0.parquet; raw tables use day=..., the IST calendar day). The dataset directory
+is zipped without recompression for download. pyarrow is optional: without it these formats are
+rejected up front.
+"""
+import os
+import shutil
+import tempfile
+import zipfile
+from datetime import date
+from sqlalchemy import select
+from core.database import SessionLocal
+from models.attendance import Attendance
+from models.monitoring import EmployeeMonitoring
+from models.productivity import Productivity
+from services.report_service import department_dashboard, productivity_export_row, productivity_query
+from services.stream_export import iter_row_chunks
+from utils.timezone import ist_day, ist_range_bounds
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as pads
+except ImportError:  # optional dependency
+    pa = None
+    pads = None
+
+COLUMNAR_FORMATS = {"parquet": "parquet", "arrow": "arrow"}  # export format -> file extension inside the zip
+COLUMNAR_CHUNK_ROWS = 50000
+COLUMNAR_ROW_GROUP_ROWS = 250000
+COLUMNAR_COMPRESSION = "zstd"
+
+
+def columnar_available() -> bool:
+    return pa is not None
+
+
+def _with_day(ts_index: int, naive_utc: bool = False):
+    """Row transform that appends the IST calendar day of the timestamp column (partition key)."""
+    def transform(r):
+        ts = r[ts_index]
+        return (*r, ist_day(ts, naive_utc) if ts is not None else None)
+    return transform
+
+
+def _productivity_source(s: date, e: date):
+    return productivity_query(s, e), productivity_export_row, "date"
+
+
+def _attendance_source(s: date, e: date):
+    lo, hi = ist_range_bounds(s, e)
+    stmt = select(Attendance.id, Attendance.user_id, Attendance.date, Attendance.punch_in, Attendance.punch_out,
+                  Attendance.work_hours, Attendance.is_present, Attendance.status
+                  ).where(Attendance.date >= lo, Attendance.date < hi).order_by(Attendance.date, Attendance.id)
+    return stmt, _with_day(2), "day"
+
+
+def _monitoring_source(s: date, e: date):
+    lo, hi = ist_range_bounds(s, e, naive_utc=True)  # utcnow-stamped
+    m = EmployeeMonitoring
+    stmt = select(m.id, m.user_id, m.application_used, m.website_visited, m.idle_time, m.active_time,
+                  m.screen_streaming, m.location_mode, m.timestamp
+                  ).where(m.timestamp >= lo, m.timestamp < hi).order_by(m.timestamp, m.id)
+    return stmt, _with_day(8, naive_utc=True), "day"
+
+
+def _activity_source(s: date, e: date):
+    lo, hi = ist_range_bounds(s, e, naive_utc=True)  # utcnow-stamped
+    p = Productivity
+    stmt = select(p.id, p.user_id, p.application_name, p.website_name, p.is_productive, p.productive_time,
+                  p.unproductive_time, p.productivity_score, p.category, p.timestamp
+                  ).where(p.timestamp >= lo, p.timestamp < hi).order_by(p.timestamp, p.id)
+    return stmt, _with_day(9, naive_utc=True), "day"
+
+
+def _schemas() -> dict:
+    ts_utc = pa.timestamp("us", tz="UTC")
+    ts = pa.timestamp("us")
+    return {
+        "productivity": pa.schema([("date", pa.date32()), ("user_id", pa.int64()), ("user_name", pa.string()),
+                                   ("tasks_assigned", pa.int32()), ("tasks_completed", pa.int32()),
+                                   ("completion_rate", pa.float64()), ("work_hours", pa.float64())]),
+        "department": pa.schema([("department", pa.string()), ("tasks_assigned", pa.int64()), ("tasks_completed", pa.int64()),
+                                 ("work_hours", pa.float64()), ("completion_rate", pa.float64())]),
+        "attendance": pa.schema([("id", pa.int64()), ("user_id", pa.int64()), ("date", ts_utc), ("punch_in", ts_utc),
+                                 ("punch_out", ts_utc), ("work_hours", pa.float64()), ("is_present", pa.bool_()),
+                                 ("status", pa.string()), ("day", pa.date32())]),
+        "monitoring": pa.schema([("id", pa.int64()), ("user_id", pa.int64()), ("application_used", pa.string()),
+                                 ("website_visited", pa.string()), ("idle_time", pa.int32()), ("active_time", pa.int32()),
+                                 ("screen_streaming", pa.bool_()), ("location_mode", pa.string()), ("timestamp", ts),
+                                 ("day", pa.date32())]),
+        "activity": pa.schema([("id", pa.int64()), ("user_id", pa.int64()), ("application_name", pa.string()),
+                               ("website_name", pa.string()), ("is_productive", pa.bool_()), ("productive_time", pa.int32()),
+                               ("unproductive_time", pa.int32()), ("productivity_score", pa.float64()),
+                               ("category", pa.string()), ("timestamp", ts), ("day", pa.date32())]),
+    }
+
+
+# kind -> (statement, row transform, partition column) over [s, e];
+# "department" is an aggregate over the whole range and is not partitioned
+COLUMNAR_SOURCES = {
+    "productivity": _productivity_source,
+    "attendance": _attendance_source,
+    "monitoring": _monitoring_source,
+    "activity": _activity_source,  # raw productivity table (per-application usage)
+}
+COLUMNAR_KINDS = (*COLUMNAR_SOURCES, "department")
+
+
+def _record_batches(schema, chunks):
+    for rows in chunks:
+        cols = list(zip(*rows)) if rows else [() for _ in schema]
+        yield pa.RecordBatch.from_arrays([pa.array(c, type=f.type) for c, f in zip(cols, schema)], schema=schema)
+
+
+def _department_batches(schema, s: date, e: date):
+    db = SessionLocal()
+    try:
+        df = department_dashboard(db, s, e)
+    finally:
+        db.close()
+    if not df.empty:
+        yield pa.RecordBatch.from_pandas(df[schema.names], schema=schema, preserve_index=False)
+
+
+def write_columnar_export(kind: str, fmt: str, s: date, e: date, path: str) -> str:
+    """
+    Write the kind's rows for [s, e] as a date-partitioned Parquet/Arrow dataset
+    and zip it to path. Returns path.
+    """
+    if pa is None:
+        raise RuntimeError("Parquet/Arrow exports require pyarrow")
+    if fmt not in COLUMNAR_FORMATS:
+        raise ValueError(f"Unsupported columnar format: {fmt}")
+    if kind not in COLUMNAR_KINDS:
+        raise ValueError(f"Unsupported export kind: {kind}")
+
+    schema = _schemas()[kind]
+    if kind == "department":
+        batches, partitioning = _department_batches(schema, s, e), None
+    else:
+        stmt, transform, part_col = COLUMNAR_SOURCES[kind](s, e)
+        batches = _record_batches(schema, iter_row_chunks(stmt, transform=transform, chunk_size=COLUMNAR_CHUNK_ROWS))
+        partitioning = pads.partitioning(pa.schema([schema.field(part_col)]), flavor="hive")
+
+    file_format = pads.ParquetFileFormat() if fmt == "parquet" else pads.IpcFileFormat()
+    ext = COLUMNAR_FORMATS[fmt]
+    workdir = tempfile.mkdtemp(prefix=f"{kind}_")
+    try:
+        pads.write_dataset(batches, workdir, schema=schema, format=file_format,
+                           file_options=file_format.make_write_options(compression=COLUMNAR_COMPRESSION),
+                           partitioning=partitioning, basename_template=f"part-{{i}}.{ext}",
+                           max_rows_per_group=COLUMNAR_ROW_GROUP_ROWS, existing_data_behavior="overwrite_or_ignore")
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # files are already compressed; store them as-is
+        with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_STORED) as zf:
+            for root, _, files in os.walk(workdir):
+                for name in sorted(files):
+                    full = os.path.join(root, name)
+                    zf.write(full, os.path.relpath(full, workdir))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return path
@@ -0,0 +1,166 @@
+# services/export_service.py
+"""
+Background export jobs: a POST enqueues a job row, a bounded thread pool renders
+the file into exports/jobs/, clients poll the job status and download the file.
+Identical requests reuse a queued, running or finished job as long as the
+report's source data has not changed since.
+"""
+import asyncio
+import hashlib
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+from core.database import SessionLocal
+from utils.timezone import now_ist
+from models.export_job import ExportJob
+from services.report_cache import current_versions, REPORT_SOURCES
+from services.report_service import _normalize_dates, productivity_dataframe, save_dataframe_to_excel, save_dataframe_to_pdf, PRODUCTIVITY_HEADERS
+from services.columnar_export import write_columnar_export, COLUMNAR_FORMATS
+
+EXPORT_WORKERS = 2
+EXPORT_TTL_HOURS = 24            # finished files are deleted after this
+EXPORT_STALE_MINUTES = 60        # queued jobs older than this are failed (worker died before starting)
+EXPORT_HEARTBEAT_SECONDS = 30    # running jobs stamp heartbeat_at this often
+EXPORT_HEARTBEAT_TIMEOUT_MINUTES = 5  # running jobs without a heartbeat for this long are failed
+EXPORT_CLEANUP_INTERVAL_SECONDS = 600
+EXPORT_DIR = "jobs"              # under exports/
+
+EXPORT_EXTENSIONS = {"excel": "xlsx", "pdf": "pdf", "parquet": "zip", "arrow": "zip"}
+# kind -> tables whose data versions decide whether a finished export can be reused;
+# kinds without versioned sources are never reused
+EXPORT_KINDS = {
+    "productivity": REPORT_SOURCES,
+    "department": REPORT_SOURCES,
+    "attendance": ("attendance",),
+    "monitoring": ("employee_monitoring",),
+    "activity": ("productivity",),
+}
+TABULAR_KINDS = ("productivity",)  # excel/pdf
+
+_executor = ThreadPoolExecutor(max_workers=EXPORT_WORKERS, thread_name_prefix="export")
+
+
+def _params_key(kind: str, fmt: str, s: date, e: date) -> str:
+    return hashlib.sha256(f"{kind}|{fmt}|{s}|{e}".encode()).hexdigest()
+
+
+def enqueue_export(db: Session, user_id: int, fmt: str, period: str, start_date: date | None, end_date: date | None, kind: str = "productivity") -> ExportJob:
+    if fmt not in EXPORT_EXTENSIONS:
+        raise ValueError(f"Unsupported export format: {fmt}")
+    if kind not in EXPORT_KINDS or (fmt not in COLUMNAR_FORMATS and kind not in TABULAR_KINDS):
+        raise ValueError(f"Unsupported export kind for {fmt}: {kind}")
+    s, e = _normalize_dates(period, start_date, end_date)
+    key = _params_key(kind, fmt, s, e)
+    sources = EXPORT_KINDS[kind]
+    version = ",".join(map(str, current_versions(db, sources)))
+    reusable = bool(sources)
+
+    existing = db.query(ExportJob).filter(
+        ExportJob.params_key == key,
+        ExportJob.data_version == version,
+        ExportJob.status.in_(["queued", "running", "done"]),
+    ).order_by(ExportJob.created_at.desc()).first() if reusable else None
+    if existing and (existing.status != "done" or (existing.file_path and os.path.exists(existing.file_path))):
+        return existing
+
+    job = ExportJob(id=uuid.uuid4().hex, kind=kind, format=fmt, start_date=s, end_date=e,
+                    params_key=key, data_version=version, requested_by=user_id)
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    _executor.submit(run_export_job, job.id)
+    return job
+
+
+def _update(db: Session, job: ExportJob, **fields):
+    for k, v in fields.items():
+        setattr(job, k, v)
+    db.commit()
+
+
+def _heartbeat(job_id: str, stop: threading.Event):
+    """Stamp heartbeat_at until stop is set, so cleanup can tell a slow job from a dead one."""
+    while not stop.wait(EXPORT_HEARTBEAT_SECONDS):
+        db = SessionLocal()
+        try:
+            db.query(ExportJob).filter(ExportJob.id == job_id, ExportJob.status == "running").update(
+                {"heartbeat_at": now_ist()}, synchronize_session=False)
+            db.commit()
+        except Exception as exc:
+            print("export heartbeat error:", job_id, exc)
+        finally:
+            db.close()
+
+
+def run_export_job(job_id: str):
+    db = SessionLocal()
+    job = None
+    stop = threading.Event()
+    try:
+        job = db.query(ExportJob).filter(ExportJob.id == job_id).first()
+        if not job or job.status != "queued":
+            return
+        _update(db, job, status="running", progress=0.05, heartbeat_at=now_ist())
+        threading.Thread(target=_heartbeat, args=(job_id, stop), daemon=True, name=f"export-heartbeat-{job_id[:8]}").start()
+
+        s, e = job.start_date, job.end_date
+        fname = os.path.join(EXPORT_DIR, f"{job.kind}_{s}_{e}_{job.id}.{EXPORT_EXTENSIONS[job.format]}")
+        if job.format in COLUMNAR_FORMATS:
+            path = write_columnar_export(job.kind, job.format, s, e, os.path.join("exports", fname))
+        else:
+            df, s, e = productivity_dataframe(db, "custom", s, e)
+            _update(db, job, progress=0.5)
+            df_out = df.rename(columns=PRODUCTIVITY_HEADERS)
+            if job.format == "excel":
+                path = save_dataframe_to_excel(df_out, fname)
+            else:
+                path = save_dataframe_to_pdf(df_out, fname, title=f"Productivity {s} to {e}")
+        _update(db, job, status="done", progress=1.0, file_path=path, finished_at=now_ist())
+    except Exception as exc:
+        db.rollback()
+        if job is not None:
+            _update(db, job, status="failed", error=str(exc), finished_at=now_ist())
+        print("export job error:", job_id, exc)
+    finally:
+        stop.set()
+        db.close()
+
+
+def cleanup_export_jobs(db: Session) -> int:
+    """Delete expired export files and fail jobs whose worker disappeared."""
+    now = now_ist()
+    cleaned = 0
+    expired = db.query(ExportJob).filter(ExportJob.status == "done", ExportJob.finished_at < now - timedelta(hours=EXPORT_TTL_HOURS)).all()
+    for job in expired:
+        if job.file_path and os.path.exists(job.file_path):
+            os.remove(job.file_path)
+        job.status = "expired"
+        job.file_path = None
+        cleaned += 1
+    stale = db.query(ExportJob).filter(or_(
+        and_(ExportJob.status == "queued", ExportJob.created_at < now - timedelta(minutes=EXPORT_STALE_MINUTES)),
+        and_(ExportJob.status == "running", ExportJob.heartbeat_at < now - timedelta(minutes=EXPORT_HEARTBEAT_TIMEOUT_MINUTES)),
+    )).all()
+    for job in stale:
+        job.status = "failed"
+        job.error = "Export did not finish in time"
+        cleaned += 1
+    db.commit()
+    return cleaned
+
+
+async def export_cleanup_loop():
+    while True:
+        try:
+            db = SessionLocal()
+            cleaned = cleanup_export_jobs(db)
+            db.close()
+            if cleaned:
+                print(f"export_cleanup_loop: cleaned {cleaned} export jobs")
+        except Exception as exc:
+            print("export_cleanup_loop error:", exc)
+        await asyncio.sleep(EXPORT_CLEANUP_INTERVAL_SECONDS)
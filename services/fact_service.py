@@ -0,0 +1,201 @@
+# services/fact_service.py
+"""
+Maintenance of user_day_facts: one row per user per day with the figures the
+reports need (tasks assigned/completed, work hours, active/idle minutes, leave).
+
+Write paths never do arithmetic on the facts. A flush hook collects the
+(user, day) pairs touched by task, attendance, monitoring and leave writes and
+recomputes exactly those rows from the raw tables inside the same transaction.
+A catch-up job recomputes whole date ranges (backfill and drift repair).
+"""
+import asyncio
+from datetime import date, timedelta
+from sqlalchemy import case, event, func, inspect, select
+from sqlalchemy.orm import Session
+from core.database import SessionLocal, dialect_insert, ist_date
+from utils.timezone import ist_day, ist_range_bounds, now_ist, today_ist_date
+from models.task import Task
+from models.attendance import Attendance
+from models.monitoring import EmployeeMonitoring
+from models.leave import Leave
+from models.user_day_fact import UserDayFact
+from services.report_cache import bump_versions
+
+FACT_COLUMNS = ("tasks_assigned", "tasks_completed", "work_hours", "active_minutes", "idle_minutes", "on_leave")
+FACTS_BACKFILL_DAYS = 400        # history rebuilt by the startup catch-up
+FACTS_RESYNC_DAYS = 2            # window re-derived on every catch-up tick
+FACTS_CATCHUP_INTERVAL_SECONDS = 3600
+MAX_LEAVE_DAYS = 366             # guard against absurd leave ranges
+UPSERT_BATCH_SIZE = 1000
+
+
+def _days_of(ts, naive_utc: bool = False) -> set[date]:
+    """IST calendar day a timestamp is bucketed under (empty for None)."""
+    return set() if ts is None else {ist_day(ts, naive_utc)}
+
+
+def _leave_days(start, end) -> set[date]:
+    if start is None or end is None:
+        return set()
+    s, e = ist_day(start), ist_day(end)
+    if (e - s).days > MAX_LEAVE_DAYS:
+        e = s + timedelta(days=MAX_LEAVE_DAYS)
+    return {s + timedelta(days=i) for i in range((e - s).days + 1)}
+
+
+def fact_keys(user_ids, ts) -> set[tuple[int, date]]:
+    """(user, day) fact rows affected by rows written at ts (for set-based writes that skip the flush hook)."""
+    return {(u, d) for u in user_ids if u is not None for d in _days_of(ts)}
+
+
+def _old_value(obj, attr):
+    hist = inspect(obj).attrs[attr].history
+    return hist.deleted[0] if hist.deleted else getattr(obj, attr)
+
+
+def _touched_keys(objs) -> set[tuple[int, date]]:
+    keys = set()
+    for obj in objs:
+        if isinstance(obj, Task):
+            users = {obj.assigned_to, _old_value(obj, "assigned_to")}
+            days = _days_of(obj.created_at) | _days_of(_old_value(obj, "created_at"))
+        elif isinstance(obj, Attendance):
+            users = {obj.user_id}
+            days = _days_of(obj.date) | _days_of(_old_value(obj, "date"))
+        elif isinstance(obj, EmployeeMonitoring):
+            users = {obj.user_id, _old_value(obj, "user_id")}
+            days = _days_of(obj.timestamp, naive_utc=True) | _days_of(_old_value(obj, "timestamp"), naive_utc=True)
+        elif isinstance(obj, Leave):
+            users = {obj.user_id}
+            days = _leave_days(obj.start_date, obj.end_date) | _leave_days(_old_value(obj, "start_date"), _old_value(obj, "end_date"))
+        else:
+            continue
+        keys.update((u, d) for u in users if u is not None for d in days)
+    return keys
+
+
+def aggregate_facts(db: Session, start: date, end: date, user_ids=None) -> dict[tuple[int, date], dict]:
+    """
+    Compute fact rows for [start, end] straight from the raw tables (optionally
+    for some users only). Rows are bucketed by IST calendar day.
+    """
+    lo, hi = ist_range_bounds(start, end)
+    mon_lo, mon_hi = ist_range_bounds(start, end, naive_utc=True)  # employee_monitoring.timestamp is naive UTC
+    facts: dict[tuple[int, date], dict] = {}
+
+    def row(uid, day):
+        if isinstance(day, str):
+            day = date.fromisoformat(day)
+        return facts.setdefault((uid, day), {c: 0 for c in FACT_COLUMNS} | {"work_hours": 0.0, "on_leave": False})
+
+    task_day = ist_date(Task.created_at)
+    q = select(Task.assigned_to, task_day, func.count(Task.id),
+               func.sum(case((func.lower(Task.status) == "completed", 1), else_=0))
+               ).where(Task.assigned_to.isnot(None), Task.created_at >= lo, Task.created_at < hi)
+    if user_ids is not None:
+        q = q.where(Task.assigned_to.in_(user_ids))
+    for uid, day, assigned, completed in db.execute(q.group_by(Task.assigned_to, task_day)):
+        r = row(uid, day)
+        r["tasks_assigned"], r["tasks_completed"] = int(assigned), int(completed or 0)
+
+    att_day = ist_date(Attendance.date)
+    q = select(Attendance.user_id, att_day, func.sum(Attendance.work_hours)
+               ).where(Attendance.user_id.isnot(None), Attendance.date >= lo, Attendance.date < hi)
+    if user_ids is not None:
+        q = q.where(Attendance.user_id.in_(user_ids))
+    for uid, day, hours in db.execute(q.group_by(Attendance.user_id, att_day)):
+        row(uid, day)["work_hours"] = float(hours or 0.0)
+
+    mon_day = ist_date(EmployeeMonitoring.timestamp)
+    q = select(EmployeeMonitoring.user_id, mon_day, func.sum(EmployeeMonitoring.active_time), func.sum(EmployeeMonitoring.idle_time)
+               ).where(EmployeeMonitoring.user_id.isnot(None), EmployeeMonitoring.timestamp >= mon_lo, EmployeeMonitoring.timestamp < mon_hi)
+    if user_ids is not None:
+        q = q.where(EmployeeMonitoring.user_id.in_(user_ids))
+    for uid, day, active, idle in db.execute(q.group_by(EmployeeMonitoring.user_id, mon_day)):
+        r = row(uid, day)
+        r["active_minutes"], r["idle_minutes"] = int(active or 0), int(idle or 0)
+
+    q = select(Leave.user_id, Leave.start_date, Leave.end_date).where(
+        func.lower(Leave.status) == "approved", Leave.start_date < hi, Leave.end_date >= lo)
+    if user_ids is not None:
+        q = q.where(Leave.user_id.in_(user_ids))
+    for uid, ls, le in db.execute(q):
+        for d in _leave_days(ls, le):
+            if start <= d <= end:
+                row(uid, d)["on_leave"] = True
+    return facts
+
+
+def upsert_facts(db: Session, facts: dict[tuple[int, date], dict]):
+    if not facts:
+        return
+    table = UserDayFact.__table__
+    now = now_ist()
+    values = [{"user_id": uid, "day": day, "updated_at": now, **vals} for (uid, day), vals in facts.items()]
+    conn = db.connection()
+    for i in range(0, len(values), UPSERT_BATCH_SIZE):
+        stmt = dialect_insert(table).values(values[i:i + UPSERT_BATCH_SIZE])
+        stmt = stmt.on_conflict_do_update(index_elements=["user_id", "day"],
+                                          set_={c: stmt.excluded[c] for c in FACT_COLUMNS + ("updated_at",)})
+        conn.execute(stmt)
+
+
+def refresh_facts(db: Session, keys):
+    """Recompute the given (user_id, day) fact rows inside the current transaction."""
+    keys = set(keys)
+    if not keys:
+        return
+    days = [d for _, d in keys]
+    computed = aggregate_facts(db, min(days), max(days), user_ids={u for u, _ in keys})
+    empty = {c: 0 for c in FACT_COLUMNS} | {"work_hours": 0.0, "on_leave": False}
+    upsert_facts(db, {k: computed.get(k, empty) for k in keys})
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _refresh_touched_facts(session, flush_context):
+    refresh_facts(session, _touched_keys((*session.new, *session.dirty, *session.deleted)))
+
+
+def rebuild_facts(db: Session, start: date, end: date, chunk_days: int = 31) -> int:
+    """
+    Catch-up: recompute every fact row in [start, end], one transaction per
+    chunk. Only rows that differ are written; a chunk that changed anything
+    bumps the user_day_facts version so cached reports built on the old facts
+    are recomputed. Returns the number of rows written.
+    """
+    written = 0
+    chunk_start = start
+    while chunk_start <= end:
+        chunk_end = min(chunk_start + timedelta(days=chunk_days - 1), end)
+        facts = aggregate_facts(db, chunk_start, chunk_end)
+        current = {(r[0], r[1]): dict(zip(FACT_COLUMNS, r[2:])) for r in db.query(
+            UserDayFact.user_id, UserDayFact.day, *(getattr(UserDayFact, c) for c in FACT_COLUMNS)
+        ).filter(UserDayFact.day >= chunk_start, UserDayFact.day <= chunk_end)}
+        # rows that no longer have any source data go back to zero
+        empty = {c: 0 for c in FACT_COLUMNS} | {"work_hours": 0.0, "on_leave": False}
+        for key in current:
+            facts.setdefault(key, dict(empty))
+        changed = {k: v for k, v in facts.items() if current.get(k) != v}
+        if changed:
+            upsert_facts(db, changed)
+            bump_versions(db, {"user_day_facts"})
+        db.commit()
+        written += len(changed)
+        chunk_start = chunk_end + timedelta(days=1)
+    return written
+
+
+async def facts_catchup_loop():
+    first = True
+    while True:
+        try:
+            db = SessionLocal()
+            today = today_ist_date()
+            days = FACTS_BACKFILL_DAYS if first else FACTS_RESYNC_DAYS
+            written = await asyncio.to_thread(rebuild_facts, db, today - timedelta(days=days - 1), today)
+            db.close()
+            first = False
+            print(f"facts_catchup_loop: refreshed {written} user-day facts")
+        except Exception as exc:
+            print("facts_catchup_loop error:", exc)
+        await asyncio.sleep(FACTS_CATCHUP_INTERVAL_SECONDS)
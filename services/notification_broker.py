@@ -0,0 +1,213 @@
+# services/notification_broker.py
+"""
+In-process pub/sub for new notifications.
+
+Every committed notification is handed to the broker, which fans it out to the
+asyncio queues of the recipient's open SSE/WebSocket connections. On PostgreSQL
+the hand-off goes through LISTEN/NOTIFY so that every worker process sees every
+notification: ids are sent with pg_notify inside the writing transaction (so
+rolled-back rows are never announced) and each worker's listener loads and
+dispatches the rows its own subscribers care about. Other databases publish
+in-process after commit.
+"""
+import asyncio
+import json
+import threading
+from sqlalchemy import event, func, select as sa_select
+from sqlalchemy.orm import Session
+from core.database import SessionLocal, engine
+from models.notification import Notification
+
+CHANNEL = "notifications"
+QUEUE_SIZE = 1000
+NOTIFY_CHUNK = 200  # ids per pg_notify payload (payloads are capped at 8000 bytes)
+
+
+def notification_payload(n) -> dict:
+    """JSON-ready dict for a Notification row (ORM object or mapping)."""
+    if not isinstance(n, dict):
+        n = {c: getattr(n, c) for c in ("id", "user_id", "task_id", "title", "message", "is_read", "created_at")}
+    return {
+        "id": n["id"],
+        "user_id": n["user_id"],
+        "task_id": n["task_id"],
+        "title": n["title"],
+        "message": n["message"],
+        "is_read": bool(n["is_read"]),
+        "created_at": n["created_at"].isoformat() if n["created_at"] else None,
+    }
+
+
+class Subscription:
+    def __init__(self, user_id: int):
+        self.user_id = user_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        self.overflowed = False
+
+
+class NotificationBroker:
+    def __init__(self):
+        self.loop: asyncio.AbstractEventLoop | None = None
+        self._subs: dict[int, set[Subscription]] = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, user_id: int) -> Subscription:
+        sub = Subscription(user_id)
+        with self._lock:
+            self._subs.setdefault(user_id, set()).add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription):
+        with self._lock:
+            subs = self._subs.get(sub.user_id)
+            if subs:
+                subs.discard(sub)
+                if not subs:
+                    del self._subs[sub.user_id]
+
+    def has_subscribers(self, user_id: int) -> bool:
+        return user_id in self._subs
+
+    def publish(self, payloads: list[dict]):
+        """Thread-safe: may be called from request threads or the event loop."""
+        if self.loop is None or not payloads:
+            return
+        with self._lock:
+            targets = [(sub, p) for p in payloads for sub in self._subs.get(p["user_id"], ())]
+        if targets:
+            self.loop.call_soon_threadsafe(self._deliver, targets)
+
+    @staticmethod
+    def _deliver(targets):
+        for sub, p in targets:
+            if sub.overflowed:
+                continue
+            try:
+                sub.queue.put_nowait(p)
+            except asyncio.QueueFull:
+                # the client falls behind: end its stream, it resumes from its last id
+                sub.overflowed = True
+                sub.queue.get_nowait()
+                sub.queue.put_nowait(None)
+
+
+broker = NotificationBroker()
+
+
+def _uses_pg_notify(session: Session) -> bool:
+    return session.get_bind().dialect.name == "postgresql"
+
+
+def announce(session: Session, payloads: list[dict]):
+    """Queue notifications written in this session's transaction for delivery on commit."""
+    if not payloads:
+        return
+    if _uses_pg_notify(session):
+        conn = session.connection()
+        refs = [[p["id"], p["user_id"]] for p in payloads if p["user_id"] is not None]
+        for i in range(0, len(refs), NOTIFY_CHUNK):
+            conn.execute(sa_select(func.pg_notify(CHANNEL, json.dumps(refs[i:i + NOTIFY_CHUNK]))))
+    else:
+        session.info.setdefault("pending_notifications", []).extend(payloads)
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _collect_new_notifications(session, flush_context):
+    new = [obj for obj in session.new if isinstance(obj, Notification)]
+    if new:
+        announce(session, [notification_payload(n) for n in new])
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _publish_committed(session):
+    pending = session.info.pop("pending_notifications", None)
+    if pending:
+        broker.publish(pending)
+
+
+@event.listens_for(SessionLocal, "after_soft_rollback")
+def _discard_pending(session, previous_transaction):
+    session.info.pop("pending_notifications", None)
+
+
+def _load_and_publish(refs: list):
+    ids = [nid for nid, uid in refs if broker.has_subscribers(uid)]
+    if not ids:
+        return
+    db = SessionLocal()
+    try:
+        rows = db.query(Notification).filter(Notification.id.in_(ids)).order_by(Notification.id).all()
+        broker.publish([notification_payload(n) for n in rows])
+    finally:
+        db.close()
+
+
+_listener_conn = None
+
+
+async def _pg_listen():
+    global _listener_conn
+    loop = asyncio.get_running_loop()
+    _listener_conn = engine.raw_connection()
+    conn = _listener_conn.driver_connection
+    conn.autocommit = True
+    conn.cursor().execute(f"LISTEN {CHANNEL};")
+
+    def on_readable():
+        conn.poll()
+        while conn.notifies:
+            note = conn.notifies.pop(0)
+            try:
+                refs = json.loads(note.payload)
+            except ValueError:
+                continue
+            loop.run_in_executor(None, _load_and_publish, refs)
+
+    loop.add_reader(conn, on_readable)
+
+
+async def start_notification_broker():
+    broker.loop = asyncio.get_running_loop()
+    if engine.dialect.name == "postgresql":
+        await _pg_listen()
+
+
+async def notification_events(user_id: int, last_id: int | None = None, keepalive_seconds: float = 15.0, replay_chunk: int = 500):
+    """
+    Async stream of notification payloads for one user.
+    Replays every notification with id > last_id first (in chunks of
+    replay_chunk), then yields live ones; yields None as a keepalive tick and
+    stops if the subscriber overflowed.
+    """
+    sub = broker.subscribe(user_id)
+    try:
+        if last_id is not None:
+            def replay(after: int):
+                db = SessionLocal()
+                try:
+                    rows = db.query(Notification).filter(Notification.user_id == user_id, Notification.id > after).order_by(Notification.id).limit(replay_chunk).all()
+                    return [notification_payload(n) for n in rows]
+                finally:
+                    db.close()
+            # subscribed before replaying, so rows committed meanwhile are either in a page or queued live
+            while True:
+                page = await asyncio.get_running_loop().run_in_executor(None, replay, last_id)
+                for p in page:
+                    last_id = p["id"]
+                    yield p
+                if len(page) < replay_chunk:
+                    break
+        while True:
+            try:
+                p = await asyncio.wait_for(sub.queue.get(), timeout=keepalive_seconds)
+            except asyncio.TimeoutError:
+                yield None
+                continue
+            if p is None:
+                return
+            if last_id is not None and p["id"] <= last_id:
+                continue
+            last_id = p["id"]
+            yield p
+    finally:
+        broker.unsubscribe(sub)
@@ -1,12 +1,78 @@
 # services/notification_service.py
 import asyncio
+from collections import Counter
 from utils.timezone import now_ist
-from datetime import timedelta
-from core.database import SessionLocal
+from datetime import datetime, timedelta
+from sqlalchemy.orm import Session
+from core.database import SessionLocal, insert_ignore
 from models.task import Task
 from models.notification import Notification
+from services.notification_broker import announce, notification_payload
+from services.unread_service import apply_unread_deltas
+from services.sync_service import record_changes
 
 CHECK_INTERVAL_SECONDS = 60  # run every minute
+NOTIFICATION_BATCH_SIZE = 500
+
+
+def dedupe_key(alert_type: str, subject: str, recipient_id: int | None, bucket_seconds: int, at: datetime | None = None) -> str:
+    """
+    Structured key for sweep alerts: one notification per alert type, subject
+    (e.g. "user:12" or "task:7"), recipient and time bucket.
+    """
+    at = at or now_ist()
+    bucket = int(at.timestamp() // bucket_seconds)
+    return f"{alert_type}:{subject}:{recipient_id}:{bucket}"
+
+
+def insert_notifications(db: Session, rows: list[dict]) -> list[dict]:
+    """
+    Insert notification dicts in batches inside the current transaction, skipping
+    rows whose dedupe_key already exists. Unread counters and the sync log are
+    updated and the inserted rows are announced to live subscribers on commit.
+    Returns their payloads.
+    """
+    if not rows:
+        return []
+    now = now_ist()
+    seen = set()
+    values = []
+    for r in rows:
+        key = r.get("dedupe_key")
+        if key is not None:
+            if key in seen:
+                continue
+            seen.add(key)
+        values.append({
+            "user_id": r.get("user_id"),
+            "task_id": r.get("task_id"),
+            "title": r["title"],
+            "message": r.get("message"),
+            "is_read": False,
+            "created_at": r.get("created_at") or now,
+            "dedupe_key": key,
+        })
+
+    table = Notification.__table__
+    inserted = []
+    for i in range(0, len(values), NOTIFICATION_BATCH_SIZE):
+        stmt = insert_ignore(table, ["dedupe_key"]).values(values[i:i + NOTIFICATION_BATCH_SIZE]).returning(
+            table.c.id, table.c.user_id, table.c.task_id, table.c.title, table.c.message, table.c.is_read, table.c.created_at)
+        inserted.extend(notification_payload(dict(r._mapping)) for r in db.execute(stmt))
+    announce(db, inserted)
+    apply_unread_deltas(db, Counter(p["user_id"] for p in inserted))
+    record_changes(db, "notifications", {(p["id"], p["user_id"]) for p in inserted})
+    return inserted
+
+
+def bulk_insert_notifications(db: Session, rows: list[dict]) -> int:
+    """insert_notifications + commit; returns the number of rows actually inserted."""
+    if not rows:
+        return 0
+    inserted = insert_notifications(db, rows)
+    db.commit()
+    return len(inserted)
+
 
 async def notification_loop():
     while True:
@@ -16,19 +82,13 @@ async def notification_loop():
             soon = now + timedelta(minutes=60)  # tasks due in next 60 minutes
             # pending tasks assigned to someone and due within next hour
             tasks = db.query(Task).filter(Task.assigned_to.isnot(None), Task.status != "Completed", Task.due_date.isnot(None), Task.due_date <= soon, Task.due_date >= now).all()
+            rows = []
             for t in tasks:
-                # create notification for assignee if not already created in last hour
-                exists = db.query(Notification).filter(Notification.task_id == t.id, Notification.user_id == t.assigned_to).order_by(Notification.created_at.desc()).first()
-                should_create = True
-                if exists:
-                    # if a similar notification exists within last 55 minutes skip
-                    if (now - exists.created_at).total_seconds() < 55 * 60:
-                        should_create = False
-                if should_create:
-                    msg = f"Task '{t.title}' is due at {t.due_date.isoformat()}. Please finish it."
-                    n = Notification(user_id=t.assigned_to, task_id=t.id, title="Task due soon", message=msg)
-                    db.add(n)
-                    db.commit()
+                # one reminder per task and assignee per hour
+                msg = f"Task '{t.title}' is due at {t.due_date.isoformat()}. Please finish it."
+                rows.append({"user_id": t.assigned_to, "task_id": t.id, "title": "Task due soon", "message": msg,
+                             "dedupe_key": dedupe_key("due_reminder", f"task:{t.id}", t.assigned_to, 3600, now)})
+            bulk_insert_notifications(db, rows)
             db.close()
         except Exception as e:
             # simple log; replace with proper logging
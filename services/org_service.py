@@ -0,0 +1,107 @@
+# services/org_service.py
+import threading
+import time
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from core.database import SessionLocal
+from models.user import User
+
+ORG_INDEX_TTL_SECONDS = 300  # safety net for changes made by other workers
+ORG_FIELDS = ("name", "role_name", "department", "team")
+
+_lock = threading.Lock()
+_index = None
+_built_at = 0.0
+
+
+class OrgIndex:
+    """
+    In-memory view of the org: which managers are responsible for which employee.
+    A manager is responsible for an employee when they share the employee's
+    department or team.
+    """
+
+    def __init__(self, rows):
+        self.managers_by_department: dict[str, set[int]] = {}
+        self.managers_by_team: dict[str, set[int]] = {}
+        self.all_managers: set[int] = set()
+        self.users: dict[int, tuple] = {}  # id -> (name, role_name, department, team)
+        self.members_by_department: dict[str, list[int]] = {}
+        self.members_by_team: dict[str, list[int]] = {}
+
+        for uid, name, role_name, department, team in rows:
+            self.users[uid] = (name, role_name, department, team)
+            if department:
+                self.members_by_department.setdefault(department, []).append(uid)
+            if team:
+                self.members_by_team.setdefault(team, []).append(uid)
+            if role_name and role_name.lower() == "manager":
+                self.all_managers.add(uid)
+                if department:
+                    self.managers_by_department.setdefault(department, set()).add(uid)
+                if team:
+                    self.managers_by_team.setdefault(team, set()).add(uid)
+
+    def managers_for(self, user_id: int | None) -> set[int]:
+        """Managers of the user's department and team; all managers if none match."""
+        info = self.users.get(user_id)
+        found = set()
+        if info:
+            _, _, department, team = info
+            found |= self.managers_by_department.get(department, set())
+            found |= self.managers_by_team.get(team, set())
+            found.discard(user_id)
+        return found or set(self.all_managers)
+
+    def members_for(self, team: str | None, department: str | None, default_user=None) -> list[int] | None:
+        """
+        Members of the team, else of the department; with neither given, the
+        default user's team (or department). None if nothing to resolve.
+        """
+        if team is None and department is None and default_user is not None:
+            team = default_user.team
+            department = None if team else default_user.department
+        if team is not None:
+            return self.members_by_team.get(team, [])
+        if department is not None:
+            return self.members_by_department.get(department, [])
+        return None
+
+
+def get_org_index(db: Session) -> OrgIndex:
+    global _index, _built_at
+    with _lock:
+        if _index is None or time.monotonic() - _built_at > ORG_INDEX_TTL_SECONDS:
+            rows = db.query(User.id, User.name, User.role_name, User.department, User.team).all()
+            _index = OrgIndex(rows)
+            _built_at = time.monotonic()
+        return _index
+
+
+def invalidate_org_index():
+    """Drop the index; ORM writes to users do this on commit, set-based writes must call it."""
+    global _index
+    with _lock:
+        _index = None
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _note_org_changes(session, flush_context):
+    for obj in (*session.new, *session.deleted, *session.dirty):
+        if not isinstance(obj, User):
+            continue
+        if obj in session.dirty and not any(inspect(obj).attrs[f].history.has_changes() for f in ORG_FIELDS):
+            continue
+        session.info["org_changed"] = True
+        return
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _invalidate_on_commit(session):
+    if session.info.pop("org_changed", False):
+        invalidate_org_index()
+
+
+@event.listens_for(SessionLocal, "after_soft_rollback")
+def _forget_org_changes(session, previous_transaction):
+    session.info.pop("org_changed", None)
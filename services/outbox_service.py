@@ -0,0 +1,231 @@
+# services/outbox_service.py
+"""
+Transactional outbox for domain events.
+
+Write paths record what happened with emit() in the same transaction as the
+change itself, so an event exists exactly when the change was committed, and the
+request does not pay for fan-out. The dispatcher loop claims pending events in
+batches (SKIP LOCKED on PostgreSQL, so several workers can run it), runs the
+handlers registered for each event type and writes the resulting notifications
+with one insert_notifications call per batch, marking the events dispatched in
+the same transaction. It is woken right after a commit that emitted events and
+polls as a fallback for events emitted by other processes.
+
+Handlers take (db, payload) and return notification dicts. New side effects are
+added as handlers in EVENT_HANDLERS. A handler that raises leaves its event
+pending for retry. If writing a batch fails, its events are retried one at a
+time so only the failing ones are charged an attempt. An event that reaches
+OUTBOX_MAX_ATTEMPTS is marked failed (failed_at), logged and no longer retried.
+"""
+import asyncio
+import time
+from datetime import timedelta
+from sqlalchemy import delete, event, insert, or_
+from sqlalchemy.orm import Session
+from core.database import SessionLocal
+from models.outbox_event import OutboxEvent
+from services.notification_service import insert_notifications
+from utils.timezone import now_ist
+
+OUTBOX_BATCH_SIZE = 500
+OUTBOX_POLL_SECONDS = 2
+OUTBOX_MAX_ATTEMPTS = 5
+OUTBOX_RETENTION_DAYS = 7
+OUTBOX_PRUNE_INTERVAL_SECONDS = 3600
+
+
+# --- emitting ---------------------------------------------------------------
+
+def emit(db: Session, event_type: str, payload: dict):
+    """Record an event in the current transaction (JSON-ready payload)."""
+    db.add(OutboxEvent(event_type=event_type, payload=payload, created_at=now_ist()))
+    db.info["outbox_emitted"] = True
+
+
+def emit_many(db: Session, events: list[tuple[str, dict]]):
+    """Set-based emit for bulk writers."""
+    if not events:
+        return
+    now = now_ist()
+    db.execute(insert(OutboxEvent), [{"event_type": t, "payload": p, "created_at": now, "attempts": 0} for t, p in events])
+    db.info["outbox_emitted"] = True
+
+
+def task_ref(task) -> dict:
+    """Event payload fields for a task (ORM object or row with task_id)."""
+    return {"task_id": getattr(task, "task_id", None) or task.id, "title": task.title,
+            "status": task.status, "assigned_to": task.assigned_to}
+
+
+# --- handlers ---------------------------------------------------------------
+
+def assignment_notifications(db: Session, payload: dict) -> list[dict]:
+    return [{"user_id": t["assigned_to"], "task_id": t["task_id"], "title": "New Task Assigned",
+             "message": f"You have been assigned a new task: '{t['title']}'"}
+            for t in payload["tasks"] if t.get("assigned_to")]
+
+
+def update_notifications(db: Session, payload: dict) -> list[dict]:
+    """One notification per assignee: the task itself, or a summary when several of theirs changed."""
+    status = payload.get("status")
+    by_user: dict[int, list] = {}
+    for t in payload["tasks"]:
+        if t.get("assigned_to"):
+            by_user.setdefault(t["assigned_to"], []).append(t)
+    rows = []
+    for uid, tasks in by_user.items():
+        if len(tasks) == 1:
+            t = tasks[0]
+            rows.append({"user_id": uid, "task_id": t["task_id"], "title": "Task Updated",
+                         "message": f"Task '{t['title']}' has been updated. Current status: {status or t['status']}"})
+        else:
+            detail = f" Current status: {status}" if status else ""
+            rows.append({"user_id": uid, "task_id": None, "title": "Tasks Updated",
+                         "message": f"{len(tasks)} of your tasks have been updated.{detail}"})
+    return rows
+
+
+def leave_decision_notifications(db: Session, payload: dict) -> list[dict]:
+    status = str(payload["status"]).lower()
+    return [{"user_id": payload["user_id"], "task_id": None, "title": f"Leave {status.capitalize()}",
+             "message": f"Your leave request from {payload['start_date'][:10]} to {payload['end_date'][:10]} has been {status}."}]
+
+
+def tracking_notifications(db: Session, payload: dict) -> list[dict]:
+    if not payload.get("assigned_to"):
+        return []
+    remarks = f" Remarks: {payload['remarks']}" if payload.get("remarks") else ""
+    return [{"user_id": payload["assigned_to"], "task_id": payload["task_id"], "title": "Task Status Updated",
+             "message": f"Task '{payload['title']}' is now '{payload['status']}'.{remarks}"}]
+
+
+# event type -> handlers, run in order
+EVENT_HANDLERS = {
+    "tasks.assigned": (assignment_notifications,),   # {"tasks": [task_ref, ...]}
+    "tasks.updated": (update_notifications,),        # {"status": str | None, "tasks": [task_ref, ...]}
+    "leave.decided": (leave_decision_notifications,),
+    "tracking.recorded": (tracking_notifications,),
+}
+
+
+# --- dispatching ------------------------------------------------------------
+
+def _claim(db: Session, batch_size: int = OUTBOX_BATCH_SIZE, ids=None) -> list[OutboxEvent]:
+    q = db.query(OutboxEvent).filter(OutboxEvent.dispatched_at.is_(None), OutboxEvent.failed_at.is_(None))
+    if ids is not None:
+        q = q.filter(OutboxEvent.id.in_(ids))
+    return q.order_by(OutboxEvent.id).limit(batch_size).with_for_update(skip_locked=True).all()
+
+
+def _charge_attempt(ev: OutboxEvent, error: str, now):
+    ev.attempts += 1
+    ev.last_error = error
+    if ev.attempts >= OUTBOX_MAX_ATTEMPTS:
+        ev.failed_at = now
+        print(f"outbox: event {ev.id} ({ev.event_type}) failed after {ev.attempts} attempts: {error}")
+
+
+def _deliver(db: Session, events: list[OutboxEvent]):
+    """Run handlers and write the notifications for claimed events (the caller commits)."""
+    now = now_ist()
+    rows = []
+    for ev in events:
+        try:
+            produced = []
+            for handler in EVENT_HANDLERS.get(ev.event_type, ()):
+                produced.extend(handler(db, ev.payload))
+        except Exception as exc:
+            _charge_attempt(ev, f"{type(exc).__name__}: {exc}"[:1000], now)
+            continue
+        # keyed by event, so a notification is never written twice for one event
+        for i, r in enumerate(produced):
+            r.setdefault("dedupe_key", f"outbox:{ev.id}:{i}")
+        rows.extend(produced)
+        ev.dispatched_at = now
+    insert_notifications(db, rows)
+
+
+def _record_failure(db: Session, event_id: int, exc: Exception):
+    events = _claim(db, 1, ids=[event_id])
+    if events:
+        _charge_attempt(events[0], f"{type(exc).__name__}: {exc}"[:1000], now_ist())
+    db.commit()
+
+
+def dispatch_outbox(db: Session, batch_size: int = OUTBOX_BATCH_SIZE) -> int:
+    """Dispatch one batch of pending events in one transaction. Returns the number of events claimed."""
+    events = _claim(db, batch_size)
+    if not events:
+        db.rollback()
+        return 0
+    ids = [ev.id for ev in events]
+    try:
+        _deliver(db, events)
+        db.commit()
+        return len(ids)
+    except Exception as exc:
+        db.rollback()
+        if len(ids) == 1:
+            _record_failure(db, ids[0], exc)
+            return 1
+        print(f"outbox: batch of {len(ids)} failed ({type(exc).__name__}: {exc}); retrying events one at a time")
+    for eid in ids:
+        events = _claim(db, 1, ids=[eid])
+        if not events:
+            db.rollback()
+            continue
+        try:
+            _deliver(db, events)
+            db.commit()
+        except Exception as exc:
+            db.rollback()
+            _record_failure(db, eid, exc)
+    return len(ids)
+
+
+def prune_outbox(db: Session, older_than_days: int = OUTBOX_RETENTION_DAYS) -> int:
+    cutoff = now_ist() - timedelta(days=older_than_days)
+    removed = db.execute(delete(OutboxEvent).where(or_(OutboxEvent.dispatched_at < cutoff, OutboxEvent.failed_at < cutoff))).rowcount
+    db.commit()
+    return removed
+
+
+_loop: asyncio.AbstractEventLoop | None = None
+_wake: asyncio.Event | None = None
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _wake_dispatcher(session):
+    if session.info.pop("outbox_emitted", False) and _loop is not None:
+        _loop.call_soon_threadsafe(_wake.set)
+
+
+@event.listens_for(SessionLocal, "after_soft_rollback")
+def _forget_emitted(session, previous_transaction):
+    session.info.pop("outbox_emitted", None)
+
+
+async def outbox_dispatch_loop():
+    global _loop, _wake
+    _loop = asyncio.get_running_loop()
+    _wake = asyncio.Event()
+    last_prune = 0.0
+    while True:
+        claimed = 0
+        db = SessionLocal()
+        try:
+            claimed = await asyncio.to_thread(dispatch_outbox, db)
+            if time.monotonic() - last_prune > OUTBOX_PRUNE_INTERVAL_SECONDS:
+                await asyncio.to_thread(prune_outbox, db)
+                last_prune = time.monotonic()
+        except Exception as exc:
+            print("outbox_dispatch_loop error:", exc)
+        finally:
+            db.close()
+        if claimed >= OUTBOX_BATCH_SIZE:
+            continue  # backlog: keep draining
+        try:
+            await asyncio.wait_for(_wake.wait(), timeout=OUTBOX_POLL_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+        _wake.clear()
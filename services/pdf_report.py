@@ -0,0 +1,185 @@
+# services/pdf_report.py
+"""
+Paginated PDF table renderer.
+
+Cells are formatted column-wise up front (no per-row pandas access), column
+widths come from a sample of the data, and each page is drawn with one text
+object per column instead of one drawString per cell. Every page has the same
+layout (title, header row, fixed rows per page), so independent page ranges can
+be rendered in worker processes and merged afterwards when pypdf is installed.
+"""
+import io
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from reportlab.lib.pagesizes import letter, landscape
+from reportlab.lib.rl_accel import escapePDF
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.pdfgen import canvas
+
+try:
+    from pypdf import PdfWriter
+except ImportError:  # optional: without it large tables are rendered in-process
+    PdfWriter = None
+
+FONT = "Helvetica"
+FONT_BOLD = "Helvetica-Bold"
+FONT_SIZE = 8
+TITLE_SIZE = 12
+ROW_HEIGHT = 11
+MARGIN = 30
+CELL_PADDING = 6
+MIN_COL_WIDTH = 36
+WIDTH_SAMPLE_ROWS = 2000
+WIDTH_PERCENTILE = 95            # wider outliers are truncated with an ellipsis
+PARALLEL_MIN_ROWS = 20000        # below this a process pool costs more than it saves
+PAGES_PER_PART = 200
+PDF_WORKERS = max(1, min(4, (os.cpu_count() or 1)))
+
+_WIDEST_GLYPH = stringWidth("W", FONT, FONT_SIZE)
+_ELLIPSIS = "…"
+
+_pool: ProcessPoolExecutor | None = None
+
+
+def _format_column(s: pd.Series) -> list[str]:
+    if pd.api.types.is_float_dtype(s):
+        out = np.char.mod("%.2f", s.to_numpy(dtype=float, na_value=0.0))
+        missing = s.isna().to_numpy()
+        if missing.any():
+            out = np.where(missing, "", out)
+        return out.tolist()
+    # element-wise: a fixed-width str array sized from a column with missing values truncates cells
+    return ["" if pd.isna(v) else str(v).replace("\n", " ") for v in s]
+
+
+def _column_widths(headers: list[str], columns: list[list[str]], available: float) -> list[float]:
+    """Header width or the WIDTH_PERCENTILE of sampled cell widths, scaled to fit the page."""
+    n = len(columns[0]) if columns else 0
+    idx = np.unique(np.linspace(0, n - 1, min(n, WIDTH_SAMPLE_ROWS)).astype(int)) if n else []
+    widths = []
+    for header, col in zip(headers, columns):
+        sample = [stringWidth(col[i], FONT, FONT_SIZE) for i in idx]
+        data_w = float(np.percentile(sample, WIDTH_PERCENTILE)) if sample else 0.0
+        widths.append(max(MIN_COL_WIDTH, stringWidth(header, FONT_BOLD, FONT_SIZE), data_w) + CELL_PADDING)
+    total = sum(widths)
+    if total > available:
+        scale = available / total
+        widths = [max(MIN_COL_WIDTH, w * scale) for w in widths]
+    return widths
+
+
+def _fit(text: str, max_width: float, font: str = FONT) -> str:
+    # cheap length check first; only long cells pay for exact measurement
+    if len(text) * _WIDEST_GLYPH <= max_width or stringWidth(text, font, FONT_SIZE) <= max_width:
+        return text
+    lo, hi = 0, len(text)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if stringWidth(text[:mid] + _ELLIPSIS, font, FONT_SIZE) <= max_width:
+            lo = mid
+        else:
+            hi = mid - 1
+    return text[:lo] + _ELLIPSIS
+
+
+def _pdf_strings(col: list[str], max_width: float) -> list[str]:
+    """Fit and escape a column's cells once; repeated values (names, dates) hit the cache."""
+    cache = {}
+    out = []
+    for text in col:
+        enc = cache.get(text)
+        if enc is None:
+            enc = cache[text] = escapePDF(_fit(text, max_width).encode("cp1252", "replace"))
+        out.append(enc)
+    return out
+
+
+def _render_pages(title: str, headers: list[str], widths: list[float], columns: list[list[str]],
+                  first_page: int, total_pages: int, rows_per_page: int, pagesize) -> bytes:
+    """Render rows of columns (already sliced to this page range) into a standalone PDF."""
+    buf = io.BytesIO()
+    c = canvas.Canvas(buf, pagesize=pagesize, pageCompression=1)
+    page_w, page_h = pagesize
+    fitted_headers = [_fit(h, w - CELL_PADDING, FONT_BOLD) for h, w in zip(headers, widths)]
+    xs = np.concatenate(([MARGIN], MARGIN + np.cumsum(widths[:-1]))).tolist()
+    right = MARGIN + sum(widths)
+    cells = [_pdf_strings(col, w - CELL_PADDING) for col, w in zip(columns, widths)]
+    n = len(columns[0]) if columns else 0
+    header_y = page_h - MARGIN - TITLE_SIZE - 10
+    page_no = first_page
+    for start in range(0, max(n, 1), rows_per_page):
+        c.setFont(FONT_BOLD, TITLE_SIZE)
+        c.drawString(MARGIN, page_h - MARGIN - TITLE_SIZE, title)
+        c.setFont(FONT, FONT_SIZE)
+        c.drawRightString(page_w - MARGIN, MARGIN / 2, f"Page {page_no} of {total_pages}")
+        c.setFont(FONT_BOLD, FONT_SIZE)
+        for x, h in zip(xs, fitted_headers):
+            c.drawString(x, header_y, h)
+        c.setLineWidth(0.5)
+        c.line(MARGIN, header_y - 3, right, header_y - 3)
+        # one text object per column; the ' operator moves down one leading and
+        # shows the string, so the page body costs a join per column instead of
+        # a textLine call per cell (font and leading persist from setFont)
+        c.setFont(FONT, FONT_SIZE, leading=ROW_HEIGHT)
+        for x, col in zip(xs, cells):
+            page = col[start:start + rows_per_page]
+            if page:
+                c.addLiteral(f"BT 1 0 0 1 {x:.2f} {header_y - 2:.2f} Tm\n(" + ")'\n(".join(page) + ")' ET")
+        c.showPage()
+        page_no += 1
+    c.save()
+    return buf.getvalue()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # spawn: export jobs run in threads, and forking a threaded process is unsafe
+        _pool = ProcessPoolExecutor(max_workers=PDF_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    return _pool
+
+
+def render_table_pdf(df: pd.DataFrame, path: str, title: str = "Report", pagesize=None, parallel: bool | None = None) -> str:
+    """
+    Write df as a paginated table to path. Wide tables default to landscape.
+    parallel=None renders page ranges in worker processes when the table is
+    large, more than one CPU is available and pypdf can merge the parts.
+    """
+    headers = [str(col) for col in df.columns]
+    columns = [_format_column(df[col]) for col in df.columns]
+    if pagesize is None:
+        pagesize = landscape(letter) if len(headers) > 5 else letter
+    page_w, page_h = pagesize
+    widths = _column_widths(headers, columns, page_w - 2 * MARGIN)
+    rows_per_page = int((page_h - 2 * MARGIN - TITLE_SIZE - 10 - ROW_HEIGHT) // ROW_HEIGHT)
+    n = len(df)
+    total_pages = max(1, -(-n // rows_per_page))
+
+    if parallel is None:
+        parallel = n >= PARALLEL_MIN_ROWS and PDF_WORKERS > 1 and PdfWriter is not None
+    if parallel and PdfWriter is None:
+        raise RuntimeError("Parallel PDF rendering requires pypdf")
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    if not parallel or total_pages <= PAGES_PER_PART:
+        data = _render_pages(title, headers, widths, columns, 1, total_pages, rows_per_page, pagesize)
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    rows_per_part = rows_per_page * PAGES_PER_PART
+    futures = []
+    for part_start in range(0, n, rows_per_part):
+        part = [col[part_start:part_start + rows_per_part] for col in columns]
+        first_page = part_start // rows_per_page + 1
+        futures.append(_get_pool().submit(_render_pages, title, headers, widths, part,
+                                          first_page, total_pages, rows_per_page, pagesize))
+    writer = PdfWriter()
+    for fut in futures:
+        writer.append(io.BytesIO(fut.result()))
+    with open(path, "wb") as f:
+        writer.write(f)
+    return path
@@ -0,0 +1,146 @@
+# services/presence_service.py
+"""
+Heartbeat-based presence (last seen / last active per user).
+
+Agents and clients send heartbeats that only touch an in-memory map. A flush
+loop writes the entries that changed since the previous flush to user_presence
+with one upsert per PRESENCE_FLUSH_SECONDS, however many heartbeats arrived in
+between. The upsert only moves timestamps forward, so several workers can
+flush the same user. Readers look users up by primary key in user_presence and
+overlay this process's newer, unflushed entries, so a team view costs O(team
+size) and never touches the history tables.
+"""
+import asyncio
+import threading
+from datetime import datetime, timedelta
+from sqlalchemy import case
+from sqlalchemy.orm import Session
+from core.database import SessionLocal, dialect_insert
+from models.user_presence import UserPresence
+from utils.timezone import IST, now_ist
+
+HEARTBEAT_INTERVAL_SECONDS = 60      # what clients are asked to send
+ONLINE_WINDOW_SECONDS = 180          # no heartbeat for this long -> offline
+PRESENCE_IDLE_MINUTES = 5            # online without input for this long -> idle
+PRESENCE_FLUSH_SECONDS = 15
+PRESENCE_FLUSH_BATCH_SIZE = 500
+
+
+class PresenceStore:
+    """Thread-safe user_id -> {"last_seen_at", "last_active_at", "source"} with a dirty set for flushing."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: dict[int, dict] = {}
+        self._dirty: set[int] = set()
+
+    def heartbeat(self, user_id: int, active_at: datetime | None, source: str | None, at: datetime | None = None):
+        at = at or now_ist()
+        with self._lock:
+            entry = self._entries.setdefault(user_id, {"last_seen_at": None, "last_active_at": None, "source": None})
+            if entry["last_seen_at"] is None or at > entry["last_seen_at"]:
+                entry["last_seen_at"] = at
+            if active_at is not None and (entry["last_active_at"] is None or active_at > entry["last_active_at"]):
+                entry["last_active_at"] = active_at
+            entry["source"] = source or entry["source"]
+            self._dirty.add(user_id)
+
+    def get_many(self, user_ids) -> dict[int, dict]:
+        with self._lock:
+            return {uid: dict(self._entries[uid]) for uid in user_ids if uid in self._entries}
+
+    def take_dirty(self) -> list[dict]:
+        with self._lock:
+            rows = [{"user_id": uid, **self._entries[uid]} for uid in self._dirty]
+            self._dirty.clear()
+        return rows
+
+    def mark_dirty(self, user_ids):
+        """Put entries back after a failed flush."""
+        with self._lock:
+            self._dirty.update(uid for uid in user_ids if uid in self._entries)
+
+
+presence_store = PresenceStore()
+
+
+def _later(current, new):
+    # the newer of two nullable timestamps, as SQL
+    return case((new.is_(None), current), (current.is_(None), new), (new > current, new), else_=current)
+
+
+def flush_presence(db: Session) -> int:
+    """Write heartbeats received since the last flush. Returns the number of users written."""
+    rows = presence_store.take_dirty()
+    if not rows:
+        return 0
+    table = UserPresence.__table__
+    try:
+        for i in range(0, len(rows), PRESENCE_FLUSH_BATCH_SIZE):
+            stmt = dialect_insert(table).values(rows[i:i + PRESENCE_FLUSH_BATCH_SIZE])
+            stmt = stmt.on_conflict_do_update(index_elements=["user_id"], set_={
+                "last_seen_at": _later(table.c.last_seen_at, stmt.excluded.last_seen_at),
+                "last_active_at": _later(table.c.last_active_at, stmt.excluded.last_active_at),
+                "source": stmt.excluded.source,
+            })
+            db.execute(stmt)
+        db.commit()
+    except Exception:
+        db.rollback()
+        presence_store.mark_dirty(r["user_id"] for r in rows)
+        raise
+    return len(rows)
+
+
+def _aware(ts: datetime | None) -> datetime | None:
+    # SQLite hands back naive IST wall-clock values; PostgreSQL returns the session time zone
+    if ts is None:
+        return None
+    return IST.localize(ts) if ts.tzinfo is None else ts.astimezone(IST)
+
+
+def get_presence(db: Session, user_ids) -> dict[int, dict]:
+    """Presence of the given users: stored rows overlaid with newer in-memory heartbeats."""
+    user_ids = list(user_ids)
+    if not user_ids:
+        return {}
+    found = {
+        r.user_id: {"last_seen_at": _aware(r.last_seen_at), "last_active_at": _aware(r.last_active_at), "source": r.source}
+        for r in db.query(UserPresence).filter(UserPresence.user_id.in_(user_ids))
+    }
+    for uid, live in presence_store.get_many(user_ids).items():
+        stored = found.get(uid)
+        if stored is None:
+            found[uid] = {**live, "last_seen_at": _aware(live["last_seen_at"]), "last_active_at": _aware(live["last_active_at"])}
+            continue
+        for key in ("last_seen_at", "last_active_at"):
+            if live[key] is not None and (stored[key] is None or _aware(live[key]) > stored[key]):
+                stored[key] = _aware(live[key])
+        stored["source"] = live["source"] or stored["source"]
+    return found
+
+
+def presence_state(p: dict | None, now: datetime | None = None) -> str:
+    """"online", "idle" (heartbeating without user input) or "offline"."""
+    now = _aware(now or now_ist())
+    if p is None or p["last_seen_at"] is None or _aware(p["last_seen_at"]) < now - timedelta(seconds=ONLINE_WINDOW_SECONDS):
+        return "offline"
+    if p["last_active_at"] is None or _aware(p["last_active_at"]) < now - timedelta(minutes=PRESENCE_IDLE_MINUTES):
+        return "idle"
+    return "online"
+
+
+def inactive_since(p: dict, cutoff: datetime) -> bool:
+    """True if the user had no input at or after cutoff."""
+    return p["last_active_at"] is None or _aware(p["last_active_at"]) < _aware(cutoff)
+
+
+async def presence_flush_loop():
+    while True:
+        await asyncio.sleep(PRESENCE_FLUSH_SECONDS)
+        try:
+            db = SessionLocal()
+            await asyncio.to_thread(flush_presence, db)
+            db.close()
+        except Exception as exc:
+            print("presence_flush_loop error:", exc)
@@ -0,0 +1,97 @@
+# services/report_cache.py
+"""
+Result cache for reporting endpoints.
+
+Writes bump per-table data versions (data_versions, in the writing transaction)
+and every cached report remembers the versions it was computed from, so an entry
+is served only while none of its source tables changed. Old periods get no
+exemption: facts for past days still change (task updates, leave approvals,
+fact rebuilds).
+"""
+import threading
+from collections import OrderedDict
+from datetime import date
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from core.database import SessionLocal, dialect_insert
+from models.data_version import DataVersion
+
+REPORT_CACHE_MAX_ENTRIES = 256
+
+# tables whose writes invalidate reports
+# (user_day_facts is bumped explicitly by fact rebuilds; flush-time refreshes ride on their source tables)
+VERSIONED_TABLES = {"tasks", "projects", "attendance", "trackings", "users", "leaves", "employee_monitoring", "productivity", "user_day_facts"}
+REPORT_SOURCES = ("tasks", "attendance", "trackings", "users", "user_day_facts")
+SUGGESTION_SOURCES = (*REPORT_SOURCES, "employee_monitoring")  # idle/active-minute rules read monitoring facts
+
+
+def bump_versions(db: Session, tables):
+    """Increment data versions inside the current transaction (for set-based writes)."""
+    table = DataVersion.__table__
+    conn = db.connection()
+    for name in sorted(set(tables) & VERSIONED_TABLES):
+        stmt = dialect_insert(table).values(name=name, version=1)
+        conn.execute(stmt.on_conflict_do_update(index_elements=["name"], set_={"version": table.c.version + 1}))
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _bump_on_flush(session, flush_context):
+    touched = {obj.__tablename__ for obj in (*session.new, *session.dirty, *session.deleted)
+               if getattr(obj, "__tablename__", None) in VERSIONED_TABLES}
+    if touched:
+        bump_versions(session, touched)
+
+
+def current_versions(db: Session, tables=REPORT_SOURCES) -> tuple:
+    found = dict(db.query(DataVersion.name, DataVersion.version).filter(DataVersion.name.in_(tables)).all())
+    return tuple(found.get(t, 0) for t in tables)
+
+
+class ReportCache:
+    def __init__(self, max_entries: int = REPORT_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_or_compute(self, db: Session, endpoint: str, start: date, end: date, compute, params: tuple = (), sources=REPORT_SOURCES):
+        key = (endpoint, start, end, params)
+        versions = current_versions(db, sources)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == versions:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        value = compute()
+        with self._lock:
+            self._entries[key] = (versions, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+report_cache = ReportCache()
@@ -1,4 +1,5 @@
 # services/report_service.py
+from sqlalchemy import and_, case, func, or_, select
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta, date
 from utils.timezone import now_ist
@@ -6,11 +7,13 @@ from models.task import Task
 from models.attendance import Attendance
 from models.user import User
 from models.project import Project
+from models.user_day_fact import UserDayFact
+import numpy as np
 import pandas as pd
 from dateutil.relativedelta import relativedelta
 import io
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
+from services.pdf_report import render_table_pdf
+from services.suggestion_engine import load_suggestion_rules, suggestion_metrics, rank_suggestions, format_reason
 import os
 
 def _normalize_dates(period: str, start_date: date | None, end_date: date | None):
@@ -33,92 +36,130 @@ def _normalize_dates(period: str, start_date: date | None, end_date: date | None
         e = today
     return s, e
 
-def productivity_dataframe(db: Session, period: str="day", start_date: date|None=None, end_date: date|None=None):
-    s, e = _normalize_dates(period, start_date, end_date)
-    # fetch tasks in range (created or updated within range)
-    tasks = db.query(Task).filter(
-        Task.created_at >= datetime.combine(s, datetime.min.time()),
-        Task.created_at <= datetime.combine(e, datetime.max.time())
-    ).all()
-    # attendance rows in range
-    atts = db.query(Attendance).filter(
-        Attendance.date >= datetime.combine(s, datetime.min.time()),
-        Attendance.date <= datetime.combine(e, datetime.max.time())
-    ).all()
-
-    # build DataFrame for tasks per user & per day
-    task_rows = []
-    for t in tasks:
-        created_date = t.created_at.date() if t.created_at else None
-        is_completed = (t.status and t.status.lower() == "completed")
-        task_rows.append({
-            "date": created_date,
-            "user_id": t.assigned_to,
-            "user_name": t.assignee.name if t.assignee else None,
-            "task_id": t.id,
-            "completed": 1 if is_completed else 0
-        })
-
-    if task_rows:
-        df_tasks = pd.DataFrame(task_rows)
-    else:
-        df_tasks = pd.DataFrame(columns=["date","user_id","user_name","task_id","completed"])
+def productivity_query(s: date, e: date):
+    """
+    Per-date, per-user rows for [s, e] read from user_day_facts (maintained by
+    services.fact_service), so the scan is bounded by users x days.
+    """
+    return select(
+        UserDayFact.day.label("date"),
+        UserDayFact.user_id,
+        User.name.label("user_name"),
+        UserDayFact.tasks_assigned,
+        UserDayFact.tasks_completed,
+        UserDayFact.work_hours,
+    ).join(User, User.id == UserDayFact.user_id).where(
+        UserDayFact.day >= s, UserDayFact.day <= e,
+        or_(UserDayFact.tasks_assigned > 0, UserDayFact.work_hours > 0),
+    ).order_by(UserDayFact.day, UserDayFact.user_id)
 
-    # attendance aggregation per user per day
-    att_rows = []
-    for a in atts:
-        att_date = a.date.date() if a.date else None
-        att_rows.append({
-            "date": att_date,
-            "user_id": a.user_id,
-            "work_hours": a.work_hours or 0.0
-        })
-    if att_rows:
-        df_att = pd.DataFrame(att_rows)
-    else:
-        df_att = pd.DataFrame(columns=["date","user_id","work_hours"])
+PRODUCTIVITY_HEADERS = {"date":"Date","user_id":"User ID","user_name":"User Name","tasks_assigned":"Tasks Assigned","tasks_completed":"Tasks Completed","completion_rate":"Completion %","work_hours":"Work Hours"}
 
-    # group by date & user
-    task_grp = df_tasks.groupby(["date","user_id","user_name"]).agg(tasks_assigned=("task_id","nunique"), tasks_completed=("completed","sum")).reset_index()
-    att_grp = df_att.groupby(["date","user_id"]).agg(work_hours=("work_hours","sum")).reset_index()
+def productivity_export_row(r) -> tuple:
+    """productivity_query row -> export row in PRODUCTIVITY_HEADERS order."""
+    day, uid, name, assigned, completed, hours = r
+    rate = round(completed * 100.0 / assigned, 2) if assigned else 0.0
+    return (day, uid, name, assigned, completed, rate, round(hours or 0.0, 2))
 
-    merged = pd.merge(task_grp, att_grp, how="outer", left_on=["date","user_id"], right_on=["date","user_id"]).fillna(0)
-    # ensure user_name column
-    if "user_name" not in merged.columns:
-        merged["user_name"] = None
+def productivity_dataframe(db: Session, period: str="day", start_date: date|None=None, end_date: date|None=None):
+    s, e = _normalize_dates(period, start_date, end_date)
+    result = db.execute(productivity_query(s, e))
+    merged = pd.DataFrame(result.fetchall(), columns=list(result.keys()))
+    if merged.empty:
+        merged = pd.DataFrame(columns=["date","user_id","user_name","tasks_assigned","tasks_completed","work_hours"])
 
-    # completion rate
-    merged["completion_rate"] = merged.apply(lambda r: (r["tasks_completed"] / r["tasks_assigned"] * 100) if r["tasks_assigned"]>0 else 0.0, axis=1)
+    merged["date"] = pd.to_datetime(merged["date"]).dt.date
     # fill types
-    merged["tasks_assigned"] = merged["tasks_assigned"].astype(int)
-    merged["tasks_completed"] = merged["tasks_completed"].astype(int)
-    merged["work_hours"] = merged["work_hours"].astype(float)
-    merged = merged.sort_values(["date","user_id"])
+    merged["tasks_assigned"] = merged["tasks_assigned"].fillna(0).astype(int)
+    merged["tasks_completed"] = merged["tasks_completed"].fillna(0).astype(int)
+    merged["work_hours"] = merged["work_hours"].fillna(0).astype(float)
+    # completion rate
+    assigned = merged["tasks_assigned"].to_numpy()
+    merged["completion_rate"] = np.where(assigned > 0, merged["tasks_completed"].to_numpy() * 100.0 / np.maximum(assigned, 1), 0.0)
     return merged, s, e
 
+DASHBOARD_GROUP_FIELDS = ("department", "team")
+
 def department_dashboard(db: Session, start_date: date, end_date: date, dept_field: str="department"):
     """
-    If you have a department field on user model, group by department.
-    dept_field default 'department' but adapt to your schema.
+    Task and attendance totals per department (or per team with dept_field="team"),
+    computed in a single grouped query over user_day_facts; users without a value
+    fall under 'Unknown'.
     """
-    # try to access user's department attribute; fallback to 'Unknown'
-    users = db.query(User).all()
-    rows = []
-    for u in users:
-        dept = getattr(u, dept_field, "Unknown")
-        # compute stats
-        tasks_assigned = db.query(Task).filter(Task.assigned_to == u.id, Task.created_at >= datetime.combine(start_date, datetime.min.time()), Task.created_at <= datetime.combine(end_date, datetime.max.time())).count()
-        tasks_completed = db.query(Task).filter(Task.assigned_to == u.id, Task.status.ilike("%completed%"), Task.created_at >= datetime.combine(start_date, datetime.min.time()), Task.created_at <= datetime.combine(end_date, datetime.max.time())).count()
-        work = db.query(Attendance).filter(Attendance.user_id==u.id, Attendance.date>=datetime.combine(start_date, datetime.min.time()), Attendance.date<=datetime.combine(end_date, datetime.max.time())).all()
-        total_hours = sum([a.work_hours or 0.0 for a in work])
-        rows.append({"department": dept, "user_id": u.id, "user_name": u.name, "tasks_assigned":tasks_assigned, "tasks_completed":tasks_completed, "work_hours": total_hours})
-    df = pd.DataFrame(rows)
-    if df.empty:
-        return df
-    grouped = df.groupby("department").agg(tasks_assigned=("tasks_assigned","sum"), tasks_completed=("tasks_completed","sum"), work_hours=("work_hours","sum")).reset_index()
-    grouped["completion_rate"] = grouped.apply(lambda r: (r["tasks_completed"]/r["tasks_assigned"]*100) if r["tasks_assigned"]>0 else 0.0, axis=1)
+    if dept_field not in DASHBOARD_GROUP_FIELDS:
+        raise ValueError(f"Unsupported dashboard grouping: {dept_field}")
+    group_col = func.coalesce(getattr(User, dept_field), "Unknown")
+    in_range = and_(UserDayFact.user_id == User.id, UserDayFact.day >= start_date, UserDayFact.day <= end_date)
+    result = db.execute(select(
+        group_col.label(dept_field),
+        func.coalesce(func.sum(UserDayFact.tasks_assigned), 0).label("tasks_assigned"),
+        func.coalesce(func.sum(UserDayFact.tasks_completed), 0).label("tasks_completed"),
+        func.coalesce(func.sum(UserDayFact.work_hours), 0.0).label("work_hours"),
+    ).select_from(User).outerjoin(UserDayFact, in_range).group_by(group_col).order_by(group_col))
+    grouped = pd.DataFrame(result.fetchall(), columns=list(result.keys()))
+    if grouped.empty:
+        return grouped
+    grouped["tasks_assigned"] = grouped["tasks_assigned"].astype(int)
+    grouped["tasks_completed"] = grouped["tasks_completed"].astype(int)
+    grouped["work_hours"] = grouped["work_hours"].astype(float)
+    assigned = grouped["tasks_assigned"].to_numpy()
+    grouped["completion_rate"] = np.where(assigned > 0, grouped["tasks_completed"].to_numpy() * 100.0 / np.maximum(assigned, 1), 0.0)
     return grouped
 
+def previous_period(period: str, s: date, e: date):
+    """The period before [s, e]: the previous calendar month for "month", else the same number of days just before s."""
+    if period == "month":
+        return s - relativedelta(months=1), s - timedelta(days=1)
+    length = (e - s).days + 1
+    return s - timedelta(days=length), s - timedelta(days=1)
+
+COMPARE_METRICS = ("tasks_assigned", "tasks_completed", "work_hours")
+
+def _with_deltas(df: pd.DataFrame) -> pd.DataFrame:
+    for side in ("current", "previous"):
+        assigned = df[f"tasks_assigned_{side}"].to_numpy()
+        df[f"completion_rate_{side}"] = np.where(assigned > 0, df[f"tasks_completed_{side}"].to_numpy() * 100.0 / np.maximum(assigned, 1), 0.0)
+    for m in (*COMPARE_METRICS, "completion_rate"):
+        df[f"{m}_delta"] = df[f"{m}_current"] - df[f"{m}_previous"]
+    df = df.round(2)
+    counts = [c for c in df.columns if c.startswith(("tasks_assigned_", "tasks_completed_"))]
+    df[counts] = df[counts].astype(int)
+    return df
+
+def period_comparison(db: Session, s: date, e: date, prev_s: date, prev_e: date) -> dict:
+    """
+    Current vs previous period totals and deltas per user, team and department.
+    Both periods come from one grouped scan of user_day_facts over [prev_s, e]
+    (conditional sums per user); teams and departments are rolled up from the
+    user rows. Users without a team/department fall under 'Unknown'.
+    """
+    in_current = UserDayFact.day >= s
+    in_previous = and_(UserDayFact.day >= prev_s, UserDayFact.day <= prev_e)
+    sums = []
+    for m in COMPARE_METRICS:
+        col = getattr(UserDayFact, m)
+        sums.append(func.coalesce(func.sum(case((in_current, col), else_=0)), 0).label(f"{m}_current"))
+        sums.append(func.coalesce(func.sum(case((in_previous, col), else_=0)), 0).label(f"{m}_previous"))
+    result = db.execute(select(
+        UserDayFact.user_id,
+        User.name.label("user_name"),
+        func.coalesce(User.team, "Unknown").label("team"),
+        func.coalesce(User.department, "Unknown").label("department"),
+        *sums,
+    ).join(User, User.id == UserDayFact.user_id).where(
+        UserDayFact.day >= min(prev_s, s), UserDayFact.day <= e,
+    ).group_by(UserDayFact.user_id, User.name, User.team, User.department).order_by(UserDayFact.user_id))
+    users = pd.DataFrame(result.fetchall(), columns=list(result.keys()))
+    if users.empty:
+        return {"users": [], "teams": [], "departments": []}
+    value_cols = [c for c in users.columns if c.endswith(("_current", "_previous"))]
+    users[value_cols] = users[value_cols].astype(float)
+    out = {"users": _with_deltas(users).to_dict(orient="records")}
+    for key, label in (("team", "teams"), ("department", "departments")):
+        rolled = users.groupby(key, sort=True)[value_cols].sum().reset_index()
+        out[label] = _with_deltas(rolled).to_dict(orient="records")
+    return out
+
 def save_dataframe_to_excel(df: pd.DataFrame, filename: str):
     path = os.path.join("exports", filename)
     os.makedirs(os.path.dirname(path), exist_ok=True)
@@ -127,63 +168,33 @@ def save_dataframe_to_excel(df: pd.DataFrame, filename: str):
 
 def save_dataframe_to_pdf(df: pd.DataFrame, filename: str, title: str="Report"):
     path = os.path.join("exports", filename)
-    os.makedirs(os.path.dirname(path), exist_ok=True)
-    # simple table PDF using reportlab
-    c = canvas.Canvas(path, pagesize=letter)
-    width, height = letter
-    c.setFont("Helvetica-Bold", 14)
-    c.drawString(30, height - 40, title)
-    c.setFont("Helvetica", 10)
-    x = 30
-    y = height - 60
-    row_height = 14
-    # header
-    for col in df.columns:
-        c.drawString(x, y, str(col))
-        x += 100
-    y -= row_height
-    x = 30
-    # rows
-    for idx, row in df.iterrows():
-        for col in df.columns:
-            text = str(row[col]) if not pd.isna(row[col]) else ""
-            c.drawString(x, y, text[:20])
-            x += 100
-        y -= row_height
-        x = 30
-        if y < 40:
-            c.showPage()
-            c.setFont("Helvetica", 10)
-            y = height - 40
-    c.save()
-    return path
+    return render_table_pdf(df, path, title=title)
 
-def ai_suggestions(db: Session, start_date: date, end_date: date, top_n: int=10):
+def ai_suggestions(db: Session, start_date: date, end_date: date, top_n: int=10, rules_path: str | None=None):
     """
-    Simple rule-based suggestions:
-    - Low completion rate + high work_hours => suggest time-management training
-    - Low work_hours + low completion => under-assigned / needs help
-    - High work_hours + high completion => best practices share
+    Ranked coaching suggestions for [start_date, end_date]: per-user totals from
+    user_day_facts (one grouped query) scored by services.suggestion_engine rules,
+    most severe first.
     """
-    merged, s, e = productivity_dataframe(db, "custom", start_date, end_date)
-    suggestions = []
-    # aggregate per user
-    agg = merged.groupby(["user_id","user_name"]).agg(tasks_assigned=("tasks_assigned","sum"), tasks_completed=("tasks_completed","sum"), work_hours=("work_hours","sum")).reset_index()
-    agg["completion_rate"] = agg.apply(lambda r: (r["tasks_completed"]/r["tasks_assigned"]*100) if r["tasks_assigned"]>0 else 0.0, axis=1)
-    # produce suggestions
-    for _, r in agg.iterrows():
-        uid = int(r["user_id"]) if not pd.isna(r["user_id"]) else None
-        uname = r["user_name"]
-        cr = r["completion_rate"]
-        wh = r["work_hours"]
-        ta = r["tasks_assigned"]
-        if ta == 0:
-            continue
-        if cr < 40 and wh > 20:
-            suggestions.append({"user_id": uid, "user_name": uname, "suggestion": "Time-management training + review task blockers", "reason": f"Low completion {cr:.1f}% despite high hours ({wh}h)"})
-        elif cr < 40 and wh < 10:
-            suggestions.append({"user_id": uid, "user_name": uname, "suggestion": "Check workload or capability; Mentor assignment", "reason": f"Low completion {cr:.1f}% and low hours ({wh}h)"})
-        elif cr > 80 and wh > 30:
-            suggestions.append({"user_id": uid, "user_name": uname, "suggestion": "Employee is high-performer — consider rewards/knowledge share", "reason": f"High completion {cr:.1f}% and high hours ({wh}h)"})
-    # return top_n
-    return suggestions[:top_n]
+    result = db.execute(select(
+        UserDayFact.user_id,
+        User.name,
+        func.sum(UserDayFact.tasks_assigned),
+        func.sum(UserDayFact.tasks_completed),
+        func.sum(UserDayFact.work_hours),
+        func.sum(UserDayFact.active_minutes),
+        func.sum(UserDayFact.idle_minutes),
+    ).join(User, User.id == UserDayFact.user_id).where(
+        UserDayFact.day >= start_date, UserDayFact.day <= end_date,
+    ).group_by(UserDayFact.user_id, User.name))
+    rows = result.fetchall()
+    if not rows:
+        return []
+    uids, names, assigned, completed, hours, active, idle = zip(*rows)
+    metrics = suggestion_metrics(assigned, completed, [h or 0.0 for h in hours], active, idle)
+    rules = load_suggestion_rules(rules_path) if rules_path else load_suggestion_rules()
+    out = []
+    for i, rule, severity in rank_suggestions(metrics, rules, top_n):
+        out.append({"user_id": uids[i], "user_name": names[i], "suggestion": rule["suggestion"],
+                    "reason": format_reason(rule, metrics, i), "rule_id": rule["id"], "severity": round(severity, 1)})
+    return out
@@ -0,0 +1,57 @@
+# services/retention_service.py
+import asyncio
+from datetime import timedelta
+from sqlalchemy import delete, insert, literal, select
+from sqlalchemy.orm import Session
+from core.database import SessionLocal
+from utils.timezone import now_ist
+from models.notification import Notification
+from models.notification_archive import NotificationArchive
+from services.sync_service import record_changes
+
+NOTIFICATION_RETENTION_DAYS = 30      # read notifications older than this leave the hot table
+ARCHIVE_BATCH_SIZE = 5000
+ARCHIVE_INTERVAL_SECONDS = 3600
+
+
+def archive_read_notifications(db: Session, older_than_days: int = NOTIFICATION_RETENTION_DAYS, batch_size: int = ARCHIVE_BATCH_SIZE, max_batches: int | None = None) -> int:
+    """
+    Move read notifications older than the cutoff into notifications_archive,
+    one short transaction per chunk so the hot table is never locked for long.
+    Returns the number of rows moved.
+    """
+    cutoff = now_ist() - timedelta(days=older_than_days)
+    hot = Notification.__table__
+    archive = NotificationArchive.__table__
+    cols = ["id", "user_id", "task_id", "title", "message", "is_read", "created_at", "dedupe_key"]
+    moved = 0
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        rows = db.execute(
+            select(hot.c.id, hot.c.user_id).where(hot.c.is_read == True, hot.c.created_at < cutoff).order_by(hot.c.id).limit(batch_size)).all()
+        if not rows:
+            break
+        ids = [r.id for r in rows]
+        db.execute(insert(archive).from_select(
+            cols + ["archived_at"],
+            select(*[hot.c[c] for c in cols], literal(now_ist(), archive.c.archived_at.type)).where(hot.c.id.in_(ids))))
+        db.execute(delete(hot).where(hot.c.id.in_(ids)))
+        record_changes(db, "notifications", {(r.id, r.user_id) for r in rows})  # tombstones for synced clients
+        db.commit()
+        moved += len(ids)
+        batches += 1
+    return moved
+
+
+async def notification_retention_loop():
+    while True:
+        try:
+            db = SessionLocal()
+            # bounded work per tick, off the event loop; the rest is picked up on the next one
+            moved = await asyncio.to_thread(archive_read_notifications, db, max_batches=20)
+            db.close()
+            if moved:
+                print(f"notification_retention_loop: archived {moved} notifications")
+        except Exception as exc:
+            print("notification_retention_loop error:", exc)
+        await asyncio.sleep(ARCHIVE_INTERVAL_SECONDS)
@@ -0,0 +1,127 @@
+# services/suggestion_engine.py
+"""
+Rule-based coaching suggestions scored over per-user aggregates.
+
+Rules live in a JSON file (core/suggestion_rules.json, or SUGGESTION_RULES_PATH):
+
+    {"id": "...", "suggestion": "...", "reason": "format string over the metrics",
+     "when": [[metric, op, value], ...],
+     "severity": {"base": 50, "terms": [[metric, weight, pivot], ...]}}
+
+Every rule is evaluated as a boolean mask over all users at once; severity is
+base + sum(weight * (metric - pivot)), clipped to [0, 100]. A user keeps the
+most severe matching rule and the top N users are picked with argpartition, so
+only the returned rows pay for sorting and reason formatting.
+"""
+import json
+import os
+import threading
+import numpy as np
+from core.config import SUGGESTION_RULES_PATH
+
+SUGGESTION_METRICS = ("tasks_assigned", "tasks_completed", "completion_rate", "work_hours",
+                      "active_minutes", "idle_minutes", "idle_ratio")
+RULE_OPS = {"<": np.less, "<=": np.less_equal, ">": np.greater, ">=": np.greater_equal,
+            "==": np.equal, "!=": np.not_equal}
+
+_rules_lock = threading.Lock()
+_rules_cache: dict[str, tuple[float, list[dict]]] = {}
+
+
+def _validate_rule(rule: dict) -> dict:
+    rid = rule.get("id")
+    if not rid or not rule.get("suggestion"):
+        raise ValueError(f"Suggestion rule needs an id and a suggestion: {rule}")
+    for metric, op, _ in rule.get("when", []):
+        if metric not in SUGGESTION_METRICS:
+            raise ValueError(f"Rule {rid}: unknown metric {metric}")
+        if op not in RULE_OPS:
+            raise ValueError(f"Rule {rid}: unknown operator {op}")
+    severity = rule.get("severity", {})
+    for metric, _, _ in severity.get("terms", []):
+        if metric not in SUGGESTION_METRICS:
+            raise ValueError(f"Rule {rid}: unknown severity metric {metric}")
+    return {
+        "id": rid,
+        "suggestion": rule["suggestion"],
+        "reason": rule.get("reason", ""),
+        "when": [(m, RULE_OPS[op], float(v)) for m, op, v in rule.get("when", [])],
+        "base": float(severity.get("base", 50)),
+        "terms": [(m, float(w), float(p)) for m, w, p in severity.get("terms", [])],
+    }
+
+
+def suggestion_rules_version(path: str = SUGGESTION_RULES_PATH) -> float:
+    """Changes whenever the rules file is edited (part of report cache keys)."""
+    return os.path.getmtime(path)
+
+
+def load_suggestion_rules(path: str = SUGGESTION_RULES_PATH) -> list[dict]:
+    """Parsed rules from path; re-read only when the file's mtime changes."""
+    mtime = os.path.getmtime(path)
+    with _rules_lock:
+        cached = _rules_cache.get(path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+    with open(path) as f:
+        rules = [_validate_rule(r) for r in json.load(f)]
+    with _rules_lock:
+        _rules_cache[path] = (mtime, rules)
+    return rules
+
+
+def suggestion_metrics(tasks_assigned, tasks_completed, work_hours, active_minutes, idle_minutes) -> dict[str, np.ndarray]:
+    """Per-user metric arrays (aligned with the inputs) the rules can refer to."""
+    assigned = np.asarray(tasks_assigned, dtype=np.float64)
+    completed = np.asarray(tasks_completed, dtype=np.float64)
+    active = np.asarray(active_minutes, dtype=np.float64)
+    idle = np.asarray(idle_minutes, dtype=np.float64)
+    tracked = active + idle
+    return {
+        "tasks_assigned": assigned,
+        "tasks_completed": completed,
+        "completion_rate": np.where(assigned > 0, completed * 100.0 / np.maximum(assigned, 1), 0.0),
+        "work_hours": np.asarray(work_hours, dtype=np.float64),
+        "active_minutes": active,
+        "idle_minutes": idle,
+        "idle_ratio": np.where(tracked > 0, idle / np.maximum(tracked, 1), 0.0),
+    }
+
+
+def rank_suggestions(metrics: dict[str, np.ndarray], rules: list[dict], top_n: int = 10):
+    """
+    Evaluate all rules over the metric arrays. Returns (index, rule, severity)
+    for the top_n most severe users, most severe first (ties: lower index first).
+    """
+    n = len(metrics["tasks_assigned"])
+    best_sev = np.full(n, -np.inf)
+    best_rule = np.full(n, -1, dtype=np.int64)
+    for ri, rule in enumerate(rules):
+        mask = np.ones(n, dtype=bool)
+        for metric, op, value in rule["when"]:
+            mask &= op(metrics[metric], value)
+        if not mask.any():
+            continue
+        sev = np.full(n, rule["base"])
+        for metric, weight, pivot in rule["terms"]:
+            sev += weight * (metrics[metric] - pivot)
+        sev = np.clip(sev, 0.0, 100.0)
+        better = mask & (sev > best_sev)
+        best_sev[better] = sev[better]
+        best_rule[better] = ri
+
+    matched = np.flatnonzero(best_rule >= 0)
+    if top_n <= 0 or not len(matched):
+        return []
+    if len(matched) > top_n:
+        matched = matched[np.argpartition(-best_sev[matched], top_n - 1)[:top_n]]
+    # matched is small now: order by severity desc, then index
+    matched = matched[np.lexsort((matched, -best_sev[matched]))]
+    return [(int(i), rules[best_rule[i]], float(best_sev[i])) for i in matched]
+
+
+def format_reason(rule: dict, metrics: dict[str, np.ndarray], i: int) -> str:
+    try:
+        return rule["reason"].format(**{k: float(v[i]) for k, v in metrics.items()})
+    except (KeyError, ValueError, IndexError):
+        return rule["reason"]
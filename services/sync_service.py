@@ -0,0 +1,211 @@
+# services/sync_service.py
+"""
+Delta sync for client-side collections (tasks, projects, leaves, notifications).
+
+Every write appends (collection, seq, row_id, user_id) entries to change_log,
+where user_id is the user whose collection the row is or was in (both, when a
+task is reassigned). seq comes from a per-collection counter row in
+data_versions that is bumped in the writing transaction; its row lock orders
+commits, so every seq up to the committed counter value is visible and a cursor
+never skips a change. ORM writes are logged by a flush hook; set-based writers
+call record_changes themselves.
+
+A client sends its last cursor per collection and gets the rows changed since
+then that it can still see (upserts) and the ids that it no longer can, whether
+deleted or reassigned away (tombstones). No cursor, or one older than the
+retained log, gets a full snapshot with reset=True.
+"""
+import asyncio
+from datetime import datetime, timedelta
+from sqlalchemy import delete, event, func, insert, inspect, select
+from sqlalchemy.orm import Session
+from core.database import SessionLocal, dialect_insert
+from models.change_log import ChangeLog
+from models.data_version import DataVersion
+from models.leave import Leave
+from models.notification import Notification
+from models.project import Project
+from models.task import Task
+from models.user import User
+from utils.timezone import now_ist
+
+SYNC_MODELS = {"tasks": Task, "projects": Project, "leaves": Leave, "notifications": Notification}  # collection = table name
+SYNC_COLLECTIONS = tuple(SYNC_MODELS)
+SYNC_PAGE_CHANGES = 500            # change sets (seqs) per delta page
+SYNC_NOTIFICATION_SNAPSHOT = 200   # a reset returns only the newest notifications
+SYNC_LOG_RETENTION_DAYS = 30
+SYNC_PRUNE_INTERVAL_SECONDS = 3600
+CHANGE_LOG_BATCH_SIZE = 1000
+
+
+def _counter_name(collection: str) -> str:
+    return f"sync.{collection}"
+
+
+def _next_seq(db: Session, collection: str) -> int:
+    table = DataVersion.__table__
+    stmt = dialect_insert(table).values(name=_counter_name(collection), version=1)
+    stmt = stmt.on_conflict_do_update(index_elements=["name"], set_={"version": table.c.version + 1})
+    return db.connection().execute(stmt.returning(table.c.version)).scalar_one()
+
+
+def current_seq(db: Session, collection: str) -> int:
+    return db.query(DataVersion.version).filter(DataVersion.name == _counter_name(collection)).scalar() or 0
+
+
+def record_changes(db: Session, collection: str, changes):
+    """Log (row_id, user_id) pairs under one new seq of collection, in the current transaction."""
+    changes = set(changes)
+    if not changes:
+        return
+    seq = _next_seq(db, collection)
+    now = now_ist()
+    rows = [{"collection": collection, "seq": seq, "row_id": rid, "user_id": uid, "changed_at": now} for rid, uid in changes]
+    conn = db.connection()
+    for i in range(0, len(rows), CHANGE_LOG_BATCH_SIZE):
+        conn.execute(insert(ChangeLog), rows[i:i + CHANGE_LOG_BATCH_SIZE])
+
+
+def task_owners(db: Session, task_ids) -> dict[int, int | None]:
+    task_ids = set(task_ids)
+    if not task_ids:
+        return {}
+    return dict(db.connection().execute(select(Task.id, Task.assigned_to).where(Task.id.in_(task_ids))).all())
+
+
+def _old_values(obj, attr: str) -> list:
+    return [v for v in inspect(obj).attrs[attr].history.deleted if v is not None]
+
+
+@event.listens_for(SessionLocal, "before_flush")
+def _capture_task_cascades(session, flush_context, instances):
+    # projects and notifications of deleted tasks go with them (ON DELETE CASCADE); note them while they still exist
+    deleted = {o.id: o.assigned_to for o in session.deleted if isinstance(o, Task)}
+    if not deleted:
+        return
+    conn = session.connection()
+    pending = session.info.setdefault("sync_cascades", [])
+    for pid, tid in conn.execute(select(Project.id, Project.task_id).where(Project.task_id.in_(deleted))):
+        pending.append(("projects", pid, deleted[tid]))
+    for nid, uid in conn.execute(select(Notification.id, Notification.user_id).where(Notification.task_id.in_(deleted))):
+        pending.append(("notifications", nid, uid))
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _log_changes(session, flush_context):
+    changes = {c: set() for c in SYNC_COLLECTIONS}
+    for coll, rid, uid in session.info.pop("sync_cascades", ()):
+        changes[coll].add((rid, uid))
+
+    project_tasks = []  # (project id, current or previous task id)
+    reassigned = {}  # task id -> previous assignees
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        coll = getattr(obj, "__tablename__", None)
+        if coll not in SYNC_MODELS or (obj in session.dirty and not session.is_modified(obj, include_collections=False)):
+            continue
+        if coll == "tasks":
+            old = _old_values(obj, "assigned_to")
+            changes["tasks"].update((obj.id, uid) for uid in (obj.assigned_to, *old))
+            if old and obj not in session.deleted:
+                reassigned[obj.id] = old
+        elif coll == "projects":
+            project_tasks.extend((obj.id, tid) for tid in (obj.task_id, *_old_values(obj, "task_id")))
+        else:
+            changes[coll].add((obj.id, obj.user_id))
+
+    if project_tasks or reassigned:
+        owners = {o.id: o.assigned_to for o in session.deleted if isinstance(o, Task)}
+        owners.update(task_owners(session, {tid for _, tid in project_tasks} | set(reassigned)))
+        changes["projects"].update((pid, owners.get(tid)) for pid, tid in project_tasks)
+        # a reassigned task moves its projects from the old assignee's collection to the new one's
+        if reassigned:
+            rows = session.connection().execute(select(Project.id, Project.task_id).where(Project.task_id.in_(reassigned)))
+            for pid, tid in rows:
+                changes["projects"].update((pid, uid) for uid in (owners.get(tid), *reassigned[tid]))
+
+    for coll, pairs in changes.items():
+        if pairs:
+            record_changes(session, coll, pairs)
+
+
+def _is_manager(user: User) -> bool:
+    return bool(user.role_name) and user.role_name.lower() in ("admin", "manager")
+
+
+def _visible(db: Session, collection: str, user: User):
+    """The rows of the collection the user sees; mirrors the list endpoints."""
+    if collection == "tasks":
+        q = db.query(Task)
+        return q if _is_manager(user) else q.filter(Task.assigned_to == user.id)
+    if collection == "projects":
+        return db.query(Project).join(Task, Project.task_id == Task.id).filter(Task.assigned_to == user.id)
+    if collection == "leaves":
+        return db.query(Leave).filter(Leave.user_id == user.id)
+    return db.query(Notification).filter(Notification.user_id == user.id)
+
+
+def _snapshot(db: Session, collection: str, user: User) -> list:
+    q = _visible(db, collection, user)
+    if collection == "notifications":
+        return q.order_by(Notification.created_at.desc()).limit(SYNC_NOTIFICATION_SNAPSHOT).all()
+    return q.all()
+
+
+def sync_collection(db: Session, collection: str, user: User, cursor: int | None) -> dict:
+    """
+    Changes to one collection since cursor: {"cursor", "reset", "has_more",
+    "upserts", "deleted"}. Pass the returned cursor on the next call; repeat
+    while has_more is set.
+    """
+    head = current_seq(db, collection)  # read first: later commits are picked up next time
+    model = SYNC_MODELS[collection]
+    floor = db.query(func.min(ChangeLog.seq)).filter(ChangeLog.collection == collection).scalar()
+    expired = (floor is None and cursor is not None and cursor < head) or (floor is not None and cursor is not None and cursor < floor - 1)
+    if cursor is None or cursor <= 0 or cursor > head or expired:
+        return {"cursor": head, "reset": True, "has_more": False, "upserts": _snapshot(db, collection, user), "deleted": []}
+
+    scoped = [ChangeLog.collection == collection, ChangeLog.seq > cursor]
+    if not (collection == "tasks" and _is_manager(user)):
+        scoped.append(ChangeLog.user_id == user.id)
+    seqs = db.scalars(select(ChangeLog.seq).distinct().where(*scoped, ChangeLog.seq <= head)
+                      .order_by(ChangeLog.seq).limit(SYNC_PAGE_CHANGES)).all()
+    upper = seqs[-1] if len(seqs) == SYNC_PAGE_CHANGES else head
+    ids = set(db.scalars(select(ChangeLog.row_id).distinct().where(*scoped, ChangeLog.seq <= upper)))
+    upserts = _visible(db, collection, user).filter(model.id.in_(ids)).order_by(model.id).all() if ids else []
+    return {"cursor": upper, "reset": False, "has_more": upper < head, "upserts": upserts,
+            "deleted": sorted(ids - {r.id for r in upserts})}
+
+
+def collection_stamp(db: Session, collection: str, user_id: int) -> tuple[int, datetime | None]:
+    """
+    Version stamp of a user's collection: the newest change logged for them and
+    when it happened. With no retained entries the collection head is used, so
+    the stamp still only moves forward.
+    """
+    row = db.query(ChangeLog.seq, ChangeLog.changed_at).filter(
+        ChangeLog.collection == collection, ChangeLog.user_id == user_id
+    ).order_by(ChangeLog.seq.desc()).first()
+    if row is None:
+        return current_seq(db, collection), None
+    return row.seq, row.changed_at
+
+
+def prune_change_log(db: Session, older_than_days: int = SYNC_LOG_RETENTION_DAYS) -> int:
+    """Drop old log entries; clients with older cursors get a reset snapshot."""
+    cutoff = now_ist() - timedelta(days=older_than_days)
+    removed = db.execute(delete(ChangeLog).where(ChangeLog.changed_at < cutoff)).rowcount
+    db.commit()
+    return removed
+
+
+async def change_log_retention_loop():
+    while True:
+        try:
+            db = SessionLocal()
+            removed = await asyncio.to_thread(prune_change_log, db)
+            db.close()
+            if removed:
+                print(f"change_log_retention_loop: pruned {removed} entries")
+        except Exception as exc:
+            print("change_log_retention_loop error:", exc)
+        await asyncio.sleep(SYNC_PRUNE_INTERVAL_SECONDS)
@@ -0,0 +1,138 @@
+# services/task_service.py
+"""
+Task writes as single units of work: the task, its linked Project, tracking
+entries and the outbox event for the assignee's notification are written in one
+transaction, either one task at a time through the ORM or many at once with
+set-based statements.
+"""
+from sqlalchemy import insert, or_, select, update
+from sqlalchemy.orm import Session
+from models.task import Task
+from models.project import Project
+from models.tracking import Tracking
+from models.user import User
+from schemas.task_schema import TaskCreate, TaskResponse
+from services.fact_service import fact_keys, refresh_facts
+from services.outbox_service import emit, emit_many, task_ref
+from services.report_cache import bump_versions
+from services.sync_service import record_changes
+from services.tracking_service import record_latest_trackings
+from utils.timezone import now_ist
+
+BULK_TASK_LIMIT = 1000
+BULK_INSERT_BATCH_SIZE = 500
+
+
+def create_task(db: Session, task_in: TaskCreate, creator_id: int) -> Task:
+    task = Task(
+        title=task_in.title,
+        description=task_in.description,
+        due_date=task_in.due_date,
+        created_by=creator_id,
+        assigned_to=task_in.assigned_to
+    )
+    db.add(task)
+    db.flush()  # task.id for the project and event
+    db.add(Project(task_id=task.id, project_name=task.title, progress=task.progress, status=task.status))
+    if task.assigned_to:
+        emit(db, "tasks.assigned", {"tasks": [task_ref(task)]})
+    db.commit()
+    db.refresh(task)
+    return task
+
+
+def create_tasks_bulk(db: Session, items: list[TaskCreate], creator_id: int) -> tuple[list[TaskResponse], list[dict]]:
+    """
+    Validate and insert many tasks with their projects and outbox event in one
+    transaction. Invalid items are skipped and reported as {"index", "detail"};
+    the valid ones are created. Returns (created tasks in input order, errors).
+    """
+    errors = []
+    assignees = {t.assigned_to for t in items if t.assigned_to is not None}
+    known = {uid for (uid,) in db.query(User.id).filter(User.id.in_(assignees))} if assignees else set()
+    valid = []
+    for i, t in enumerate(items):
+        if not t.title or not t.title.strip():
+            errors.append({"index": i, "detail": "Title is required"})
+        elif t.assigned_to is not None and t.assigned_to not in known:
+            errors.append({"index": i, "detail": f"Assignee {t.assigned_to} not found"})
+        else:
+            valid.append(t)
+    if not valid:
+        return [], errors
+
+    now = now_ist()
+    task_rows = [{"title": t.title, "description": t.description, "due_date": t.due_date, "created_by": creator_id,
+                  "assigned_to": t.assigned_to, "created_at": now, "progress": 0.0, "status": "Pending"} for t in valid]
+    tasks: list[Task] = []
+    for i in range(0, len(task_rows), BULK_INSERT_BATCH_SIZE):
+        tasks.extend(db.scalars(insert(Task).returning(Task, sort_by_parameter_order=True), task_rows[i:i + BULK_INSERT_BATCH_SIZE]))
+
+    project_rows = [{"task_id": t.id, "project_name": t.title, "progress": t.progress, "status": t.status, "updated_at": now} for t in tasks]
+    project_ids = []
+    for i in range(0, len(project_rows), BULK_INSERT_BATCH_SIZE):
+        project_ids.extend(db.scalars(insert(Project).returning(Project.id, sort_by_parameter_order=True), project_rows[i:i + BULK_INSERT_BATCH_SIZE]))
+
+    # bulk INSERTs skip the flush hooks: keep the sync log, facts and report versions in step here
+    record_changes(db, "tasks", {(t.id, t.assigned_to) for t in tasks})
+    record_changes(db, "projects", {(pid, t.assigned_to) for pid, t in zip(project_ids, tasks)})
+    assigned = [task_ref(t) for t in tasks if t.assigned_to]
+    if assigned:
+        emit_many(db, [("tasks.assigned", {"tasks": assigned})])
+    refresh_facts(db, fact_keys({t.assigned_to for t in tasks}, now))
+    bump_versions(db, {"tasks", "projects"})
+    created = [TaskResponse.model_validate(t) for t in tasks]  # before commit expires them
+    db.commit()
+    return created, errors
+
+
+def bulk_update_status(db: Session, task_ids=(), project_ids=(), status: str | None = None,
+                       progress: float | None = None, remarks: str | None = None) -> dict:
+    """
+    Set status and/or progress on tasks (by id or via their project id), their
+    linked projects and add a tracking entry per project, all with set-based
+    statements in one transaction with one outbox event for the notifications.
+    Unknown ids are reported in "errors".
+    """
+    task_ids, project_ids = set(task_ids), set(project_ids)
+    rows = db.execute(
+        select(Task.id.label("task_id"), Task.title, Task.status, Task.assigned_to, Task.created_at, Project.id.label("project_id"))
+        .outerjoin(Project, Project.task_id == Task.id)
+        .where(or_(Task.id.in_(task_ids), Project.id.in_(project_ids)))
+    ).all()
+    errors = [{"id": i, "detail": "Task not found"} for i in sorted(task_ids - {r.task_id for r in rows})]
+    errors += [{"id": i, "detail": "Project not found"} for i in sorted(project_ids - {r.project_id for r in rows})]
+    # a task with several projects shows up once per project
+    tasks = list({r.task_id: r for r in rows}.values())
+    ids = [t.task_id for t in tasks]
+    if not ids:
+        return {"tasks": [], "projects": [], "trackings": 0, "errors": errors}
+
+    # rows pair each task with the requested project, or with all its projects when the task was requested by id
+    target_projects = sorted({r.project_id for r in rows if r.project_id is not None})
+    now = now_ist()
+    values = {k: v for k, v in (("status", status), ("progress", progress)) if v is not None}
+    db.execute(update(Task).where(Task.id.in_(ids)).values(**values).execution_options(synchronize_session=False))
+    if target_projects:
+        db.execute(update(Project).where(Project.id.in_(target_projects)).values(**values, updated_at=now).execution_options(synchronize_session=False))
+
+    # tracking rows need both a task and a project
+    tracking_rows = [{"task_id": r.task_id, "project_id": r.project_id, "status": status or r.status,
+                      "remarks": remarks, "updated_at": now} for r in rows if r.project_id is not None]
+    if tracking_rows:
+        ids_out = db.scalars(insert(Tracking).returning(Tracking.id, sort_by_parameter_order=True), tracking_rows).all()
+        record_latest_trackings(db, [{**r, "tracking_id": tid} for r, tid in zip(tracking_rows, ids_out)])
+
+    # set-based writes skip the flush hooks: keep pointers (above), the sync log, facts and report versions in step here
+    record_changes(db, "tasks", {(t.task_id, t.assigned_to) for t in tasks})
+    record_changes(db, "projects", {(r.project_id, r.assigned_to) for r in rows if r.project_id is not None})
+    emit(db, "tasks.updated", {"status": status, "tasks": [task_ref(t) for t in tasks]})
+    if status is not None:
+        keys = set()
+        for t in tasks:
+            keys |= fact_keys({t.assigned_to}, t.created_at)
+        refresh_facts(db, keys)
+    bump_versions(db, {"tasks", "projects", "trackings"})
+    db.commit()
+    return {"tasks": sorted(ids), "projects": target_projects,
+            "trackings": len(tracking_rows), "errors": errors}
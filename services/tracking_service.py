@@ -0,0 +1,140 @@
+# services/tracking_service.py
+"""
+Tracking timelines and the per-task latest-tracking pointer.
+
+Timelines are read newest first with keyset pagination on (updated_at, id); the
+cursor is an opaque token for the last row of the previous page.
+
+task_latest_tracking keeps one row per task pointing at its newest tracking
+entry, so "current status of my tasks" is a primary-key join instead of a sort
+over the whole history. A flush hook upserts it in the writing transaction for
+ORM writes (only moving the pointer forward); set-based writers call
+record_latest_trackings themselves. Deletes re-derive the pointer for the
+affected tasks, and a startup backfill fills it from existing history.
+"""
+import asyncio
+import base64
+from datetime import datetime
+from sqlalchemy import and_, event, func, or_, select
+from sqlalchemy.orm import Session
+from core.database import SessionLocal, dialect_insert
+from models.tracking import Tracking
+from models.task_latest_tracking import TaskLatestTracking
+from utils.timezone import IST
+
+TIMELINE_PAGE_SIZE = 50
+POINTER_COLUMNS = ("tracking_id", "project_id", "status", "remarks", "updated_at")
+
+
+def encode_cursor(updated_at: datetime, tracking_id: int) -> str:
+    return base64.urlsafe_b64encode(f"{updated_at.isoformat()}|{tracking_id}".encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """Raises ValueError for malformed cursors."""
+    try:
+        ts, tid = base64.urlsafe_b64decode(cursor.encode()).decode().rsplit("|", 1)
+        return datetime.fromisoformat(ts), int(tid)
+    except (UnicodeDecodeError, ValueError, TypeError) as exc:
+        raise ValueError("Invalid cursor") from exc
+
+
+def tracking_timeline(db: Session, task_id: int | None = None, project_id: int | None = None,
+                      limit: int = TIMELINE_PAGE_SIZE, cursor: str | None = None):
+    """One page of a task's (or project's) tracking history, newest first. Returns (rows, next_cursor)."""
+    col = Tracking.task_id if task_id is not None else Tracking.project_id
+    q = db.query(Tracking).filter(col == (task_id if task_id is not None else project_id))
+    if cursor:
+        ts, tid = decode_cursor(cursor)
+        q = q.filter(or_(Tracking.updated_at < ts, and_(Tracking.updated_at == ts, Tracking.id < tid)))
+    rows = q.order_by(Tracking.updated_at.desc(), Tracking.id.desc()).limit(limit + 1).all()
+    next_cursor = encode_cursor(rows[limit - 1].updated_at, rows[limit - 1].id) if len(rows) > limit else None
+    return rows[:limit], next_cursor
+
+
+def _aware(ts: datetime) -> datetime:
+    # a batch can mix new rows (IST) with loaded ones (naive IST on SQLite, session time zone on PostgreSQL)
+    return IST.localize(ts) if ts.tzinfo is None else ts
+
+
+def record_latest_trackings(db: Session, rows: list[dict]):
+    """
+    Upsert pointers for newly written tracking rows (dicts with tracking_id,
+    task_id, project_id, status, remarks, updated_at) in the current transaction.
+    An existing pointer only moves to a newer entry, or is refreshed in place
+    when its own tracking row changed.
+    """
+    newest: dict[int, dict] = {}
+    for r in rows:
+        if r.get("task_id") is None or r.get("updated_at") is None:
+            continue
+        cur = newest.get(r["task_id"])
+        if cur is None or (_aware(r["updated_at"]), r["tracking_id"]) >= (_aware(cur["updated_at"]), cur["tracking_id"]):
+            newest[r["task_id"]] = r
+    if not newest:
+        return
+    table = TaskLatestTracking.__table__
+    values = [{"task_id": tid, **{c: r.get(c) for c in POINTER_COLUMNS}} for tid, r in newest.items()]
+    stmt = dialect_insert(table).values(values)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["task_id"],
+        set_={c: stmt.excluded[c] for c in POINTER_COLUMNS},
+        where=or_(table.c.tracking_id == stmt.excluded.tracking_id,
+                  table.c.updated_at < stmt.excluded.updated_at,
+                  and_(table.c.updated_at == stmt.excluded.updated_at, table.c.tracking_id < stmt.excluded.tracking_id)),
+    )
+    db.connection().execute(stmt)
+
+
+def rebuild_latest_trackings(db: Session, task_ids=None):
+    """Re-derive pointers from the history (all tasks, or only task_ids) in the current transaction."""
+    table = TaskLatestTracking.__table__
+    rn = func.row_number().over(partition_by=Tracking.task_id,
+                                order_by=(Tracking.updated_at.desc(), Tracking.id.desc())).label("rn")
+    ranked = select(Tracking.task_id, Tracking.id.label("tracking_id"), Tracking.project_id, Tracking.status,
+                    Tracking.remarks, Tracking.updated_at, rn)
+    delete = table.delete()
+    if task_ids is not None:
+        ranked = ranked.where(Tracking.task_id.in_(task_ids))
+        delete = delete.where(table.c.task_id.in_(task_ids))
+    ranked = ranked.subquery()
+    cols = ("task_id", *POINTER_COLUMNS)
+    conn = db.connection()
+    conn.execute(delete)
+    conn.execute(table.insert().from_select(cols, select(*(ranked.c[c] for c in cols)).where(ranked.c.rn == 1)))
+
+
+def _pointer_row(t: Tracking) -> dict:
+    return {"tracking_id": t.id, "task_id": t.task_id, "project_id": t.project_id,
+            "status": t.status, "remarks": t.remarks, "updated_at": t.updated_at}
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _track_latest(session, flush_context):
+    written = [_pointer_row(o) for o in (*session.new, *session.dirty) if isinstance(o, Tracking)]
+    if written:
+        record_latest_trackings(session, written)
+    removed = {o.task_id for o in session.deleted if isinstance(o, Tracking)}
+    if removed:
+        rebuild_latest_trackings(session, removed)
+
+
+def backfill_latest_trackings() -> bool:
+    """Fill the pointer table from existing history if it is empty (first start after upgrade)."""
+    db = SessionLocal()
+    try:
+        if db.query(TaskLatestTracking.task_id).first() is not None or db.query(Tracking.id).first() is None:
+            return False
+        rebuild_latest_trackings(db)
+        db.commit()
+        return True
+    finally:
+        db.close()
+
+
+async def latest_tracking_backfill():
+    try:
+        if await asyncio.to_thread(backfill_latest_trackings):
+            print("latest_tracking_backfill: pointers rebuilt from tracking history")
+    except Exception as e:
+        print("latest_tracking_backfill error:", e)
@@ -0,0 +1,130 @@
+# services/unread_service.py
+"""
+Per-user unread notification counters.
+
+Counters live in notification_counters and are adjusted in the same transaction
+as the notification insert / mark-read / delete that changes them (a flush hook
+covers every ORM write; set-based writes call apply_unread_deltas themselves).
+A small in-process cache answers reads; a periodic reconciliation repairs drift
+from writes that bypass both paths (e.g. ON DELETE CASCADE).
+"""
+import asyncio
+import threading
+import time
+from collections import Counter
+from sqlalchemy import event, func, inspect, select, update
+from sqlalchemy.orm import Session
+from core.database import SessionLocal, dialect_insert, insert_ignore
+from models.notification import Notification
+from models.notification_counter import NotificationCounter
+
+UNREAD_CACHE_TTL_SECONDS = 10  # bounds staleness from writes on other workers
+RECONCILE_INTERVAL_SECONDS = 900
+
+_cache: dict[int, tuple[int, float]] = {}
+_cache_lock = threading.Lock()
+
+
+def _unread_count(user_id):
+    """Scalar subquery: unread notifications of user_id (a column or a value)."""
+    return select(func.count(Notification.id)).where(
+        Notification.user_id == user_id, Notification.is_read == False).scalar_subquery()
+
+
+def apply_unread_deltas(db: Session, deltas: dict[int, int]):
+    """Add per-user deltas to the counters inside the current transaction."""
+    deltas = {uid: d for uid, d in deltas.items() if uid is not None and d}
+    if not deltas:
+        return
+    table = NotificationCounter.__table__
+    conn = db.connection()
+    for uid, d in deltas.items():
+        # a missing counter is seeded from the rows as flushed, which already include this change
+        stmt = dialect_insert(table).values(user_id=uid, unread=_unread_count(uid))
+        stmt = stmt.on_conflict_do_update(index_elements=["user_id"], set_={"unread": table.c.unread + d})
+        conn.execute(stmt)
+    db.info.setdefault("unread_touched", set()).update(deltas)
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _track_unread(session, flush_context):
+    deltas = Counter()
+    for obj in session.new:
+        if isinstance(obj, Notification) and not obj.is_read:
+            deltas[obj.user_id] += 1
+    for obj in session.deleted:
+        if isinstance(obj, Notification) and not obj.is_read:
+            deltas[obj.user_id] -= 1
+    for obj in session.dirty:
+        if isinstance(obj, Notification):
+            hist = inspect(obj).attrs.is_read.history
+            if hist.has_changes():
+                was_read = bool(hist.deleted[0]) if hist.deleted else False
+                if was_read != bool(obj.is_read):
+                    deltas[obj.user_id] += -1 if obj.is_read else 1
+    apply_unread_deltas(session, deltas)
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _evict_touched(session):
+    touched = session.info.pop("unread_touched", None)
+    if touched:
+        with _cache_lock:
+            for uid in touched:
+                _cache.pop(uid, None)
+
+
+@event.listens_for(SessionLocal, "after_soft_rollback")
+def _forget_touched(session, previous_transaction):
+    session.info.pop("unread_touched", None)
+
+
+def get_unread_count(db: Session, user_id: int) -> int:
+    hit = _cache.get(user_id)
+    if hit and hit[1] > time.monotonic():
+        return hit[0]
+
+    value = db.query(NotificationCounter.unread).filter(NotificationCounter.user_id == user_id).scalar()
+    if value is None:
+        # first read for this user: seed the counter from the notifications table
+        value = db.query(func.count(Notification.id)).filter(Notification.user_id == user_id, Notification.is_read == False).scalar()
+        db.execute(insert_ignore(NotificationCounter.__table__, ["user_id"]).values(user_id=user_id, unread=value))
+        db.commit()
+    value = max(value, 0)
+    with _cache_lock:
+        _cache[user_id] = (value, time.monotonic() + UNREAD_CACHE_TTL_SECONDS)
+    return value
+
+
+def reconcile_unread_counters(db: Session) -> int:
+    """
+    Recompute drifted counters from the notifications table. Each statement
+    counts and writes in one go, so notifications written meanwhile are not
+    overwritten by a count taken earlier.
+    """
+    table = NotificationCounter.__table__
+    actual = _unread_count(table.c.user_id)
+    fixed = set(db.scalars(update(table).where(table.c.unread != actual).values(unread=actual).returning(table.c.user_id)))
+    missing = (select(Notification.user_id, func.count(Notification.id))
+               .where(Notification.user_id.isnot(None), Notification.is_read == False,
+                      Notification.user_id.not_in(select(table.c.user_id)))
+               .group_by(Notification.user_id))
+    fixed.update(db.scalars(insert_ignore(table, ["user_id"]).from_select(["user_id", "unread"], missing).returning(table.c.user_id)))
+    db.commit()
+    with _cache_lock:
+        for uid in fixed:
+            _cache.pop(uid, None)
+    return len(fixed)
+
+
+async def unread_reconcile_loop():
+    while True:
+        try:
+            db = SessionLocal()
+            repaired = reconcile_unread_counters(db)
+            db.close()
+            if repaired:
+                print(f"unread_reconcile_loop: repaired {repaired} counters")
+        except Exception as exc:
+            print("unread_reconcile_loop error:", exc)
+        await asyncio.sleep(RECONCILE_INTERVAL_SECONDS)
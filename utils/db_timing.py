@@ -0,0 +1,50 @@
+# utils/db_timing.py
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from sqlalchemy import event
+from core.database import engine
+
+_current = ContextVar("db_timer", default=None)
+
+
+class DBTimer:
+    """Accumulates statement count and time spent inside the DB driver."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.statements = 0
+        self.db_seconds = 0.0
+        self.wall_seconds = 0.0
+
+    def report(self, **extra):
+        parts = " ".join(f"{k}={v}" for k, v in extra.items())
+        print(f"[{self.name}] statements={self.statements} db_ms={self.db_seconds * 1000:.1f} wall_ms={self.wall_seconds * 1000:.1f} {parts}".rstrip())
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault("db_timer_start", []).append(time.perf_counter())
+
+
+@event.listens_for(engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    timer = _current.get()
+    if timer is None or not conn.info.get("db_timer_start"):
+        return
+    timer.db_seconds += time.perf_counter() - conn.info["db_timer_start"].pop()
+    timer.statements += 1
+
+
+@contextmanager
+def track_db_time(name: str):
+    """Measure DB time of everything executed in the current context (e.g. one sweep)."""
+    timer = DBTimer(name)
+    token = _current.set(timer)
+    started = time.perf_counter()
+    try:
+        yield timer
+    finally:
+        timer.wall_seconds = time.perf_counter() - started
+        _current.reset(token)
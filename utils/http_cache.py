@@ -0,0 +1,59 @@
+# utils/http_cache.py
+"""
+Conditional GET (ETag / Last-Modified) for polled endpoints.
+
+Handlers compute a cheap validator first (a version stamp or the already loaded
+row), call not_modified() and return its 304 as-is; the payload is only loaded
+and serialized when the client's copy is stale. Validators are also set on the
+normal response.
+"""
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from fastapi import Request, Response
+from utils.timezone import IST
+
+
+def make_etag(*parts) -> str:
+    return 'W/"%s"' % hashlib.blake2b(repr(parts).encode(), digest_size=12).hexdigest()
+
+
+def row_etag(obj, fields) -> str:
+    """ETag over the attributes a response model exposes (the row is already loaded)."""
+    return make_etag(type(obj).__name__, *(getattr(obj, f, None) for f in fields))
+
+
+def _utc(ts: datetime) -> datetime:
+    if ts.tzinfo is None:
+        ts = IST.localize(ts)  # stored as IST wall-clock time
+    return ts.astimezone(timezone.utc).replace(microsecond=0)
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    # weak comparison: W/"x" matches "x"
+    want = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == want for tag in header.split(","))
+
+
+def not_modified(request: Request, response: Response, etag: str, last_modified: datetime | None = None) -> Response | None:
+    """Set ETag/Last-Modified on response; return a 304 response if the client's copy is current."""
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if last_modified is not None:
+        last_modified = _utc(last_modified)
+        headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+    response.headers.update(headers)
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:  # takes precedence over If-Modified-Since
+        return Response(status_code=304, headers=headers) if _etag_matches(if_none_match, etag) else None
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return None
+        if since.tzinfo is not None and last_modified <= since:
+            return Response(status_code=304, headers=headers)
+    return None
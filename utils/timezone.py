@@ -1,5 +1,5 @@
 import pytz
-from datetime import datetime
+from datetime import datetime, timedelta
 
 IST = pytz.timezone("Asia/Kolkata")
 
@@ -11,6 +11,11 @@ def today_ist_date():
     """Return only the date part in IST timezone."""
     return now_ist().date()
 
+def ist_day_bounds(day):
+    """[start, end) of an IST calendar day as aware datetimes (for range filters on timestamp columns)."""
+    start = IST.localize(datetime.combine(day, datetime.min.time()))
+    return start, start + timedelta(days=1)
+
 def utc_to_ist(dt):
     """Convert UTC or naive datetime to IST timezone-aware."""
     if dt is None:
@@ -19,3 +24,17 @@ def utc_to_ist(dt):
         # assume it was UTC if naive
         dt = pytz.utc.localize(dt)
     return dt.astimezone(IST)
+
+def ist_day(dt, naive_utc=False):
+    """IST calendar day of a timestamp. Naive values are IST wall-clock time, or UTC for utcnow-stamped tables (naive_utc)."""
+    if dt.tzinfo is None:
+        return utc_to_ist(dt).date() if naive_utc else dt.date()
+    return dt.astimezone(IST).date()
+
+def ist_range_bounds(start, end, naive_utc=False):
+    """[lo, hi) covering IST days start..end; naive UTC bounds for utcnow-stamped columns."""
+    lo, hi = ist_day_bounds(start)[0], ist_day_bounds(end)[1]
+    if naive_utc:
+        lo, hi = (t.astimezone(pytz.utc).replace(tzinfo=None) for t in (lo, hi))
+    return lo, hi
+